@@ -1,9 +1,18 @@
 from __future__ import annotations
 
 from bot.client import BotClient, create_client
+from bot.command_sync import CommandSyncState
 from data.database import Database, DatabaseError
+from data.executor import DatabaseExecutor
+from data.invalidation import create_invalidation_bus
+from data.migrations import SchemaCheck, load_migrations
+from data.spool import PointSpool
+from data.tracing import create_tracer, set_tracer
 from service.points_service import PointsService
 from data.repository import PointsRepository
+from service.cache.guild_settings import GuildSettingsCache
+from service.diagnostics.loop_monitor import LoopLagMonitor
+from service.diagnostics.startup_profile import startup_profiler
 
 from app.command_registry import register_commands
 from app.settings import AppConfig, describe_db_settings
@@ -13,29 +22,97 @@ def create_bot_client(config: AppConfig) -> BotClient:
     diagnostics = describe_db_settings(config.db_settings)
     print(f"[startup] Supabase host: {diagnostics['supabase_host']}")
     print(f"[startup] Supabase role: {diagnostics['service_role']}")
+    print(f"[startup] Points strategy: {diagnostics['points_strategy']}")
+    print(f"[startup] Invalidation bus: {diagnostics['invalidation_bus']}")
+    print(f"[startup] Gateway cache profile: {config.cache_settings.profile}")
+    tracing = config.tracing_settings
+    if tracing.exporter != "none":
+        print(
+            f"[startup] Tracing: {tracing.exporter} "
+            f"(sample ratio {tracing.sample_ratio})"
+        )
+    set_tracer(
+        create_tracer(
+            tracing.exporter,
+            json_path=tracing.json_path or config.runtime_settings.trace_path,
+            otlp_endpoint=tracing.otlp_endpoint,
+            sample_ratio=tracing.sample_ratio,
+        )
+    )
+    invalidation_bus = create_invalidation_bus(
+        config.db_settings.invalidation_bus, dsn=config.db_settings.database_dsn
+    )
     db = Database(
         url=config.db_settings.supabase_url,
         service_role_key=config.db_settings.service_role_key,
+        points_strategy=config.db_settings.points_strategy,
+        point_shard_count=config.db_settings.point_shard_count,
+        invalidation_bus=invalidation_bus,
+    )
+    spool = PointSpool(config.runtime_settings.point_spool_path)
+    if len(spool):
+        print(f"[startup] {len(spool)} spooled point deltas pending replay")
+    points_repo = PointsRepository(
+        db,
+        spool=spool,
+        read_cache_ttl_seconds=config.runtime_settings.points_read_cache_seconds,
+    )
+    schema_check = SchemaCheck(
+        db,
+        migrations=load_migrations(),
+        marker_path=config.runtime_settings.schema_marker_path,
+        target=diagnostics["supabase_host"] or "",
     )
-    points_repo = PointsRepository(db)
-    print("[startup] DB connection check start")
-    try:
-        schema_ready = db.check_connection()
-    except DatabaseError as exc:
-        print(f"[startup] DB connection check failed: {exc}")
-        raise
-    if schema_ready:
-        print("[startup] DB connection OK")
+
+    def check_schema() -> None:
+        with startup_profiler.section("db readiness check"):
+            print("[startup] DB connection check start")
+            try:
+                result = schema_check.run()
+            except DatabaseError as exc:
+                print(f"[startup] DB schema check failed: {exc}")
+                raise
+            print(f"[startup] DB schema OK (version {result.version})")
+
+    startup_check = None
+    if schema_check.is_ready_cached():
+        print(
+            f"[startup] DB schema ready (cached, version {schema_check.latest_version})"
+        )
     else:
-        print("[startup] DB schema missing. Running setup.")
-        try:
-            points_repo.ensure_schema()
-        except DatabaseError as exc:
-            print(f"[startup] DB schema setup failed: {exc}")
-            raise
-        print("[startup] DB schema OK")
-    client = create_client(points_repo=points_repo)
-    points_service = PointsService(points_repo)
+        startup_check = check_schema
+    # Shared by the commands and the earning handlers.
+    settings_cache = GuildSettingsCache(
+        points_repo, ttl_seconds=config.runtime_settings.guild_settings_ttl_seconds
+    )
+    loop_monitor = None
+    if config.runtime_settings.loop_lag_threshold_seconds is not None:
+        loop_monitor = LoopLagMonitor(
+            threshold_seconds=config.runtime_settings.loop_lag_threshold_seconds
+        )
+    client = create_client(
+        points_repo=points_repo,
+        startup_check=startup_check,
+        command_sync_state=CommandSyncState(
+            config.runtime_settings.command_sync_state_path
+        ),
+        dev_guild_id=config.discord_settings.dev_guild_id,
+        members_intent=config.discord_settings.members_intent,
+        settings_cache=settings_cache,
+        voice_members_only=config.cache_settings.voice_members_only,
+        chunk_guilds_at_startup=config.cache_settings.chunk_guilds_at_startup,
+        max_messages=config.cache_settings.max_messages,
+        loop_monitor=loop_monitor,
+        db_executor=DatabaseExecutor(
+            max_workers=config.runtime_settings.db_executor_workers,
+            max_queue=config.runtime_settings.db_executor_queue,
+        ),
+        invalidation_bus=invalidation_bus,
+    )
+    invalidation_bus.subscribe(settings_cache.handle_invalidation)
+    invalidation_bus.subscribe(points_repo.handle_invalidation)
+    invalidation_bus.start()
+    points_service = PointsService(points_repo, settings_cache=settings_cache)
     register_commands(client, points_service=points_service)
     return client
 
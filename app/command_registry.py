@@ -1,23 +1,41 @@
 from __future__ import annotations
 
+import asyncio
+from datetime import datetime, timedelta, timezone
+
 import discord
+from discord import app_commands
 
 from bot.client import BotClient
+from service.diagnostics.memory import format_bytes, memory_profiler
+from service.earning.rules import EarningRules
 from service.points_service import (
     InsufficientPointsError,
+    InvalidEarningRuleError,
+    InvalidImportError,
     InvalidPointsError,
     MissingClanRegisterChannelError,
     PermissionDeniedError,
     PermissionNotGrantedError,
     PointsService,
     PointsServiceError,
+    RankEntry,
+    RankPage,
     RoleNotForSaleError,
     TargetHasNoPointsError,
 )
 
+POINTS_IMPORT_MAX_BYTES = 2 * 1024 * 1024
+RANK_PAGE_SIZE = 10
+RANK_VIEW_TIMEOUT_SECONDS = 300
+DEBUG_MEMORY_TOP_ALLOCATORS = 10
+DEBUG_LOOP_STACK_LINES = 40
+
 
 def register_commands(client: BotClient, *, points_service: PointsService) -> None:
     tree = client.tree
+    # Every service call reaches Supabase synchronously; run them off the loop.
+    run_db = client.db_executor.run
 
     @tree.command(name="point", description="あなたの現在のポイントを表示します")
     async def point_command(interaction: discord.Interaction) -> None:
@@ -28,18 +46,22 @@ def register_commands(client: BotClient, *, points_service: PointsService) -> No
             return
         await _defer_if_needed(interaction)
         user_id = interaction.user.id
-        points = points_service.get_user_points(interaction.guild.id, user_id)
-        if points is None:
+        reading = await run_db(
+            points_service.read_user_points, interaction.guild.id, user_id
+        )
+        if reading.points is None:
             await _send_message(interaction, "まだポイントがありません。")
             return
         embed = discord.Embed(
             title=f"{interaction.user.display_name}の",
-            description=f"{points}ポイント",
+            description=f"{reading.points}ポイント",
             color=0x4EF47D,
         )
+        if reading.stale:
+            embed.set_footer(text="DBに接続できないため、最後に取得した値を表示しています。")
         await _send_message(interaction, embed=embed)
 
-    @tree.command(name="rank", description="ランキング上位10名を表示します。")
+    @tree.command(name="rank", description="ポイントランキングを表示します。")
     async def rank_command(interaction: discord.Interaction) -> None:
         if interaction.guild is None:
             await _send_message(interaction,
@@ -47,26 +69,76 @@ def register_commands(client: BotClient, *, points_service: PointsService) -> No
             )
             return
         await _defer_if_needed(interaction)
-        results = points_service.get_top_rank(interaction.guild.id, 10)
-        if not results:
+        view = _RankView(
+            client,
+            points_service,
+            guild=interaction.guild,
+            owner_id=interaction.user.id,
+        )
+        await view.load_first_page()
+        if not view.page.entries:
             await _send_message(interaction, "まだランキングがありません。")
             return
-        rank_embed = discord.Embed(title="**ポイントランキング**", color=0x4EF47D)
-        for i, result in enumerate(results):
-            user = await client.fetch_user(result["user_id"])
-            if user is not None:
-                rank_embed.add_field(
-                    name=f"{i + 1}. {user.name}",
-                    value=f"{result['points']}ポイント",
+        await _send_message(interaction, embed=await view.build_embed(), view=view)
+
+    @tree.command(
+        name="rank-season", description="期間内の獲得ポイントと順位上昇を表示します。"
+    )
+    @app_commands.choices(
+        period=[
+            app_commands.Choice(name="今週（7日間）", value=7),
+            app_commands.Choice(name="今月（30日間）", value=30),
+        ],
+        board=[
+            app_commands.Choice(name="獲得ポイント", value="gains"),
+            app_commands.Choice(name="順位上昇", value="climbers"),
+        ],
+    )
+    async def rank_season_command(
+        interaction: discord.Interaction,
+        period: app_commands.Choice[int],
+        board: app_commands.Choice[str] | None = None,
+    ) -> None:
+        guild = interaction.guild
+        if guild is None:
+            await _send_message(interaction,
+                embed=_permission_error_embed("サーバー内で使用してください。")
+            )
+            return
+        await _defer_if_needed(interaction)
+        now = datetime.fromtimestamp(client.clock.now(), tz=timezone.utc)
+        since = now - timedelta(days=period.value)
+        embed = discord.Embed(title=f"**{period.name}のランキング**", color=0x4EF47D)
+        if board is None or board.value == "gains":
+            gains = await run_db(points_service.get_points_gained, guild.id, since, 10)
+            for i, gain in enumerate(gains):
+                name = await _resolve_user_name(client, guild, gain.user_id)
+                embed.add_field(
+                    name=f"{i + 1}. {name or 'ユーザーが存在しません'}",
+                    value=f"+{gain.gained}ポイント",
                     inline=False,
                 )
-            else:
-                rank_embed.add_field(
-                    name=f"{i + 1}. ユーザーが存在しません",
-                    value=f"{result['points']}ポイント",
+            empty = not gains
+        else:
+            climbs = await run_db(
+                points_service.get_biggest_climbers, guild.id, since, 10
+            )
+            for i, climb in enumerate(climbs):
+                name = await _resolve_user_name(client, guild, climb.user_id)
+                embed.add_field(
+                    name=f"{i + 1}. {name or 'ユーザーが存在しません'}",
+                    value=(
+                        f"{climb.rank_before}位 → {climb.rank_now}位"
+                        f"（{climb.climbed}ランクアップ）"
+                    ),
                     inline=False,
                 )
-        await _send_message(interaction, embed=rank_embed)
+            empty = not climbs
+        if empty:
+            await _send_message(interaction, "この期間の記録はまだありません。")
+            return
+        embed.set_footer(text="ランキング履歴は1時間ごとに記録されます。")
+        await _send_message(interaction, embed=embed)
 
     @tree.command(
         name="send",
@@ -89,8 +161,12 @@ def register_commands(client: BotClient, *, points_service: PointsService) -> No
         sender_id = interaction.user.id
         recipient_id = user.id
         try:
-            points_service.send_points(
-                interaction.guild.id, sender_id, recipient_id, points
+            await run_db(
+                points_service.send_points,
+                interaction.guild.id,
+                sender_id,
+                recipient_id,
+                points,
             )
         except InsufficientPointsError:
             await _send_message(interaction, "**ポイントが足りません。**")
@@ -122,7 +198,8 @@ def register_commands(client: BotClient, *, points_service: PointsService) -> No
         sender_id = interaction.user.id
         recipient_id = user.id
         try:
-            points_service.remove_points(
+            await run_db(
+                points_service.remove_points,
                 interaction.guild.id,
                 sender_id,
                 recipient_id,
@@ -188,7 +265,9 @@ def register_commands(client: BotClient, *, points_service: PointsService) -> No
         await _defer_if_needed(interaction)
         target_id = user.id
         if allowed:
-            points_service.grant_remove_permission(interaction.guild.id, target_id)
+            await run_db(
+                points_service.grant_remove_permission, interaction.guild.id, target_id
+            )
             embed = discord.Embed(
                 title="**ポイント剥奪権限を付与しました**",
                 description=f"**{user.display_name}さんに権限を付与しました。**",
@@ -197,7 +276,9 @@ def register_commands(client: BotClient, *, points_service: PointsService) -> No
             await _send_message(interaction, embed=embed)
             return
         try:
-            points_service.revoke_remove_permission(interaction.guild.id, target_id)
+            await run_db(
+                points_service.revoke_remove_permission, interaction.guild.id, target_id
+            )
         except PermissionNotGrantedError:
             embed = discord.Embed(
                 title="**エラー!**",
@@ -227,7 +308,9 @@ def register_commands(client: BotClient, *, points_service: PointsService) -> No
             return
         await _defer_if_needed(interaction)
         try:
-            channel_id = points_service.get_clan_register_channel(interaction.guild.id)
+            channel_id = await run_db(
+                points_service.get_clan_register_channel, interaction.guild.id
+            )
         except MissingClanRegisterChannelError:
             await _send_message(interaction,
                 embed=_permission_error_embed("通知先チャンネルが未設定です。")
@@ -276,7 +359,9 @@ def register_commands(client: BotClient, *, points_service: PointsService) -> No
             )
             return
         await _defer_if_needed(interaction)
-        points_service.set_clan_register_channel(interaction.guild.id, channel.id)
+        await run_db(
+            points_service.set_clan_register_channel, interaction.guild.id, channel.id
+        )
         embed = discord.Embed(
             title="**クラン登録通知チャンネルを設定しました**",
             description=f"**通知先: {channel.mention}**",
@@ -315,7 +400,9 @@ def register_commands(client: BotClient, *, points_service: PointsService) -> No
             return
         await _defer_if_needed(interaction)
         try:
-            points_service.set_role_buy_price(interaction.guild.id, role.id, price)
+            await run_db(
+                points_service.set_role_buy_price, interaction.guild.id, role.id, price
+            )
         except InvalidPointsError:
             await _send_message(interaction,
                 embed=_permission_error_embed("価格は1以上で指定してください。")
@@ -360,8 +447,8 @@ def register_commands(client: BotClient, *, points_service: PointsService) -> No
             return
         await _defer_if_needed(interaction)
         try:
-            purchase = points_service.validate_role_purchase(
-                interaction.guild.id, role.id, member.id
+            purchase = await run_db(
+                points_service.purchase_role, interaction.guild.id, role.id, member.id
             )
         except RoleNotForSaleError:
             await _send_message(interaction,
@@ -373,22 +460,25 @@ def register_commands(client: BotClient, *, points_service: PointsService) -> No
                 embed=_permission_error_embed("ポイントが足りません。")
             )
             return
-        points_service.charge_role_purchase(
-            interaction.guild.id, member.id, purchase.price
-        )
         try:
             await member.add_roles(role, reason="role buy")
         except discord.Forbidden:
-            points_service.refund_role_purchase(
-                interaction.guild.id, member.id, purchase.price
+            await run_db(
+                points_service.release_role_purchase,
+                interaction.guild.id,
+                member.id,
+                purchase,
             )
             await _send_message(interaction,
                 embed=_permission_error_embed("ロールを付与できませんでした。")
             )
             return
         except discord.HTTPException:
-            points_service.refund_role_purchase(
-                interaction.guild.id, member.id, purchase.price
+            await run_db(
+                points_service.release_role_purchase,
+                interaction.guild.id,
+                member.id,
+                purchase,
             )
             await _send_message(interaction,
                 embed=_permission_error_embed("ロール付与に失敗しました。")
@@ -401,6 +491,571 @@ def register_commands(client: BotClient, *, points_service: PointsService) -> No
         )
         await _send_message(interaction, embed=embed)
 
+    @tree.command(
+        name="points-bulk",
+        description="ロールまたはVCの全員のポイントを一括で増減します（サーバー管理者のみ）",
+    )
+    @app_commands.choices(
+        action=[
+            app_commands.Choice(name="付与", value="grant"),
+            app_commands.Choice(name="剥奪", value="revoke"),
+        ]
+    )
+    async def points_bulk_command(
+        interaction: discord.Interaction,
+        action: app_commands.Choice[str],
+        points: int,
+        role: discord.Role | None = None,
+        voice_channel: discord.VoiceChannel | None = None,
+    ) -> None:
+        if not _is_guild_admin(interaction):
+            await _send_message(interaction,
+                embed=_permission_error_embed("サーバー管理者のみ実行できます。")
+            )
+            return
+        guild = interaction.guild
+        if guild is None:
+            await _send_message(interaction,
+                embed=_permission_error_embed("サーバー内で使用してください。")
+            )
+            return
+        if (role is None) == (voice_channel is None):
+            await _send_message(interaction,
+                embed=_permission_error_embed(
+                    "ロールかボイスチャンネルのどちらか一方を指定してください。"
+                )
+            )
+            return
+        if points <= 0:
+            await _send_message(interaction,
+                embed=_permission_error_embed("ポイントは1以上で指定してください。")
+            )
+            return
+        if role is not None and not client.intents.members:
+            await _send_message(interaction,
+                embed=_permission_error_embed(
+                    "ロール指定には Server Members Intent が必要です。"
+                )
+            )
+            return
+        await _defer_if_needed(interaction)
+        if role is not None:
+            # Works with a voice-only member cache: chunk without caching and
+            # filter the result instead of reading role.members.
+            members = guild.members if guild.chunked else await guild.chunk(cache=False)
+            user_ids = [
+                member.id
+                for member in members
+                if not member.bot and member.get_role(role.id) is not None
+            ]
+            target = role.mention
+        else:
+            user_ids = [
+                user_id
+                for user_id in voice_channel.voice_states
+                if not _is_bot_member(guild, user_id)
+            ]
+            target = voice_channel.mention
+        if not user_ids:
+            await _send_message(interaction,
+                embed=_permission_error_embed("対象のユーザーがいません。")
+            )
+            return
+        if action.value == "grant":
+            affected = await run_db(
+                points_service.grant_points_bulk, guild.id, user_ids, points
+            )
+            title = "**ポイントを一括付与しました**"
+            color = discord.Color.green()
+        else:
+            affected = await run_db(
+                points_service.revoke_points_bulk, guild.id, user_ids, points
+            )
+            title = "**ポイントを一括剥奪しました**"
+            color = discord.Color.red()
+        embed = discord.Embed(
+            title=title,
+            description=f"**対象: {target} / {affected}人 / {points}ポイント**",
+            color=color,
+        )
+        await _send_message(interaction, embed=embed)
+
+    @tree.command(
+        name="points-import",
+        description="CSV(user_id,points)からポイントを取り込みます（サーバー管理者のみ）",
+    )
+    @app_commands.choices(
+        mode=[
+            app_commands.Choice(name="上書き", value="set"),
+            app_commands.Choice(name="加算", value="add"),
+        ]
+    )
+    async def points_import_command(
+        interaction: discord.Interaction,
+        file: discord.Attachment,
+        mode: app_commands.Choice[str],
+    ) -> None:
+        if not _is_guild_admin(interaction):
+            await _send_message(interaction,
+                embed=_permission_error_embed("サーバー管理者のみ実行できます。")
+            )
+            return
+        if interaction.guild is None:
+            await _send_message(interaction,
+                embed=_permission_error_embed("サーバー内で使用してください。")
+            )
+            return
+        if file.size > POINTS_IMPORT_MAX_BYTES:
+            await _send_message(interaction,
+                embed=_permission_error_embed("ファイルが大きすぎます（2MBまで）。")
+            )
+            return
+        await _defer_if_needed(interaction)
+        try:
+            text = (await file.read()).decode("utf-8")
+        except UnicodeDecodeError:
+            await _send_message(interaction,
+                embed=_permission_error_embed("UTF-8のCSVを指定してください。")
+            )
+            return
+        try:
+            result = await run_db(
+                points_service.import_points_csv,
+                interaction.guild.id,
+                text,
+                mode=mode.value,
+            )
+        except InvalidImportError as exc:
+            await _send_message(interaction,
+                embed=_permission_error_embed(f"CSVを取り込めませんでした: {exc}")
+            )
+            return
+        embed = discord.Embed(
+            title="**ポイントを取り込みました**",
+            description=(
+                f"**モード: {mode.name} / {result.rows}行 / 反映: {result.applied}件**"
+            ),
+            color=discord.Color.green(),
+        )
+        await _send_message(interaction, embed=embed)
+
+    @tree.command(
+        name="points-export",
+        description="サーバーのポイントや履歴をファイルに出力します（サーバー管理者のみ）",
+    )
+    @app_commands.choices(
+        source=[
+            app_commands.Choice(name="ポイント残高", value="points"),
+            app_commands.Choice(name="ゲーム履歴", value="game_rounds"),
+            app_commands.Choice(name="ポイント履歴", value="point_events"),
+        ],
+        fmt=[
+            app_commands.Choice(name="CSV", value="csv"),
+            app_commands.Choice(name="NDJSON", value="ndjson"),
+        ],
+    )
+    async def points_export_command(
+        interaction: discord.Interaction,
+        source: app_commands.Choice[str] | None = None,
+        fmt: app_commands.Choice[str] | None = None,
+        compress: bool = False,
+    ) -> None:
+        if not _is_guild_admin(interaction):
+            await _send_message(interaction,
+                embed=_permission_error_embed("サーバー管理者のみ実行できます。")
+            )
+            return
+        guild = interaction.guild
+        if guild is None:
+            await _send_message(interaction,
+                embed=_permission_error_embed("サーバー内で使用してください。")
+            )
+            return
+        await _defer_if_needed(interaction)
+        result = await points_service.export_to_file(
+            guild.id,
+            source=source.value if source is not None else "points",
+            fmt=fmt.value if fmt is not None else "csv",
+            compress=compress,
+            run=run_db,
+        )
+        try:
+            if result.size_bytes > guild.filesize_limit:
+                message = "ファイルが大きすぎます。"
+                if not compress:
+                    message += "compress を有効にしてください。"
+                await _send_message(interaction,
+                    embed=_permission_error_embed(message)
+                )
+                return
+            await _send_message(
+                interaction,
+                f"{result.rows}行を出力しました。",
+                file=discord.File(result.path, filename=result.filename),
+            )
+        finally:
+            result.path.unlink(missing_ok=True)
+
+    @tree.command(
+        name="earning-rules",
+        description="ポイント獲得ルールを表示・変更します（サーバー管理者のみ）",
+    )
+    async def earning_rules_command(
+        interaction: discord.Interaction,
+        message_points: int | None = None,
+        min_message_length: int | None = None,
+        voice_minutes: int | None = None,
+        voice_min_members: int | None = None,
+        voice_allow_muted: bool | None = None,
+    ) -> None:
+        if not _is_guild_admin(interaction):
+            await _send_message(interaction,
+                embed=_permission_error_embed("サーバー管理者のみ実行できます。")
+            )
+            return
+        if interaction.guild is None:
+            await _send_message(interaction,
+                embed=_permission_error_embed("サーバー内で使用してください。")
+            )
+            return
+        await _defer_if_needed(interaction)
+        try:
+            rules = await run_db(
+                points_service.update_earning_rules,
+                interaction.guild.id,
+                message_points=message_points,
+                min_message_length=min_message_length,
+                voice_interval_seconds=(
+                    None if voice_minutes is None else voice_minutes * 60
+                ),
+                voice_min_members=voice_min_members,
+                voice_allow_muted=voice_allow_muted,
+            )
+        except InvalidEarningRuleError as exc:
+            await _send_message(interaction,
+                embed=_permission_error_embed(f"設定できない値です: {exc}")
+            )
+            return
+        await _send_message(interaction, embed=_earning_rules_embed(rules))
+
+    @tree.command(
+        name="earning-channel",
+        description="ポイントを獲得できるチャンネルを設定します（サーバー管理者のみ）",
+    )
+    @app_commands.choices(
+        mode=[
+            app_commands.Choice(name="許可リストに追加", value="allow"),
+            app_commands.Choice(name="拒否リストに追加", value="deny"),
+            app_commands.Choice(name="リストから削除", value="clear"),
+        ]
+    )
+    async def earning_channel_command(
+        interaction: discord.Interaction,
+        channel: discord.abc.GuildChannel,
+        mode: app_commands.Choice[str],
+    ) -> None:
+        if not _is_guild_admin(interaction):
+            await _send_message(interaction,
+                embed=_permission_error_embed("サーバー管理者のみ実行できます。")
+            )
+            return
+        if interaction.guild is None:
+            await _send_message(interaction,
+                embed=_permission_error_embed("サーバー内で使用してください。")
+            )
+            return
+        if channel.guild.id != interaction.guild.id:
+            await _send_message(interaction,
+                embed=_permission_error_embed(
+                    "同じサーバーのチャンネルを指定してください。"
+                )
+            )
+            return
+        await _defer_if_needed(interaction)
+        rules = await run_db(
+            points_service.set_earning_channel,
+            interaction.guild.id,
+            channel.id,
+            mode.value,
+        )
+        await _send_message(interaction, embed=_earning_rules_embed(rules))
+
+    @tree.command(
+        name="earning-role",
+        description="ロールごとのポイント獲得倍率を設定します（サーバー管理者のみ）",
+    )
+    async def earning_role_command(
+        interaction: discord.Interaction, role: discord.Role, multiplier: float
+    ) -> None:
+        if not _is_guild_admin(interaction):
+            await _send_message(interaction,
+                embed=_permission_error_embed("サーバー管理者のみ実行できます。")
+            )
+            return
+        if interaction.guild is None:
+            await _send_message(interaction,
+                embed=_permission_error_embed("サーバー内で使用してください。")
+            )
+            return
+        if role.guild.id != interaction.guild.id:
+            await _send_message(interaction,
+                embed=_permission_error_embed(
+                    "同じサーバーのロールを指定してください。"
+                )
+            )
+            return
+        await _defer_if_needed(interaction)
+        try:
+            rules = await run_db(
+                points_service.set_role_multiplier,
+                interaction.guild.id,
+                role.id,
+                multiplier,
+            )
+        except InvalidEarningRuleError as exc:
+            await _send_message(interaction,
+                embed=_permission_error_embed(f"設定できない値です: {exc}")
+            )
+            return
+        await _send_message(interaction, embed=_earning_rules_embed(rules))
+
+    @tree.command(
+        name="debug-memory",
+        description="Botのメモリ使用状況を表示します（Botの管理者のみ）",
+    )
+    @app_commands.choices(
+        mode=[
+            app_commands.Choice(name="ストア別の件数とサイズ", value="stores"),
+            app_commands.Choice(name="割り当て上位（前回との差分）", value="allocations"),
+            app_commands.Choice(name="割り当て計測を停止", value="stop"),
+        ]
+    )
+    async def debug_memory_command(
+        interaction: discord.Interaction,
+        mode: app_commands.Choice[str] | None = None,
+    ) -> None:
+        if not await _is_bot_operator(client, interaction):
+            await _send_message(interaction,
+                embed=_permission_error_embed("Botの管理者のみ実行できます。")
+            )
+            return
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        if mode is None or mode.value == "stores":
+            lines = client.diagnostics.memory_report()
+        elif mode.value == "stop":
+            if memory_profiler.tracing:
+                memory_profiler.stop()
+                lines = ["tracemalloc を停止しました。"]
+            else:
+                lines = ["tracemalloc は動作していません。"]
+        else:
+            was_tracing = memory_profiler.tracing
+            allocations = await asyncio.to_thread(
+                memory_profiler.top_allocators, DEBUG_MEMORY_TOP_ALLOCATORS
+            )
+            lines = []
+            if not was_tracing:
+                lines.append("tracemalloc を開始しました。以降の割り当てのみ計測されます。")
+            lines.extend(
+                f"{format_bytes(stat.size_bytes)} ({stat.size_diff_bytes:+d}B, "
+                f"{stat.count_diff:+d}) {stat.location}"
+                for stat in allocations
+            )
+        await _send_message(interaction, _code_block(lines), ephemeral=True)
+
+    @tree.command(
+        name="debug-loop",
+        description="イベントループの遅延とブロックした処理を表示します（Botの管理者のみ）",
+    )
+    @app_commands.choices(
+        mode=[
+            app_commands.Choice(name="遅延ヒストグラム", value="summary"),
+            app_commands.Choice(name="直近のブロックのスタック", value="stack"),
+        ]
+    )
+    async def debug_loop_command(
+        interaction: discord.Interaction,
+        mode: app_commands.Choice[str] | None = None,
+    ) -> None:
+        if not await _is_bot_operator(client, interaction):
+            await _send_message(interaction,
+                embed=_permission_error_embed("Botの管理者のみ実行できます。")
+            )
+            return
+        monitor = client.loop_monitor
+        if mode is None or mode.value == "summary":
+            lines = client.diagnostics.loop_report()
+        elif monitor is None:
+            lines = ["ループ監視は無効です（LOOP_LAG_THRESHOLD_MS=0）。"]
+        elif monitor.last_stall is None:
+            lines = ["閾値を超えるブロックはまだ記録されていません。"]
+        else:
+            stall = monitor.last_stall
+            lines = [f"{stall.label} {stall.seconds * 1000:.0f}ms"]
+            lines.extend(stall.stack.splitlines()[-DEBUG_LOOP_STACK_LINES:])
+        await _send_message(interaction, _code_block(lines), ephemeral=True)
+
+
+class _RankView(discord.ui.View):
+    def __init__(
+        self,
+        client: BotClient,
+        points_service: PointsService,
+        *,
+        guild: discord.Guild,
+        owner_id: int,
+    ) -> None:
+        super().__init__(timeout=RANK_VIEW_TIMEOUT_SECONDS)
+        self._client = client
+        self._points_service = points_service
+        self._guild = guild
+        self._owner_id = owner_id
+        # Page starts visited so far; "previous" pops back without an offset.
+        self._history: list[tuple[tuple[int, int] | None, bool, int]] = []
+        self.page = RankPage(entries=[], has_next=False)
+        self.my_rank: RankEntry | None = None
+
+    async def load_first_page(self) -> None:
+        await self._load(None, False, 1)
+        if self.page.stale:
+            return
+        self.my_rank = await self._client.db_executor.run(
+            self._points_service.get_user_rank, self._guild.id, self._owner_id
+        )
+        self.me_button.disabled = self.my_rank is None
+
+    async def _load(
+        self, after: tuple[int, int] | None, inclusive: bool, start_rank: int
+    ) -> None:
+        self.page = await self._client.db_executor.run(
+            self._points_service.get_rank_page,
+            self._guild.id,
+            after=after,
+            inclusive=inclusive,
+            start_rank=start_rank,
+            page_size=RANK_PAGE_SIZE,
+        )
+        self._history.append((after, inclusive, start_rank))
+        self.previous_button.disabled = len(self._history) <= 1
+        self.next_button.disabled = not self.page.has_next
+        self.me_button.disabled = self.my_rank is None
+
+    async def build_embed(self) -> discord.Embed:
+        embed = discord.Embed(title="**ポイントランキング**", color=0x4EF47D)
+        for entry in self.page.entries:
+            name = await _resolve_user_name(self._client, self._guild, entry.user_id)
+            embed.add_field(
+                name=f"{entry.rank}. {name or 'ユーザーが存在しません'}",
+                value=f"{entry.points}ポイント",
+                inline=False,
+            )
+        if self.my_rank is not None:
+            embed.set_footer(
+                text=f"あなたの順位: {self.my_rank.rank}位 ({self.my_rank.points}ポイント)"
+            )
+        elif self.page.stale:
+            embed.set_footer(text="DBに接続できないため、最後に取得したランキングを表示しています。")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id == self._owner_id:
+            return True
+        await interaction.response.send_message(
+            "ランキングを操作できるのはコマンドを実行した人だけです。", ephemeral=True
+        )
+        return False
+
+    async def _show(self, interaction: discord.Interaction) -> None:
+        await interaction.response.edit_message(
+            embed=await self.build_embed(), view=self
+        )
+
+    @discord.ui.button(label="前へ", style=discord.ButtonStyle.secondary)
+    async def previous_button(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ) -> None:
+        self._history.pop()
+        after, inclusive, start_rank = self._history.pop()
+        await self._load(after, inclusive, start_rank)
+        await self._show(interaction)
+
+    @discord.ui.button(label="次へ", style=discord.ButtonStyle.secondary)
+    async def next_button(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ) -> None:
+        last = self.page.entries[-1]
+        await self._load(last.cursor, False, last.rank + 1)
+        await self._show(interaction)
+
+    @discord.ui.button(label="自分の順位", style=discord.ButtonStyle.primary)
+    async def me_button(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ) -> None:
+        self.my_rank = await self._client.db_executor.run(
+            self._points_service.get_user_rank, self._guild.id, self._owner_id
+        )
+        if self.my_rank is None:
+            await interaction.response.send_message(
+                "まだポイントがありません。", ephemeral=True
+            )
+            return
+        await self._load(self.my_rank.cursor, True, self.my_rank.rank)
+        await self._show(interaction)
+
+
+async def _resolve_user_name(
+    client: BotClient, guild: discord.Guild, user_id: int
+) -> str | None:
+    member = guild.get_member(user_id)
+    if member is not None:
+        return member.display_name
+    user = client.get_user(user_id)
+    if user is not None:
+        return user.name
+    try:
+        user = await client.fetch_user(user_id)
+    except discord.HTTPException:
+        return None
+    return user.name
+
+
+def _earning_rules_embed(rules: EarningRules) -> discord.Embed:
+    def channels(ids: frozenset[int]) -> str:
+        return " ".join(f"<#{channel_id}>" for channel_id in sorted(ids)) or "なし"
+
+    roles = " ".join(
+        f"<@&{role_id}> x{multiplier:g}"
+        for role_id, multiplier in sorted(rules.role_multipliers.items())
+    )
+    embed = discord.Embed(title="**ポイント獲得ルール**", color=discord.Color.blue())
+    embed.add_field(
+        name="メッセージ",
+        value=(
+            f"{rules.message_points}ポイント / {rules.min_message_length}文字以上"
+        ),
+        inline=False,
+    )
+    embed.add_field(
+        name="VC",
+        value=(
+            f"{rules.voice_interval_seconds // 60}分ごとに1ポイント / "
+            f"{rules.voice_min_members}人以上 / "
+            f"ミュート中: {'対象' if rules.voice_allow_muted else '対象外'}"
+        ),
+        inline=False,
+    )
+    embed.add_field(name="許可チャンネル", value=channels(rules.allowed_channel_ids))
+    embed.add_field(name="拒否チャンネル", value=channels(rules.denied_channel_ids))
+    embed.add_field(name="ロール倍率", value=roles or "なし", inline=False)
+    return embed
+
+
+def _code_block(lines: list[str], *, limit: int = 1900) -> str:
+    body = "\n".join(lines)
+    if len(body) > limit:
+        body = body[:limit] + "\n..."
+    return f"```\n{body}\n```"
+
 
 def _is_guild_admin(interaction: discord.Interaction) -> bool:
     if interaction.guild is None:
@@ -412,6 +1067,23 @@ def _is_guild_admin(interaction: discord.Interaction) -> bool:
     return perms.administrator or perms.manage_guild
 
 
+async def _is_bot_operator(client: BotClient, interaction: discord.Interaction) -> bool:
+    # Process-wide diagnostics: the application owner (or team), or a server
+    # admin in the development guild.
+    if await client.is_owner(interaction.user):
+        return True
+    return (
+        client.dev_guild_id is not None
+        and interaction.guild_id == client.dev_guild_id
+        and _is_guild_admin(interaction)
+    )
+
+
+def _is_bot_member(guild: discord.Guild, user_id: int) -> bool:
+    member = guild.get_member(user_id)
+    return member is not None and member.bot
+
+
 def _permission_error_embed(message: str) -> discord.Embed:
     return discord.Embed(
         title="**エラー!**",
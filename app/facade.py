@@ -6,18 +6,23 @@ from app.settings import (
     AppConfig,
     DBSettings,
     DiscordSettings,
+    RuntimeSettings,
     load_config,
     load_db_settings,
     load_discord_settings,
+    load_runtime_settings,
 )
 
+
 __all__ = [
     "AppConfig",
     "DBSettings",
     "DiscordSettings",
+    "RuntimeSettings",
     "load_config",
     "load_db_settings",
     "load_discord_settings",
+    "load_runtime_settings",
     "register_commands",
     "create_bot_client",
 ]
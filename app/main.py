@@ -1,12 +1,28 @@
-from app.facade import create_bot_client, load_config
+from data.tracing import get_tracer
+from service.diagnostics.memory import memory_profiler
+from service.diagnostics.startup_profile import startup_profiler
 import sys
 
 
 def main() -> None:
+    startup_profiler.enable_from_env()
+    memory_profiler.enable_from_env()
     try:
-        config = load_config()
-        client = create_bot_client(config)
-        client.run(config.discord_settings.secret_token)
+        # Imported after the profiler is enabled so the import timings cover
+        # discord, supabase and the app modules.
+        with startup_profiler.section("import app.facade"):
+            from app.facade import create_bot_client, load_config
+        with startup_profiler.section("load_config"):
+            config = load_config()
+        with startup_profiler.section("create_bot_client"):
+            client = create_bot_client(config)
+        startup_profiler.report_imports()
+        try:
+            client.run(config.discord_settings.secret_token)
+        finally:
+            get_tracer().shutdown()
+        if client.startup_error is not None:
+            raise client.startup_error
     except Exception as exc:
         print(f"[startup] fatal error: {exc}")
         sys.exit(1)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from urllib.parse import urlparse
 import base64
@@ -10,23 +10,92 @@ import os
 from dotenv import load_dotenv
 
 from app.config import load_token
+from data.database import DEFAULT_POINT_SHARD_COUNT, POINTS_STRATEGIES
+from data.executor import DEFAULT_DB_EXECUTOR_QUEUE, DEFAULT_DB_EXECUTOR_WORKERS
+from data.invalidation import INVALIDATION_BUS_KINDS
+from data.tracing import DEFAULT_OTLP_ENDPOINT, TRACE_EXPORTERS
+from service.diagnostics.loop_monitor import LOOP_LAG_THRESHOLD_SECONDS
+
+# full: discord.py defaults. lean: cache only members in voice, skip guild
+# chunking at startup and keep a small message cache.
+GATEWAY_CACHE_PROFILES = ("full", "lean")
+FULL_PROFILE_MAX_MESSAGES = 1000
+LEAN_PROFILE_MAX_MESSAGES = 100
 
 
 @dataclass(frozen=True, slots=True)
 class DBSettings:
     supabase_url: str
     service_role_key: str
+    points_strategy: str = "direct"
+    point_shard_count: int = DEFAULT_POINT_SHARD_COUNT
+    invalidation_bus: str = "memory"
+    database_dsn: str | None = None
 
 
 @dataclass(frozen=True, slots=True)
 class DiscordSettings:
     secret_token: str
+    dev_guild_id: int | None = None
+    members_intent: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class CacheSettings:
+    profile: str = "full"
+    max_messages: int | None = FULL_PROFILE_MAX_MESSAGES
+
+    @property
+    def voice_members_only(self) -> bool:
+        return self.profile == "lean"
+
+    @property
+    def chunk_guilds_at_startup(self) -> bool | None:
+        # None keeps discord.py's default (chunk when the members intent is on).
+        return False if self.profile == "lean" else None
+
+
+@dataclass(frozen=True, slots=True)
+class TracingSettings:
+    exporter: str = "none"
+    json_path: Path | None = None
+    otlp_endpoint: str = DEFAULT_OTLP_ENDPOINT
+    sample_ratio: float = 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class RuntimeSettings:
+    state_dir: Path = Path(".cache/myami")
+    guild_settings_ttl_seconds: float | None = None
+    loop_lag_threshold_seconds: float | None = LOOP_LAG_THRESHOLD_SECONDS
+    db_executor_workers: int = DEFAULT_DB_EXECUTOR_WORKERS
+    db_executor_queue: int = DEFAULT_DB_EXECUTOR_QUEUE
+    points_read_cache_seconds: float = 0.0
+
+    @property
+    def schema_marker_path(self) -> Path:
+        return self.state_dir / "schema_ready.json"
+
+    @property
+    def command_sync_state_path(self) -> Path:
+        return self.state_dir / "command_sync.json"
+
+    @property
+    def point_spool_path(self) -> Path:
+        return self.state_dir / "point_spool.sqlite3"
+
+    @property
+    def trace_path(self) -> Path:
+        return self.state_dir / "traces.jsonl"
 
 
 @dataclass(frozen=True, slots=True)
 class AppConfig:
     db_settings: DBSettings
     discord_settings: DiscordSettings
+    runtime_settings: RuntimeSettings = field(default_factory=RuntimeSettings)
+    cache_settings: CacheSettings = field(default_factory=CacheSettings)
+    tracing_settings: TracingSettings = field(default_factory=TracingSettings)
 
 
 def _load_env_file(env_file: str | Path | None = None) -> None:
@@ -58,21 +127,54 @@ def describe_db_settings(db_settings: DBSettings) -> dict[str, str | None]:
     return {
         "supabase_host": host,
         "service_role": _get_jwt_role(db_settings.service_role_key),
+        "points_strategy": db_settings.points_strategy,
+        "invalidation_bus": db_settings.invalidation_bus,
     }
 
 
+def _parse_flag(raw: str | None) -> bool:
+    return raw is not None and raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
 def load_discord_settings(
     raw_token: str | None = None,
+    raw_dev_guild_id: str | None = None,
+    raw_members_intent: str | None = None,
 ) -> DiscordSettings:
     token = raw_token if raw_token is not None else load_token()
     if token is None or token.strip() == "":
         raise ValueError("Discord secret token is not provided.")
     secret_token = token.strip()
-    return DiscordSettings(secret_token=secret_token)
+    dev_guild = (
+        raw_dev_guild_id
+        if raw_dev_guild_id is not None
+        else os.getenv("DISCORD_DEV_GUILD_ID")
+    )
+    dev_guild = dev_guild.strip() if dev_guild is not None else ""
+    dev_guild_id = None
+    if dev_guild != "":
+        if not dev_guild.isdigit():
+            raise ValueError("DISCORD_DEV_GUILD_ID must be a numeric guild id.")
+        dev_guild_id = int(dev_guild)
+    members_intent = _parse_flag(
+        raw_members_intent
+        if raw_members_intent is not None
+        else os.getenv("DISCORD_MEMBERS_INTENT")
+    )
+    return DiscordSettings(
+        secret_token=secret_token,
+        dev_guild_id=dev_guild_id,
+        members_intent=members_intent,
+    )
 
 
 def load_db_settings(
-    raw_supabase_url: str | None = None, raw_service_role_key: str | None = None
+    raw_supabase_url: str | None = None,
+    raw_service_role_key: str | None = None,
+    raw_points_strategy: str | None = None,
+    raw_point_shard_count: str | None = None,
+    raw_invalidation_bus: str | None = None,
+    raw_database_dsn: str | None = None,
 ) -> DBSettings:
     supabase_url = (
         raw_supabase_url if raw_supabase_url is not None else os.getenv("SUPABASE_URL")
@@ -98,22 +200,280 @@ def load_db_settings(
             f"but role was '{role}'."
         )
 
-    return DBSettings(supabase_url=supabase_url, service_role_key=service_role_key)
+    points_strategy = (
+        raw_points_strategy
+        if raw_points_strategy is not None
+        else os.getenv("POINTS_STRATEGY", "direct")
+    )
+    points_strategy = points_strategy.strip().lower() or "direct"
+    if points_strategy not in POINTS_STRATEGIES:
+        raise ValueError(
+            "POINTS_STRATEGY must be one of "
+            f"{', '.join(sorted(POINTS_STRATEGIES))}, but was '{points_strategy}'."
+        )
+
+    raw_shard_count = (
+        raw_point_shard_count
+        if raw_point_shard_count is not None
+        else os.getenv("POINTS_SHARD_COUNT")
+    )
+    point_shard_count = DEFAULT_POINT_SHARD_COUNT
+    if raw_shard_count is not None and raw_shard_count.strip() != "":
+        try:
+            point_shard_count = int(raw_shard_count.strip())
+        except ValueError as exc:
+            raise ValueError("POINTS_SHARD_COUNT must be an integer.") from exc
+        if point_shard_count <= 0:
+            raise ValueError("POINTS_SHARD_COUNT must be positive.")
+
+    invalidation_bus = (
+        raw_invalidation_bus
+        if raw_invalidation_bus is not None
+        else os.getenv("INVALIDATION_BUS", "memory")
+    )
+    invalidation_bus = invalidation_bus.strip().lower() or "memory"
+    if invalidation_bus not in INVALIDATION_BUS_KINDS:
+        raise ValueError(
+            "INVALIDATION_BUS must be one of "
+            f"{', '.join(INVALIDATION_BUS_KINDS)}, but was '{invalidation_bus}'."
+        )
+    database_dsn = (
+        raw_database_dsn if raw_database_dsn is not None else os.getenv("SUPABASE_DB_URL")
+    )
+    database_dsn = database_dsn.strip() if database_dsn is not None else ""
+    if invalidation_bus == "postgres" and database_dsn == "":
+        raise ValueError("INVALIDATION_BUS=postgres requires SUPABASE_DB_URL.")
+
+    return DBSettings(
+        supabase_url=supabase_url,
+        service_role_key=service_role_key,
+        points_strategy=points_strategy,
+        point_shard_count=point_shard_count,
+        invalidation_bus=invalidation_bus,
+        database_dsn=database_dsn or None,
+    )
+
+
+def _parse_optional_seconds(raw: str | None, *, name: str) -> float | None:
+    value = raw.strip() if raw is not None else ""
+    if value == "":
+        return None
+    try:
+        seconds = float(value)
+    except ValueError as exc:
+        raise ValueError(f"{name} must be a number of seconds.") from exc
+    if seconds <= 0:
+        raise ValueError(f"{name} must be positive.")
+    return seconds
+
+
+def _parse_loop_lag_threshold(raw: str | None) -> float | None:
+    value = raw.strip() if raw is not None else ""
+    if value == "":
+        return LOOP_LAG_THRESHOLD_SECONDS
+    try:
+        milliseconds = float(value)
+    except ValueError as exc:
+        raise ValueError(
+            "LOOP_LAG_THRESHOLD_MS must be a number of milliseconds."
+        ) from exc
+    if milliseconds < 0:
+        raise ValueError("LOOP_LAG_THRESHOLD_MS must not be negative.")
+    # 0 turns the loop monitor off.
+    return milliseconds / 1000 if milliseconds > 0 else None
+
+
+def _parse_positive_int(raw: str | None, *, name: str, default: int) -> int:
+    value = raw.strip() if raw is not None else ""
+    if value == "":
+        return default
+    try:
+        parsed = int(value)
+    except ValueError as exc:
+        raise ValueError(f"{name} must be an integer.") from exc
+    if parsed <= 0:
+        raise ValueError(f"{name} must be positive.")
+    return parsed
+
+
+def _parse_milliseconds(raw: str | None, *, name: str) -> float:
+    value = raw.strip() if raw is not None else ""
+    if value == "":
+        return 0.0
+    try:
+        milliseconds = float(value)
+    except ValueError as exc:
+        raise ValueError(f"{name} must be a number of milliseconds.") from exc
+    if milliseconds < 0:
+        raise ValueError(f"{name} must not be negative.")
+    return milliseconds / 1000
+
+
+def load_runtime_settings(
+    raw_state_dir: str | None = None,
+    raw_guild_settings_ttl: str | None = None,
+    raw_loop_lag_threshold: str | None = None,
+    raw_db_executor_workers: str | None = None,
+    raw_db_executor_queue: str | None = None,
+    raw_points_read_cache: str | None = None,
+) -> RuntimeSettings:
+    state_dir = (
+        raw_state_dir if raw_state_dir is not None else os.getenv("MYAMI_STATE_DIR")
+    )
+    state_dir = state_dir.strip() if state_dir is not None else ""
+    guild_settings_ttl_seconds = _parse_optional_seconds(
+        raw_guild_settings_ttl
+        if raw_guild_settings_ttl is not None
+        else os.getenv("GUILD_SETTINGS_TTL_SECONDS"),
+        name="GUILD_SETTINGS_TTL_SECONDS",
+    )
+    loop_lag_threshold_seconds = _parse_loop_lag_threshold(
+        raw_loop_lag_threshold
+        if raw_loop_lag_threshold is not None
+        else os.getenv("LOOP_LAG_THRESHOLD_MS")
+    )
+    db_executor_workers = _parse_positive_int(
+        raw_db_executor_workers
+        if raw_db_executor_workers is not None
+        else os.getenv("DB_EXECUTOR_WORKERS"),
+        name="DB_EXECUTOR_WORKERS",
+        default=DEFAULT_DB_EXECUTOR_WORKERS,
+    )
+    db_executor_queue = _parse_positive_int(
+        raw_db_executor_queue
+        if raw_db_executor_queue is not None
+        else os.getenv("DB_EXECUTOR_QUEUE"),
+        name="DB_EXECUTOR_QUEUE",
+        default=DEFAULT_DB_EXECUTOR_QUEUE,
+    )
+    points_read_cache_seconds = _parse_milliseconds(
+        raw_points_read_cache
+        if raw_points_read_cache is not None
+        else os.getenv("POINTS_READ_CACHE_MS"),
+        name="POINTS_READ_CACHE_MS",
+    )
+    return RuntimeSettings(
+        state_dir=Path(state_dir) if state_dir != "" else Path(".cache/myami"),
+        guild_settings_ttl_seconds=guild_settings_ttl_seconds,
+        loop_lag_threshold_seconds=loop_lag_threshold_seconds,
+        db_executor_workers=db_executor_workers,
+        db_executor_queue=db_executor_queue,
+        points_read_cache_seconds=points_read_cache_seconds,
+    )
+
+
+def load_cache_settings(
+    raw_profile: str | None = None,
+    raw_max_messages: str | None = None,
+) -> CacheSettings:
+    profile = (
+        raw_profile
+        if raw_profile is not None
+        else os.getenv("DISCORD_CACHE_PROFILE", "full")
+    )
+    profile = profile.strip().lower() or "full"
+    if profile not in GATEWAY_CACHE_PROFILES:
+        raise ValueError(
+            "DISCORD_CACHE_PROFILE must be one of "
+            f"{', '.join(GATEWAY_CACHE_PROFILES)}, but was '{profile}'."
+        )
+    max_messages: int | None = (
+        LEAN_PROFILE_MAX_MESSAGES if profile == "lean" else FULL_PROFILE_MAX_MESSAGES
+    )
+    raw_max = (
+        raw_max_messages
+        if raw_max_messages is not None
+        else os.getenv("DISCORD_MAX_MESSAGES")
+    )
+    if raw_max is not None and raw_max.strip() != "":
+        try:
+            max_messages = int(raw_max.strip())
+        except ValueError as exc:
+            raise ValueError("DISCORD_MAX_MESSAGES must be an integer.") from exc
+        if max_messages < 0:
+            raise ValueError("DISCORD_MAX_MESSAGES must not be negative.")
+        # 0 disables the message cache entirely.
+        max_messages = max_messages or None
+    return CacheSettings(profile=profile, max_messages=max_messages)
+
+
+def load_tracing_settings(
+    raw_exporter: str | None = None,
+    raw_json_path: str | None = None,
+    raw_otlp_endpoint: str | None = None,
+    raw_sample_ratio: str | None = None,
+) -> TracingSettings:
+    exporter = (
+        raw_exporter
+        if raw_exporter is not None
+        else os.getenv("TRACE_EXPORTER", "none")
+    )
+    exporter = exporter.strip().lower() or "none"
+    if exporter not in TRACE_EXPORTERS:
+        raise ValueError(
+            f"TRACE_EXPORTER must be one of {', '.join(TRACE_EXPORTERS)}, "
+            f"but was '{exporter}'."
+        )
+    json_path = (
+        raw_json_path if raw_json_path is not None else os.getenv("TRACE_JSON_PATH")
+    )
+    json_path = json_path.strip() if json_path is not None else ""
+    otlp_endpoint = (
+        raw_otlp_endpoint
+        if raw_otlp_endpoint is not None
+        else os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+    )
+    otlp_endpoint = otlp_endpoint.strip() if otlp_endpoint is not None else ""
+    raw_ratio = (
+        raw_sample_ratio
+        if raw_sample_ratio is not None
+        else os.getenv("TRACE_SAMPLE_RATIO")
+    )
+    sample_ratio = 1.0
+    if raw_ratio is not None and raw_ratio.strip() != "":
+        try:
+            sample_ratio = float(raw_ratio.strip())
+        except ValueError as exc:
+            raise ValueError("TRACE_SAMPLE_RATIO must be a number.") from exc
+        if not 0.0 <= sample_ratio <= 1.0:
+            raise ValueError("TRACE_SAMPLE_RATIO must be between 0 and 1.")
+    return TracingSettings(
+        exporter=exporter,
+        json_path=Path(json_path) if json_path != "" else None,
+        otlp_endpoint=otlp_endpoint or DEFAULT_OTLP_ENDPOINT,
+        sample_ratio=sample_ratio,
+    )
 
 
 def load_config(env_file: str | Path | None = None) -> AppConfig:
     _load_env_file(env_file)
     discord_settings = load_discord_settings()
     db_settings = load_db_settings()
-    return AppConfig(db_settings=db_settings, discord_settings=discord_settings)
+    runtime_settings = load_runtime_settings()
+    cache_settings = load_cache_settings()
+    tracing_settings = load_tracing_settings()
+    return AppConfig(
+        db_settings=db_settings,
+        discord_settings=discord_settings,
+        runtime_settings=runtime_settings,
+        cache_settings=cache_settings,
+        tracing_settings=tracing_settings,
+    )
 
 
 __all__ = [
     "AppConfig",
+    "CacheSettings",
     "DBSettings",
+    "GATEWAY_CACHE_PROFILES",
     "DiscordSettings",
+    "RuntimeSettings",
+    "TracingSettings",
     "describe_db_settings",
+    "load_cache_settings",
     "load_config",
     "load_db_settings",
     "load_discord_settings",
+    "load_runtime_settings",
+    "load_tracing_settings",
 ]
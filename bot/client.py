@@ -1,15 +1,105 @@
 from __future__ import annotations
 
+import asyncio
+from typing import Any, Callable
+
 import discord
 
+from bot.command_sync import CommandSyncState, sync_command_tree
+from bot.constants import DATABASE_BUSY_MESSAGE
+from bot.handlers.diagnostics_handler import DiagnosticsHandler
+from bot.handlers.maintenance_handler import MaintenanceHandler
 from bot.handlers.message_points_handler import MessagePointsHandler
 from bot.handlers.point_game_handler import PointGameHandler
 from bot.handlers.voice_points_handler import VoicePointsHandler
+from data.async_repository import AsyncPointsRepository
+from data.database import DatabaseBusyError
+from data.executor import DatabaseExecutor
+from data.invalidation import InvalidationBus
+from data.tracing import STATUS_ERROR, STATUS_OK, get_tracer, set_current_span
+from service.cache.guild_settings import GuildSettingsCache
 from service.games.registry import GameRegistry, create_default_registry
+from service.ledger.game_rounds import GameRoundWriter
 from service.random.rng import Rng, SystemRng
+from service.diagnostics.loop_monitor import LoopLagMonitor
+from service.diagnostics.startup_profile import startup_profiler
 from service.time.clock import Clock, SystemClock
 
 
+def _event_attributes(
+    guild: discord.Guild | None, user: discord.abc.User
+) -> dict[str, int]:
+    attributes = {"user.id": user.id}
+    if guild is not None:
+        attributes["guild.id"] = guild.id
+    return attributes
+
+
+def _start_command_span(interaction: discord.Interaction, name: str) -> None:
+    # Ended in on_app_command_completion / on_error; the service, repository
+    # and DB spans of the command nest under it through the task's context.
+    attributes = _event_attributes(interaction.guild, interaction.user)
+    attributes["interaction.id"] = interaction.id
+    span = get_tracer().start_span(f"command /{name}", attributes=attributes)
+    set_current_span(span)
+    interaction.extras["span"] = span
+
+
+def _end_command_span(
+    interaction: discord.Interaction, error: BaseException | None = None
+) -> None:
+    span = interaction.extras.pop("span", None)
+    if span is None:
+        return
+    if error is None:
+        span.set_status(STATUS_OK)
+    else:
+        span.record_exception(error)
+        span.set_status(STATUS_ERROR, type(error).__name__)
+    span.end()
+
+
+async def _reply_ephemeral(interaction: discord.Interaction, content: str) -> None:
+    try:
+        if interaction.response.is_done():
+            await interaction.followup.send(content, ephemeral=True)
+        else:
+            await interaction.response.send_message(content, ephemeral=True)
+    except discord.HTTPException:
+        pass
+
+
+class BotCommandTree(discord.app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        client = self.client
+        command = interaction.command
+        if (
+            command is not None
+            and interaction.type is discord.InteractionType.application_command
+        ):
+            _start_command_span(interaction, command.qualified_name)
+            if isinstance(client, BotClient) and client.loop_monitor is not None:
+                client.loop_monitor.label_current_task(f"/{command.qualified_name}")
+        if isinstance(client, BotClient) and not await client.wait_until_db_ready():
+            _end_command_span(
+                interaction, discord.app_commands.CheckFailure("database not ready")
+            )
+            return False
+        return True
+
+    async def on_error(
+        self,
+        interaction: discord.Interaction,
+        error: discord.app_commands.AppCommandError,
+    ) -> None:
+        _end_command_span(interaction, error)
+        original = getattr(error, "original", error)
+        if isinstance(original, DatabaseBusyError):
+            await _reply_ephemeral(interaction, DATABASE_BUSY_MESSAGE)
+            return
+        await super().on_error(interaction, error)
+
+
 class BotClient(discord.Client):
     def __init__(
         self,
@@ -19,32 +109,147 @@ class BotClient(discord.Client):
         registry: GameRegistry | None = None,
         clock: Clock | None = None,
         rng: Rng | None = None,
+        startup_check: Callable[[], None] | None = None,
+        command_sync_state: CommandSyncState | None = None,
+        dev_guild_id: int | None = None,
+        settings_cache: GuildSettingsCache | None = None,
+        loop_monitor: LoopLagMonitor | None = None,
+        db_executor: DatabaseExecutor | None = None,
+        invalidation_bus: InvalidationBus | None = None,
+        **options: Any,
     ):
-        super().__init__(intents=intents)
-        self.tree = discord.app_commands.CommandTree(self)
+        super().__init__(intents=intents, **options)
+        self.tree = BotCommandTree(self)
         self.points_repo = points_repo
+        self.startup_check = startup_check
+        self.startup_error: Exception | None = None
+        self._startup_task: asyncio.Task[None] | None = None
+        self.command_sync_state = command_sync_state
+        self.dev_guild_id = dev_guild_id
         self.clock = clock or SystemClock()
         self.rng = rng or SystemRng()
         self.registry = registry or create_default_registry()
+        self.settings_cache = settings_cache or GuildSettingsCache(points_repo)
+        self.loop_monitor = loop_monitor
+        self.invalidation_bus = invalidation_bus
+        # Handlers, games and commands reach the sync repository only through
+        # this executor, so a slow database never blocks the event loop.
+        self.db_executor = db_executor or DatabaseExecutor()
+        self.async_repo = AsyncPointsRepository(points_repo, self.db_executor)
+        self.game_rounds = GameRoundWriter(points_repo=self.async_repo)
 
-        self.message_points_handler = MessagePointsHandler(points_repo=points_repo)
-        self.voice_handler = VoicePointsHandler(points_repo=points_repo, clock=self.clock)
+        self.message_points_handler = MessagePointsHandler(
+            points_repo=self.async_repo,
+            settings_cache=self.settings_cache,
+            clock=self.clock,
+        )
+        self.voice_handler = VoicePointsHandler(
+            points_repo=self.async_repo,
+            settings_cache=self.settings_cache,
+            clock=self.clock,
+        )
         self.game_handler = PointGameHandler(
-            points_repo=points_repo,
+            points_repo=self.async_repo,
             registry=self.registry,
             clock=self.clock,
             rng=self.rng,
+            ledger=self.game_rounds,
         )
+        self.maintenance_handler = MaintenanceHandler(points_repo=self.async_repo)
+        self.diagnostics = DiagnosticsHandler(self)
+
+    async def setup_hook(self) -> None:
+        if self.loop_monitor is not None:
+            self.loop_monitor.start()
+        # Runs after the HTTP login; the DB check overlaps the gateway connect.
+        if self.startup_check is not None:
+            self._startup_task = asyncio.create_task(
+                asyncio.to_thread(self.startup_check)
+            )
+        await self._sync_commands()
+
+    async def _sync_commands(self) -> None:
+        guild = None
+        if self.dev_guild_id is not None:
+            guild = discord.Object(id=self.dev_guild_id)
+            self.tree.copy_global_to(guild=guild)
+        try:
+            await sync_command_tree(
+                self.tree,
+                state=self.command_sync_state,
+                application_id=self.application_id,
+                guild=guild,
+            )
+        except discord.HTTPException as exc:
+            print(f"[commands] sync failed: {exc}")
+
+    async def wait_until_db_ready(self) -> bool:
+        if self._startup_task is None:
+            return self.startup_error is None
+        try:
+            await asyncio.shield(self._startup_task)
+        except Exception as exc:
+            if self.startup_error is None:
+                self.startup_error = exc
+                print(f"[startup] DB readiness check failed: {exc}")
+                await self.close()
+            return False
+        return True
 
     async def on_ready(self) -> None:
-        await self.tree.sync()
+        if not await self.wait_until_db_ready():
+            return
+        startup_profiler.mark("ready")
         print(f"ログインしました: {self.user}")
         print("起動完了")
         self.voice_handler.ensure_background_loop(self)
+        self.game_rounds.start()
+        self.maintenance_handler.ensure_background_loop()
+        self.diagnostics.ensure_background_loop()
+
+    async def close(self) -> None:
+        await self.game_rounds.close()
+        self.db_executor.shutdown()
+        if self.invalidation_bus is not None:
+            # Joins the listener and publisher threads; keep it off the loop.
+            await asyncio.to_thread(self.invalidation_bus.close)
+        if self.loop_monitor is not None:
+            self.loop_monitor.stop()
+        await super().close()
+
+    async def on_app_command_completion(
+        self,
+        interaction: discord.Interaction,
+        command: discord.app_commands.Command | discord.app_commands.ContextMenu,
+    ) -> None:
+        _end_command_span(interaction)
 
     async def on_message(self, message: discord.Message) -> None:
-        await self.message_points_handler.handle(message)
-        await self.game_handler.handle_message(message)
+        if not await self.wait_until_db_ready():
+            return
+        with get_tracer().start_as_current_span(
+            "event on_message",
+            attributes=_event_attributes(message.guild, message.author),
+        ):
+            await self.message_points_handler.handle(message)
+            await self.game_handler.handle_message(message)
+
+    async def on_guild_channel_update(
+        self,
+        before: discord.abc.GuildChannel,
+        after: discord.abc.GuildChannel,
+    ) -> None:
+        if getattr(before, "category_id", None) != getattr(after, "category_id", None):
+            self._forget_channel_masks(after.guild.id)
+
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel) -> None:
+        self._forget_channel_masks(channel.guild.id)
+
+    def _forget_channel_masks(self, guild_id: int) -> None:
+        # Cached channel masks include the category; moving a channel stales them.
+        settings = self.settings_cache.peek(guild_id)
+        if settings is not None:
+            settings.earning_policy.index.clear_channels()
 
     async def on_voice_state_update(
         self,
@@ -52,16 +257,56 @@ class BotClient(discord.Client):
         before: discord.VoiceState,
         after: discord.VoiceState,
     ) -> None:
-        await self.voice_handler.handle_state_update(
-            member, before, after, now=self.clock.now()
-        )
+        if not await self.wait_until_db_ready():
+            return
+        with get_tracer().start_as_current_span(
+            "event on_voice_state_update",
+            attributes=_event_attributes(member.guild, member),
+        ):
+            await self.voice_handler.handle_state_update(
+                member, before, after, now=self.clock.now()
+            )
 
 
-def create_client(*, points_repo) -> BotClient:
+def create_client(
+    *,
+    points_repo,
+    startup_check: Callable[[], None] | None = None,
+    command_sync_state: CommandSyncState | None = None,
+    dev_guild_id: int | None = None,
+    members_intent: bool = False,
+    settings_cache: GuildSettingsCache | None = None,
+    voice_members_only: bool = False,
+    chunk_guilds_at_startup: bool | None = None,
+    max_messages: int | None = 1000,
+    loop_monitor: LoopLagMonitor | None = None,
+    db_executor: DatabaseExecutor | None = None,
+    invalidation_bus: InvalidationBus | None = None,
+) -> BotClient:
     intents = discord.Intents.default()
     intents.message_content = True
     intents.voice_states = True
-    return BotClient(intents=intents, points_repo=points_repo)
+    intents.members = members_intent
+    options: dict[str, Any] = {"max_messages": max_messages}
+    if voice_members_only:
+        # Members in voice stay cached; everyone else is resolved on demand.
+        member_cache_flags = discord.MemberCacheFlags.none()
+        member_cache_flags.voice = True
+        options["member_cache_flags"] = member_cache_flags
+    if chunk_guilds_at_startup is not None:
+        options["chunk_guilds_at_startup"] = chunk_guilds_at_startup
+    return BotClient(
+        intents=intents,
+        points_repo=points_repo,
+        startup_check=startup_check,
+        command_sync_state=command_sync_state,
+        dev_guild_id=dev_guild_id,
+        settings_cache=settings_cache,
+        loop_monitor=loop_monitor,
+        db_executor=db_executor,
+        invalidation_bus=invalidation_bus,
+        **options,
+    )
 
 
-__all__ = ["BotClient", "create_client"]
+__all__ = ["BotClient", "BotCommandTree", "create_client"]
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+import hashlib
+import json
+
+import discord
+
+
+def command_tree_payload(
+    tree: discord.app_commands.CommandTree, *, guild: discord.abc.Snowflake | None = None
+) -> list[dict[str, Any]]:
+    payload: list[dict[str, Any]] = []
+    for command in tree.get_commands(guild=guild):
+        try:
+            data = command.to_dict(tree)
+        except TypeError:
+            data = command.to_dict()
+        payload.append(data)
+    payload.sort(key=lambda item: (item.get("type", 1), item.get("name", "")))
+    return payload
+
+
+def command_tree_hash(
+    tree: discord.app_commands.CommandTree, *, guild: discord.abc.Snowflake | None = None
+) -> str:
+    payload = command_tree_payload(tree, guild=guild)
+    encoded = json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class CommandSyncState:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def get(self, key: str) -> str | None:
+        value = self._read().get(key)
+        return value if isinstance(value, str) else None
+
+    def set(self, key: str, digest: str) -> None:
+        data = self._read()
+        data[key] = digest
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(data, sort_keys=True), encoding="utf-8")
+        except OSError as exc:
+            print(f"[commands] sync state write failed: {exc}")
+
+    def _read(self) -> dict[str, Any]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+
+async def sync_command_tree(
+    tree: discord.app_commands.CommandTree,
+    *,
+    state: CommandSyncState | None,
+    application_id: int | None,
+    guild: discord.abc.Snowflake | None = None,
+) -> bool:
+    scope = "global" if guild is None else f"guild:{guild.id}"
+    digest = command_tree_hash(tree, guild=guild)
+    key = f"{application_id}:{scope}"
+    if state is not None and state.get(key) == digest:
+        print(f"[commands] {scope} commands unchanged; sync skipped")
+        return False
+    await tree.sync(guild=guild)
+    if state is not None:
+        state.set(key, digest)
+    print(f"[commands] {scope} commands synced")
+    return True
+
+
+__all__ = [
+    "CommandSyncState",
+    "command_tree_hash",
+    "command_tree_payload",
+    "sync_command_tree",
+]
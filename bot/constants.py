@@ -4,6 +4,8 @@ COMMAND_PREFIXES = ["m.", "myami.", "my."]
 
 CANCEL_WORDS = ["quit", "exit", "中止", "q"]
 
+DATABASE_BUSY_MESSAGE = "ただいま混雑しています。少し待ってからもう一度お試しください。"
+
 JANKEN_LABELS = {
     "rock": "グー",
     "scissors": "チョキ",
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from itertools import chain
+from typing import Any, Iterable
+
+import discord
+from discord.ext import tasks
+
+from data.resilience import LatencyHistogram
+from service.diagnostics.memory import (
+    StoreStats,
+    approx_sizeof_items,
+    current_rss_bytes,
+    format_bytes,
+    memory_profiler,
+    shallow_sizeof_items,
+)
+
+MEMORY_REPORT_MINUTES = 30
+
+
+def _format_ms(seconds: float | None) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.0f}ms"
+
+
+def _histogram_summary(histogram: LatencyHistogram) -> str:
+    return (
+        f"n={histogram.count} p50<={_format_ms(histogram.quantile(0.5))} "
+        f"p99<={_format_ms(histogram.quantile(0.99))} max={_format_ms(histogram.max)}"
+    )
+
+
+def _store(name: str, items: list, *, shallow: bool = False) -> StoreStats:
+    return _store_iter(name, iter(items), len(items), shallow=shallow)
+
+
+def _store_iter(
+    name: str, items: Iterable[Any], count: int, *, shallow: bool = False
+) -> StoreStats:
+    # Only the sampled items are materialized; the sizeof helpers islice them.
+    sizeof = shallow_sizeof_items if shallow else approx_sizeof_items
+    return StoreStats(name=name, entries=count, approx_bytes=sizeof(items, count))
+
+
+def _cached_members(guild: discord.Guild) -> dict[int, discord.Member]:
+    # Guild.members copies the whole cache into a list on every access.
+    return guild._members
+
+
+class DiagnosticsHandler:
+    """Entry counts and approximate sizes of the bot's in-memory stores."""
+
+    def __init__(self, client: discord.Client) -> None:
+        self.client = client
+
+    def store_stats(self) -> list[StoreStats]:
+        client = self.client
+        stats = [
+            _store("voice_sessions", client.voice_handler.sessions.items()),
+            _store("game_sessions", client.game_handler.sessions.items()),
+            _store("game_cooldowns", list(client.game_handler.cooldowns.items())),
+            _store("message_limiter", client.message_points_handler.limiter.items()),
+            _store("game_round_buffer", client.game_rounds.pending()),
+            _store("guild_settings", client.settings_cache.items()),
+        ]
+        for name, items in client.points_repo.cached_reads().items():
+            stats.append(_store(f"repo_{name}", items))
+        # discord.py models reference their guild/state, so only the objects
+        # themselves are counted.
+        guilds = list(client.guilds)
+        stats.append(_store("discord_guilds", guilds, shallow=True))
+        members = [_cached_members(guild) for guild in guilds]
+        stats.append(
+            _store_iter(
+                "discord_members",
+                chain.from_iterable(cache.values() for cache in members),
+                sum(len(cache) for cache in members),
+                shallow=True,
+            )
+        )
+        stats.append(
+            _store(
+                "discord_channels",
+                [channel for guild in guilds for channel in guild.channels],
+                shallow=True,
+            )
+        )
+        stats.append(
+            _store(
+                "discord_roles",
+                [role for guild in guilds for role in guild.roles],
+                shallow=True,
+            )
+        )
+        # Client.users also copies its cache; read the connection state directly.
+        users = client._connection._users
+        stats.append(
+            _store_iter("discord_users", iter(users.values()), len(users), shallow=True)
+        )
+        stats.append(
+            _store("discord_messages", list(client.cached_messages), shallow=True)
+        )
+        return stats
+
+    def memory_report(self) -> list[str]:
+        parts = []
+        rss = current_rss_bytes()
+        if rss is not None:
+            parts.append(f"rss={format_bytes(rss)}")
+        traced = memory_profiler.traced_memory()
+        if traced is not None:
+            current, peak = traced
+            parts.append(f"traced={format_bytes(current)}/peak={format_bytes(peak)}")
+        parts.extend(
+            f"{stat.name}={stat.entries}({format_bytes(stat.approx_bytes)})"
+            for stat in self.store_stats()
+        )
+        return parts
+
+    def memory_log_line(self) -> str:
+        return "[memory] " + " ".join(self.memory_report())
+
+    def executor_line(self) -> str:
+        stats = self.client.db_executor.stats()
+        return (
+            f"db_executor running={stats.running}/{stats.workers} "
+            f"saturation={stats.saturation:.0%} "
+            f"queued={stats.queued}/{stats.max_queue} "
+            f"completed={stats.completed} rejected={stats.rejected} "
+            f"wait {_histogram_summary(stats.wait)}"
+        )
+
+    def read_coalescing_line(self) -> str:
+        stats = self.client.points_repo.read_coalescing_stats()
+        return (
+            f"db_reads queries={stats.leaders} shared={stats.shared} "
+            f"cache_hits={stats.cache_hits} in_flight={stats.in_flight} "
+            f"cached={stats.cached}"
+        )
+
+    def loop_report(self) -> list[str]:
+        lines = []
+        monitor = self.client.loop_monitor
+        if monitor is not None:
+            lines.append(f"lag {_histogram_summary(monitor.lag)}")
+            lines.extend(
+                f"stall {label} {_histogram_summary(histogram)}"
+                for label, histogram in monitor.stall_summary()
+            )
+        lines.append(self.executor_line())
+        lines.append(self.read_coalescing_line())
+        return lines
+
+    def ensure_background_loop(self) -> None:
+        if not self.memory_report_loop.is_running():
+            self.memory_report_loop.start()
+
+    @tasks.loop(minutes=MEMORY_REPORT_MINUTES)
+    async def memory_report_loop(self) -> None:
+        print(self.memory_log_line())
+        for line in self.loop_report():
+            print(f"[loop] {line}")
+
+
+__all__ = ["DiagnosticsHandler"]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from discord.ext import tasks
+
+from data.async_repository import AsyncPointsRepository
+from data.database import DatabaseError
+
+POINTS_COMPACTION_MINUTES = 10
+LEADERBOARD_SNAPSHOT_MINUTES = 60
+SPOOL_REPLAY_SECONDS = 30
+
+
+class MaintenanceHandler:
+    def __init__(self, *, points_repo: AsyncPointsRepository) -> None:
+        self.points_repo = points_repo
+
+    def ensure_background_loop(self) -> None:
+        if not self.compaction_loop.is_running():
+            self.compaction_loop.start()
+        if not self.snapshot_loop.is_running():
+            self.snapshot_loop.start()
+        if not self.spool_replay_loop.is_running():
+            self.spool_replay_loop.start()
+
+    @tasks.loop(minutes=POINTS_COMPACTION_MINUTES)
+    async def compaction_loop(self) -> None:
+        try:
+            folded = await self.points_repo.compact_points()
+        except DatabaseError as exc:
+            print(f"[maintenance] points compaction failed: {exc}")
+            return
+        if folded:
+            print(f"[maintenance] points compaction folded {folded} rows")
+        try:
+            pruned = await self.points_repo.prune_point_requests()
+        except DatabaseError as exc:
+            print(f"[maintenance] point request pruning failed: {exc}")
+            return
+        if pruned:
+            print(f"[maintenance] pruned {pruned} expired point requests")
+
+    @tasks.loop(minutes=LEADERBOARD_SNAPSHOT_MINUTES)
+    async def snapshot_loop(self) -> None:
+        try:
+            changed = await self.points_repo.take_leaderboard_snapshot()
+        except DatabaseError as exc:
+            print(f"[maintenance] leaderboard snapshot failed: {exc}")
+            return
+        if changed:
+            print(f"[maintenance] leaderboard snapshot stored {changed} deltas")
+
+    @tasks.loop(seconds=SPOOL_REPLAY_SECONDS)
+    async def spool_replay_loop(self) -> None:
+        if self.points_repo.spooled_count() == 0:
+            return
+        try:
+            replayed = await self.points_repo.replay_spooled()
+        except DatabaseError as exc:
+            print(f"[maintenance] spool replay paused: {exc}")
+            return
+        if replayed:
+            print(f"[maintenance] replayed {replayed} spooled point deltas")
+
+
+__all__ = ["MaintenanceHandler"]
@@ -2,17 +2,80 @@ from __future__ import annotations
 
 import discord
 
+from data.async_repository import AsyncPointsRepository
+from data.database import DatabaseError, DatabaseUnavailableError
+from service.cache.guild_settings import GuildSettingsCache
+from service.earning.rules import DEFAULT_EARNING_POLICY, EarningPolicy
+from service.sessions.message_limiter import ALLOWED, MessageAwardLimiter
+from service.time.clock import Clock, SystemClock
+
 
 class MessagePointsHandler:
-    def __init__(self, *, points_repo) -> None:
+    def __init__(
+        self,
+        *,
+        points_repo: AsyncPointsRepository,
+        settings_cache: GuildSettingsCache,
+        limiter: MessageAwardLimiter | None = None,
+        clock: Clock | None = None,
+    ) -> None:
         self.points_repo = points_repo
+        self.settings_cache = settings_cache
+        self.limiter = limiter or MessageAwardLimiter()
+        self.clock = clock or SystemClock()
 
     async def handle(self, message: discord.Message) -> None:
         if message.author.bot:
             return
         if message.guild is None:
             return
-        self.points_repo.award_point_for_message(message.guild.id, message.author.id)
+        guild_id = message.guild.id
+        # Only an already-cached policy is consulted before the limiter, so a
+        # spam burst on a cache miss is dropped without touching the DB.
+        cached = self.settings_cache.peek(guild_id)
+        if cached is not None and self._points(cached.earning_policy, message) <= 0:
+            return
+        decision = self.limiter.check(
+            guild_id, message.author.id, message.content, now=self.clock.now()
+        )
+        if decision != ALLOWED:
+            return
+        try:
+            policy = await self._policy(guild_id)
+        except DatabaseError as exc:
+            print(f"[message] earning rules unavailable: {exc}")
+            return
+        points = self._points(policy, message)
+        if points <= 0:
+            return
+        # Keyed on the message id so a redelivered event never pays twice.
+        try:
+            await self.points_repo.award_point_for_message(
+                guild_id,
+                message.author.id,
+                points,
+                request_id=f"message:{message.id}",
+            )
+        except DatabaseError as exc:
+            print(f"[message] point award failed: {exc}")
+
+    @staticmethod
+    def _points(policy: EarningPolicy, message: discord.Message) -> int:
+        return policy.message_points(
+            policy.channel_mask(message.channel),
+            policy.member_mask(message.author),
+            len(message.content.strip()),
+        )
+
+    async def _policy(self, guild_id: int) -> EarningPolicy:
+        try:
+            settings = await self.settings_cache.load(
+                guild_id, self.points_repo.executor.run
+            )
+            return settings.earning_policy
+        except DatabaseUnavailableError:
+            # Keep earning (into the spool) on the default rules during an outage.
+            return DEFAULT_EARNING_POLICY
 
 
 __all__ = ["MessagePointsHandler"]
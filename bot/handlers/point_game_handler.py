@@ -2,10 +2,13 @@ from __future__ import annotations
 
 import discord
 
-from bot.constants import COMMAND_PREFIXES
+from bot.constants import COMMAND_PREFIXES, DATABASE_BUSY_MESSAGE
+from data.async_repository import AsyncPointsRepository
+from data.database import DatabaseBusyError
 from service.games.base import GameContext
 from service.games.registry import GameRegistry
 from service.games.support import is_cancel_message
+from service.ledger.game_rounds import GameRoundWriter
 from service.random.rng import Rng, SystemRng
 from service.sessions.game_sessions import (
     GameInputSession,
@@ -26,13 +29,15 @@ class PointGameHandler:
     def __init__(
         self,
         *,
-        points_repo,
+        points_repo: AsyncPointsRepository,
         registry: GameRegistry,
         clock: Clock | None = None,
         rng: Rng | None = None,
+        ledger: GameRoundWriter | None = None,
     ) -> None:
         self.points_repo = points_repo
         self.registry = registry
+        self.ledger = ledger
         self.clock = clock or SystemClock()
         self.rng = rng or SystemRng()
         self.sessions = GameSessionStore()
@@ -81,7 +86,11 @@ class PointGameHandler:
             return True
 
         context = self._build_context(message)
-        new_session = await game.start(context, args)
+        try:
+            new_session = await game.start(context, args)
+        except DatabaseBusyError:
+            await message.channel.send(DATABASE_BUSY_MESSAGE)
+            return True
         if new_session is not None:
             self.sessions.set(user_id, new_session)
         return True
@@ -117,7 +126,13 @@ class PointGameHandler:
 
         session.last_activity_ts = now
         context = self._build_context(message, now=now)
-        next_session = await game.handle_input(context, message.content, session)
+        try:
+            next_session = await game.handle_input(context, message.content, session)
+        except DatabaseBusyError:
+            # Payouts are never shed, so a busy error means this input took no
+            # bet; the session stays open for the player to retry.
+            await message.channel.send(DATABASE_BUSY_MESSAGE)
+            return True
         if next_session is None:
             self.sessions.pop(message.author.id)
         else:
@@ -164,6 +179,7 @@ class PointGameHandler:
             now=actual_now,
             rng=self.rng,
             clock=self.clock,
+            ledger=self.ledger,
         )
 
 
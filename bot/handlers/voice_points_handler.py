@@ -3,16 +3,33 @@ from __future__ import annotations
 import discord
 from discord.ext import tasks
 
+from data.async_repository import AsyncPointsRepository
+from data.database import DatabaseError, DatabaseUnavailableError
+from data.tracing import get_tracer
+from service.cache.guild_settings import GuildSettingsCache
+from service.earning.rules import (
+    DEFAULT_EARNING_POLICY,
+    DEFAULT_VOICE_INTERVAL_SECONDS,
+    EarningPolicy,
+)
 from service.sessions.voice_sessions import VoiceSession, VoiceSessionStore
 from service.time.clock import Clock, SystemClock
 
-VOICE_POINT_INTERVAL_SECONDS = 7 * 60
+# Default only; each guild's interval comes from its earning rules.
+VOICE_POINT_INTERVAL_SECONDS = DEFAULT_VOICE_INTERVAL_SECONDS
 VOICE_TICK_SECONDS = 60
 
 
 class VoicePointsHandler:
-    def __init__(self, *, points_repo, clock: Clock | None = None) -> None:
+    def __init__(
+        self,
+        *,
+        points_repo: AsyncPointsRepository,
+        settings_cache: GuildSettingsCache,
+        clock: Clock | None = None,
+    ) -> None:
         self.points_repo = points_repo
+        self.settings_cache = settings_cache
         self.clock = clock or SystemClock()
         self.sessions = VoiceSessionStore()
         self._client: discord.Client | None = None
@@ -33,10 +50,13 @@ class VoicePointsHandler:
 
         if after.channel is None:
             if session is not None:
-                self._update_session(session, now=now, accruing=False)
-                self._award_from_session(user_id, session)
-                self.sessions.pop(user_id)
+                await self._close_session(user_id, session, now=now)
         else:
+            if session is not None and session.guild_id != member.guild.id:
+                # A session kept after a failed award belongs to another guild.
+                await self._close_session(user_id, session, now=now)
+                session = None
+            rate = await self._accrual_rate(member.guild, user_id, after, member=member)
             if session is None:
                 self.sessions.set(
                     user_id,
@@ -45,15 +65,14 @@ class VoicePointsHandler:
                         channel_id=after.channel.id,
                         last_ts=now,
                         carry_seconds=0.0,
-                        accruing=self._is_voice_eligible(after),
+                        accruing=rate > 0,
+                        rate=rate,
                     ),
                 )
             else:
                 session.channel_id = after.channel.id
-                self._update_session(
-                    session, now=now, accruing=self._is_voice_eligible(after)
-                )
-                self._award_from_session(user_id, session)
+                self._update_session(session, now=now, rate=rate)
+                await self._award_from_session(user_id, session)
 
         affected_channels: set[discord.VoiceChannel] = set()
         if before.channel is not None:
@@ -61,7 +80,7 @@ class VoicePointsHandler:
         if after.channel is not None:
             affected_channels.add(after.channel)
         if affected_channels:
-            self._refresh_voice_channels(
+            await self._refresh_voice_channels(
                 affected_channels, now=now, exclude_user_id=user_id
             )
 
@@ -69,23 +88,19 @@ class VoicePointsHandler:
         for user_id, session in self.sessions.items():
             guild = client.get_guild(session.guild_id)
             if guild is None:
-                self.sessions.pop(user_id)
-                continue
-            member = guild.get_member(user_id)
-            if member is None or member.voice is None:
-                self._update_session(session, now=now, accruing=False)
-                self._award_from_session(user_id, session)
-                self.sessions.pop(user_id)
+                await self._close_session(user_id, session, now=now)
                 continue
-            state = member.voice
-            if state.channel is None:
-                self._update_session(session, now=now, accruing=False)
-                self._award_from_session(user_id, session)
-                self.sessions.pop(user_id)
+            state = self._find_voice_state(guild, user_id, session.channel_id)
+            if state is None or state.channel is None:
+                await self._close_session(user_id, session, now=now)
                 continue
             session.channel_id = state.channel.id
-            self._update_session(session, now=now, accruing=self._is_voice_eligible(state))
-            self._award_from_session(user_id, session)
+            self._update_session(
+                session,
+                now=now,
+                rate=await self._accrual_rate(guild, user_id, state),
+            )
+            await self._award_from_session(user_id, session)
 
     def ensure_background_loop(self, client: discord.Client) -> None:
         self._client = client
@@ -96,32 +111,106 @@ class VoicePointsHandler:
     async def voice_award_loop(self) -> None:
         if self._client is None:
             return
-        await self.tick(self._client, now=self.clock.now())
+        with get_tracer().start_as_current_span("loop voice_tick"):
+            await self.tick(self._client, now=self.clock.now())
+
+    @staticmethod
+    def _find_voice_state(
+        guild: discord.Guild, user_id: int, channel_id: int
+    ) -> discord.VoiceState | None:
+        # Voice states are kept even when the member cache is limited, so the
+        # session's channel is checked first and the member only as a fallback.
+        channel = guild.get_channel(channel_id)
+        voice_states = getattr(channel, "voice_states", None)
+        if voice_states is not None:
+            state = voice_states.get(user_id)
+            if state is not None:
+                return state
+        member = guild.get_member(user_id)
+        return None if member is None else member.voice
+
+    async def _policy(self, guild_id: int) -> EarningPolicy:
+        try:
+            settings = await self.settings_cache.load(
+                guild_id, self.points_repo.executor.run
+            )
+            return settings.earning_policy
+        except DatabaseUnavailableError:
+            return DEFAULT_EARNING_POLICY
 
     @staticmethod
-    def _is_voice_eligible(state: discord.VoiceState | None) -> bool:
+    def _is_voice_eligible(
+        state: discord.VoiceState | None, policy: EarningPolicy
+    ) -> bool:
         if state is None or state.channel is None:
             return False
-        if state.mute or state.self_mute:
-            return False
-        return len(state.channel.members) >= 2
+        channel = state.channel
+        return policy.voice_eligible(
+            state.mute or state.self_mute,
+            len(channel.voice_states),
+            policy.channel_mask(channel),
+        )
+
+    async def _accrual_rate(
+        self,
+        guild: discord.Guild,
+        user_id: int,
+        state: discord.VoiceState | None,
+        *,
+        member: discord.Member | None = None,
+    ) -> float:
+        # 0 stops accrual; role multipliers scale how fast time accrues.
+        try:
+            policy = await self._policy(guild.id)
+        except DatabaseError as exc:
+            print(f"[voice] earning rules unavailable: {exc}")
+            return 0.0
+        if not self._is_voice_eligible(state, policy):
+            return 0.0
+        if not policy.uses_roles:
+            return 1.0
+        if member is None:
+            member = guild.get_member(user_id)
+        return policy.role_multiplier(policy.member_mask(member))
 
     @staticmethod
-    def _update_session(session: VoiceSession, *, now: float, accruing: bool) -> None:
+    def _update_session(session: VoiceSession, *, now: float, rate: float) -> None:
         elapsed = max(0.0, now - session.last_ts)
         if session.accruing:
-            session.carry_seconds += elapsed
+            session.carry_seconds += elapsed * session.rate
         session.last_ts = now
-        session.accruing = accruing
+        session.accruing = rate > 0
+        session.rate = rate
 
-    def _award_from_session(self, user_id: int, session: VoiceSession) -> None:
-        if session.carry_seconds < VOICE_POINT_INTERVAL_SECONDS:
-            return
-        points = int(session.carry_seconds // VOICE_POINT_INTERVAL_SECONDS)
-        session.carry_seconds -= points * VOICE_POINT_INTERVAL_SECONDS
-        self.points_repo.add_points(session.guild_id, user_id, points)
+    async def _close_session(
+        self, user_id: int, session: VoiceSession, *, now: float
+    ) -> None:
+        self._update_session(session, now=now, rate=0.0)
+        # A failed award keeps the (no longer accruing) session so the next
+        # tick retries it instead of dropping the carried time.
+        if await self._award_from_session(user_id, session):
+            self.sessions.pop(user_id)
+
+    async def _award_from_session(self, user_id: int, session: VoiceSession) -> bool:
+        try:
+            interval = (await self._policy(session.guild_id)).voice_interval_seconds
+        except DatabaseError:
+            interval = VOICE_POINT_INTERVAL_SECONDS
+        if session.carry_seconds < interval:
+            return True
+        points = int(session.carry_seconds // interval)
+        try:
+            await self.points_repo.add_points(
+                session.guild_id, user_id, points, kind="voice"
+            )
+        except DatabaseError as exc:
+            # Keep the time so the award is retried on the next tick.
+            print(f"[voice] point award failed: {exc}")
+            return False
+        session.carry_seconds -= points * interval
+        return True
 
-    def _refresh_voice_channels(
+    async def _refresh_voice_channels(
         self,
         channels: set[discord.abc.Connectable],
         *,
@@ -129,36 +218,33 @@ class VoicePointsHandler:
         exclude_user_id: int | None = None,
     ) -> None:
         for channel in channels:
-            for channel_member in channel.members:
-                if channel_member.bot:
-                    continue
-                if exclude_user_id is not None and channel_member.id == exclude_user_id:
+            guild = channel.guild
+            # voice_states covers everyone connected even when their Member
+            # object is not cached; the member is only looked up for bot checks.
+            for user_id, state in list(channel.voice_states.items()):
+                if exclude_user_id is not None and user_id == exclude_user_id:
                     continue
-                state = channel_member.voice
-                if state is None or state.channel is None:
-                    session = self.sessions.get(channel_member.id)
-                    if session is None:
-                        continue
-                    self._update_session(session, now=now, accruing=False)
-                    self._award_from_session(channel_member.id, session)
-                    self.sessions.pop(channel_member.id)
+                member = guild.get_member(user_id)
+                if member is not None and member.bot:
                     continue
-                session = self.sessions.get(channel_member.id)
+                session = self.sessions.get(user_id)
+                rate = await self._accrual_rate(guild, user_id, state, member=member)
                 if session is None:
                     self.sessions.set(
-                        channel_member.id,
+                        user_id,
                         VoiceSession(
-                            guild_id=channel_member.guild.id,
-                            channel_id=state.channel.id,
+                            guild_id=guild.id,
+                            channel_id=channel.id,
                             last_ts=now,
                             carry_seconds=0.0,
-                            accruing=self._is_voice_eligible(state),
+                            accruing=rate > 0,
+                            rate=rate,
                         ),
                     )
                     continue
-                session.channel_id = state.channel.id
-                self._update_session(session, now=now, accruing=self._is_voice_eligible(state))
-                self._award_from_session(channel_member.id, session)
+                session.channel_id = channel.id
+                self._update_session(session, now=now, rate=rate)
+                await self._award_from_session(user_id, session)
 
 
 __all__ = ["VoicePointsHandler"]
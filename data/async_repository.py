@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from typing import Any
+import asyncio
+import contextvars
+import uuid
+
+from data.database import DatabaseBusyError
+from data.executor import DatabaseExecutor
+from data.repository import PointsReading, PointsRepository
+
+
+class PointsBatcher:
+    """DataLoader-style batching of balance reads.
+
+    ``load`` calls made in the same event-loop iteration are collected per
+    guild and answered by one ``get_points_many`` on the executor. Repeated
+    keys share a single future; a lone key goes through ``get_points`` so it
+    keeps that method's request coalescing.
+    """
+
+    def __init__(self, repo: PointsRepository, executor: DatabaseExecutor) -> None:
+        self.repo = repo
+        self.executor = executor
+        self._pending: dict[int, dict[int, asyncio.Future[int | None]]] = {}
+        self._scheduled = False
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def load(self, guild_id: int, user_id: int) -> int | None:
+        loop = asyncio.get_running_loop()
+        batch = self._pending.setdefault(guild_id, {})
+        future = batch.get(user_id)
+        if future is None:
+            future = batch[user_id] = loop.create_future()
+        if not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._dispatch)
+        # One caller giving up must not cancel the read for the others.
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        pending, self._pending = self._pending, {}
+        self._scheduled = False
+        for guild_id, batch in pending.items():
+            # Fresh context: the batch span must not nest under whichever
+            # caller happened to schedule the dispatch.
+            task = loop.create_task(
+                self._load_batch(guild_id, batch),
+                name="points-batch",
+                context=contextvars.Context(),
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _load_batch(
+        self, guild_id: int, batch: dict[int, asyncio.Future[int | None]]
+    ) -> None:
+        user_ids = list(batch)
+        try:
+            if len(user_ids) == 1:
+                points = {
+                    user_ids[0]: await self.executor.run(
+                        self.repo.get_points, guild_id, user_ids[0]
+                    )
+                }
+            else:
+                points = await self.executor.run(
+                    self.repo.get_points_many, guild_id, user_ids
+                )
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as exc:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for user_id, future in batch.items():
+            if not future.done():
+                future.set_result(points.get(user_id))
+
+
+class AsyncPointsRepository:
+    """Awaitable ``PointsRepository``: every call runs on the DB executor."""
+
+    def __init__(self, repo: PointsRepository, executor: DatabaseExecutor) -> None:
+        self.repo = repo
+        self.executor = executor
+        self.points_batcher = PointsBatcher(repo, executor)
+
+    async def get_points(self, guild_id: int, user_id: int) -> int | None:
+        return await self.points_batcher.load(guild_id, user_id)
+
+    async def get_points_many(
+        self, guild_id: int, user_ids: list[int]
+    ) -> dict[int, int | None]:
+        return await self.executor.run(self.repo.get_points_many, guild_id, user_ids)
+
+    async def read_points(self, guild_id: int, user_id: int) -> PointsReading:
+        return await self.executor.run(self.repo.read_points, guild_id, user_id)
+
+    async def get_user_points(self, guild_id: int, user_id: int) -> int | None:
+        return await self.get_points(guild_id, user_id)
+
+    async def add_points(
+        self,
+        guild_id: int,
+        user_id: int,
+        delta: int,
+        *,
+        kind: str = "adjust",
+        request_id: str | None = None,
+        shed: bool = True,
+    ) -> int:
+        request_id = request_id or uuid.uuid4().hex
+        try:
+            return await self.executor.run(
+                self.repo.add_points,
+                guild_id,
+                user_id,
+                delta,
+                kind=kind,
+                request_id=request_id,
+                shed=shed,
+            )
+        except DatabaseBusyError:
+            if not self.repo.can_spool(kind):
+                raise
+            # Shed earnings take the outage path: a local SQLite append that
+            # the maintenance loop replays with the same request id.
+            return self.repo.spool_points(
+                guild_id, user_id, delta, kind=kind, request_id=request_id
+            )
+
+    async def award_point_for_message(
+        self,
+        guild_id: int,
+        user_id: int,
+        points: int = 1,
+        *,
+        request_id: str | None = None,
+    ) -> int:
+        return await self.add_points(
+            guild_id, user_id, points, kind="message", request_id=request_id
+        )
+
+    async def top_rank(self, guild_id: int, limit: int = 10) -> list[dict[str, Any]]:
+        return await self.executor.run(self.repo.top_rank, guild_id, limit)
+
+    async def record_game_rounds(self, rows: list[dict[str, Any]]) -> None:
+        await self.executor.run(self.repo.record_game_rounds, rows)
+
+    async def compact_points(self) -> int:
+        return await self.executor.run(self.repo.compact_points)
+
+    async def prune_point_requests(self) -> int:
+        return await self.executor.run(self.repo.prune_point_requests)
+
+    async def take_leaderboard_snapshot(self) -> int:
+        return await self.executor.run(self.repo.take_leaderboard_snapshot)
+
+    async def replay_spooled(self) -> int:
+        return await self.executor.run(self.repo.replay_spooled)
+
+    def spooled_count(self) -> int:
+        # Local SQLite counter; no DB round trip.
+        return self.repo.spooled_count()
+
+
+__all__ = ["AsyncPointsRepository", "PointsBatcher"]
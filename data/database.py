@@ -1,17 +1,164 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from typing import Any
+import time
+import uuid
 
 from supabase import Client, create_client
 
+from data.invalidation import InvalidationBus, guild_settings_key, points_key
+from data.resilience import (
+    CircuitBreaker,
+    DatabaseMetrics,
+    RetryPolicy,
+    is_transient_error,
+)
+from data.tracing import NonRecordingSpan, Span, get_tracer
+
+POINT_EVENT_KINDS = (
+    "message",
+    "voice",
+    "game",
+    "transfer",
+    "remove",
+    "role_purchase",
+    "adjust",
+)
+
+DEFAULT_POINT_SHARD_COUNT = 8
+
+POINT_IMPORT_MODES = ("set", "add")
+
+# User ids per get_points_many request. The direct strategy sends them in the
+# query string, so this keeps the URL well under common 8 KB limits.
+POINTS_MANY_CHUNK_SIZE = 200
+
+# undefined_table / undefined_function and their PostgREST schema-cache misses.
+SCHEMA_MISSING_CODES = frozenset({"42P01", "42883", "PGRST202", "PGRST205"})
+
 
 class DatabaseError(RuntimeError):
+    def __init__(self, message: str, *, code: str | None = None) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+class DatabaseUnavailableError(DatabaseError):
+    """Transient failures exhausted the retries, or the circuit is open."""
+
+
+class CircuitOpenError(DatabaseUnavailableError):
     pass
 
 
+class DatabaseBusyError(DatabaseUnavailableError):
+    """The DB executor's queue is full; the request was shed without being sent."""
+
+
+@dataclass(frozen=True, slots=True)
+class PointsStrategy:
+    name: str
+    add_rpc: str
+    transfer_rpc: str
+    balance_source: str
+    balance_rpc: str | None = None
+    compact_rpc: str | None = None
+    records_kind: bool = False
+    uses_shards: bool = False
+
+
+POINTS_STRATEGIES: dict[str, PointsStrategy] = {
+    "direct": PointsStrategy(
+        name="direct",
+        add_rpc="add_points",
+        transfer_rpc="transfer_points",
+        balance_source="points",
+    ),
+    "journal": PointsStrategy(
+        name="journal",
+        add_rpc="journal_add_points",
+        transfer_rpc="journal_transfer_points",
+        balance_source="point_journal_balances",
+        balance_rpc="journal_get_points",
+        compact_rpc="compact_point_events",
+        records_kind=True,
+    ),
+    "sharded": PointsStrategy(
+        name="sharded",
+        add_rpc="sharded_add_points",
+        transfer_rpc="sharded_transfer_points",
+        balance_source="point_sharded_balances",
+        balance_rpc="sharded_get_points",
+        compact_rpc="merge_point_shards",
+        uses_shards=True,
+    ),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ExportSource:
+    name: str
+    # None reads from the active strategy's balance source.
+    table: str | None
+    key: str
+    columns: tuple[str, ...]
+
+
+EXPORT_SOURCES: dict[str, ExportSource] = {
+    "points": ExportSource(
+        name="points", table=None, key="user_id", columns=("user_id", "points")
+    ),
+    "game_rounds": ExportSource(
+        name="game_rounds",
+        table="game_rounds",
+        key="id",
+        columns=("id", "user_id", "game", "bet", "payout", "outcome", "ts"),
+    ),
+    "point_events": ExportSource(
+        name="point_events",
+        table="point_events",
+        key="id",
+        columns=("id", "user_id", "kind", "delta", "created_at"),
+    ),
+}
+
+
 class Database:
-    def __init__(self, *, url: str, service_role_key: str):
+    def __init__(
+        self,
+        *,
+        url: str,
+        service_role_key: str,
+        points_strategy: str = "direct",
+        point_shard_count: int = DEFAULT_POINT_SHARD_COUNT,
+        invalidation_bus: InvalidationBus | None = None,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+    ):
+        strategy = POINTS_STRATEGIES.get(points_strategy)
+        if strategy is None:
+            raise DatabaseError(f"unknown points strategy: {points_strategy}")
+        if point_shard_count <= 0:
+            raise DatabaseError("point shard count must be positive")
         self._client: Client = create_client(url, service_role_key)
+        self._strategy = strategy
+        self._point_shard_count = point_shard_count
+        self._bus = invalidation_bus
+        self._retry = retry_policy or RetryPolicy()
+        self._breaker = circuit_breaker or CircuitBreaker()
+        self.metrics = DatabaseMetrics()
+
+    @property
+    def points_strategy(self) -> str:
+        return self._strategy.name
+
+    def _publish(self, *keys: str) -> None:
+        if self._bus is None:
+            return
+        for key in keys:
+            self._bus.publish(key)
 
     @staticmethod
     def _format_error(error: Any) -> str:
@@ -24,9 +171,10 @@ class Database:
 
     @staticmethod
     def _is_schema_missing(error: Any) -> bool:
-        message = Database._format_error(error)
-        lowered = message.lower()
-        return "does not exist" in lowered and "points" in lowered
+        code = getattr(error, "code", None)
+        if code is None and isinstance(error, dict):
+            code = error.get("code")
+        return code in SCHEMA_MISSING_CODES
 
     @staticmethod
     def _extract_scalar(data: Any) -> Any:
@@ -46,25 +194,130 @@ class Database:
         error = getattr(response, "error", None)
         if error:
             message = Database._format_error(error)
-            raise DatabaseError(f"{context} failed: {message}")
+            raise DatabaseError(
+                f"{context} failed: {message}", code=getattr(error, "code", None)
+            )
         return getattr(response, "data", None)
 
-    def check_connection(self) -> bool:
-        response = (
-            self._client.table("points").select("user_id").limit(1).execute()
+    @property
+    def circuit_state(self) -> str:
+        return self._breaker.state
+
+    def _call(self, request: Any, *, context: str, retry: bool = True) -> Any:
+        with get_tracer().start_as_current_span(
+            f"db {context}",
+            attributes={"db.system": "postgresql", "db.operation": context},
+        ) as span:
+            return self._execute(request, span, context=context, retry=retry)
+
+    def _execute(
+        self,
+        request: Any,
+        span: Span | NonRecordingSpan,
+        *,
+        context: str,
+        retry: bool,
+    ) -> Any:
+        # Only idempotent requests may pass retry=True: a timed-out write may
+        # still have been applied.
+        if not self._breaker.allow():
+            self.metrics.record(context, "circuit_open")
+            raise CircuitOpenError(f"{context} skipped: database circuit is open")
+        attempts = self._retry.max_attempts if retry else 1
+        attempt = 1
+        while True:
+            try:
+                response = request.execute()
+            except Exception as exc:
+                code = getattr(exc, "code", None)
+                code = code if isinstance(code, str) else None
+                if not is_transient_error(exc):
+                    self._breaker.record_success()
+                    self.metrics.record(context, "error")
+                    message = self._format_error(exc)
+                    raise DatabaseError(f"{context} failed: {message}", code=code) from exc
+                self._breaker.record_failure()
+                if attempt < attempts and self._breaker.allow():
+                    self.metrics.record(context, "retry")
+                    span.add_event("retry", {"attempt": attempt, "error": str(exc)})
+                    time.sleep(self._retry.backoff(attempt))
+                    attempt += 1
+                    continue
+                self.metrics.record(context, "failed")
+                raise DatabaseUnavailableError(
+                    f"{context} failed: {exc}", code=code
+                ) from exc
+            self._breaker.record_success()
+            try:
+                data = self._unwrap(response, context=context)
+            except DatabaseError:
+                self.metrics.record(context, "error")
+                raise
+            self.metrics.record(context, "ok")
+            span.set_attribute("db.attempts", attempt)
+            return data
+
+    def _run_point_request(
+        self,
+        operation: str,
+        params: dict[str, Any],
+        *,
+        request_id: str | None,
+        context: str,
+    ) -> Any:
+        # The request id is fixed before the first attempt, so a retry after a
+        # timeout replays the stored result instead of applying the write twice.
+        request = self._client.rpc(
+            "run_point_request",
+            {
+                "p_request_id": request_id or uuid.uuid4().hex,
+                "p_operation": operation,
+                "p_params": params,
+            },
         )
-        error = getattr(response, "error", None)
-        if error:
-            if self._is_schema_missing(error):
+        result = self._extract_scalar(self._call(request, context=context))
+        if not isinstance(result, dict):
+            return result
+        if result.get("replayed"):
+            self.metrics.record(context, "replayed")
+        return result.get("value")
+
+    def prune_point_requests(self) -> int:
+        request = self._client.rpc("prune_point_requests")
+        value = self._extract_scalar(self._call(request, context="prune_point_requests"))
+        return 0 if value is None else int(value)
+
+    def check_connection(self) -> bool:
+        request = self._client.table("points").select("user_id").limit(1)
+        try:
+            self._call(request, context="db connection check")
+        except DatabaseError as exc:
+            if self._is_schema_missing(exc):
                 return False
-            message = self._format_error(error)
-            raise DatabaseError(f"db connection check failed: {message}")
+            raise
         return True
 
+    def get_schema_version(self) -> int | None:
+        request = (
+            self._client.table("schema_version")
+            .select("version")
+            .order("version", desc=True)
+            .limit(1)
+        )
+        try:
+            data = self._call(request, context="get_schema_version")
+        except DatabaseError as exc:
+            if self._is_schema_missing(exc):
+                return None
+            raise
+        if not data:
+            return 0
+        return int(data[0]["version"])
+
     def ensure_schema(self) -> None:
-        response = self._client.rpc("ensure_points_schema").execute()
+        request = self._client.rpc("ensure_points_schema")
         try:
-            self._unwrap(response, context="ensure_points_schema")
+            self._call(request, context="ensure_points_schema")
         except DatabaseError as exc:
             raise DatabaseError(
                 "ensure_points_schema failed. Run the SQL setup in "
@@ -72,150 +325,469 @@ class Database:
             ) from exc
 
     def ensure_user(self, guild_id: int, user_id: int) -> None:
-        response = (
+        request = (
             self._client.table("points")
             .upsert(
                 {"guild_id": guild_id, "user_id": user_id, "points": 0},
                 on_conflict="guild_id,user_id",
             )
-            .execute()
         )
-        self._unwrap(response, context="ensure_user")
+        self._call(request, context="ensure_user")
 
     def get_points(self, guild_id: int, user_id: int) -> int | None:
-        response = (
-            self._client.table("points")
+        if self._strategy.balance_rpc is not None:
+            request = self._client.rpc(
+                self._strategy.balance_rpc,
+                {"p_guild_id": guild_id, "p_user_id": user_id},
+            )
+            data = self._call(request, context="get_points")
+            value = self._extract_scalar(data)
+            return None if value is None else int(value)
+        request = (
+            self._client.table(self._strategy.balance_source)
             .select("points")
             .eq("guild_id", guild_id)
             .eq("user_id", user_id)
             .limit(1)
-            .execute()
         )
-        data = self._unwrap(response, context="get_points")
+        data = self._call(request, context="get_points")
         if not data:
             return None
         return int(data[0]["points"])
 
-    def add_points(self, guild_id: int, user_id: int, delta: int) -> int:
-        response = self._client.rpc(
-            "add_points",
-            {"p_guild_id": guild_id, "p_user_id": user_id, "p_delta": delta},
-        ).execute()
-        data = self._unwrap(response, context="add_points")
+    def get_points_many(
+        self, guild_id: int, user_ids: list[int]
+    ) -> dict[int, int | None]:
+        user_ids = list(dict.fromkeys(user_ids))
+        points: dict[int, int | None] = dict.fromkeys(user_ids)
+        for start in range(0, len(user_ids), POINTS_MANY_CHUNK_SIZE):
+            chunk = user_ids[start : start + POINTS_MANY_CHUNK_SIZE]
+            if self._strategy.balance_rpc is not None:
+                request = self._client.rpc(
+                    "get_points_many",
+                    {
+                        "p_guild_id": guild_id,
+                        "p_user_ids": chunk,
+                        "p_strategy": self._strategy.name,
+                    },
+                )
+            else:
+                request = (
+                    self._client.table(self._strategy.balance_source)
+                    .select("user_id, points")
+                    .eq("guild_id", guild_id)
+                    .in_("user_id", chunk)
+                )
+            for row in self._call(request, context="get_points_many") or []:
+                points[int(row["user_id"])] = int(row["points"])
+        return points
+
+    def add_points(
+        self,
+        guild_id: int,
+        user_id: int,
+        delta: int,
+        *,
+        kind: str = "adjust",
+        request_id: str | None = None,
+    ) -> int:
+        value = self._run_point_request(
+            self._strategy.add_rpc,
+            self._add_points_params(guild_id, user_id, delta, kind=kind),
+            request_id=request_id,
+            context="add_points",
+        )
+        self._publish(points_key(guild_id, user_id))
+        return 0 if value is None else int(value)
+
+    def _add_points_params(
+        self, guild_id: int, user_id: int, delta: int, *, kind: str
+    ) -> dict[str, Any]:
+        params: dict[str, Any] = {
+            "p_guild_id": guild_id,
+            "p_user_id": user_id,
+            "p_delta": delta,
+        }
+        if self._strategy.records_kind:
+            params["p_kind"] = kind
+        if self._strategy.uses_shards:
+            params["p_shard_count"] = self._point_shard_count
+        return params
+
+    def replay_point_requests(self, deltas: list[dict[str, Any]]) -> int:
+        if not deltas:
+            return 0
+        requests = [
+            {
+                "request_id": delta["request_id"],
+                "operation": self._strategy.add_rpc,
+                "params": self._add_points_params(
+                    delta["guild_id"], delta["user_id"], delta["delta"], kind=delta["kind"]
+                ),
+            }
+            for delta in deltas
+        ]
+        request = self._client.rpc("replay_point_requests", {"p_requests": requests})
+        value = self._extract_scalar(self._call(request, context="replay_point_requests"))
+        self._publish(
+            *dict.fromkeys(
+                points_key(delta["guild_id"], delta["user_id"]) for delta in deltas
+            )
+        )
+        return 0 if value is None else int(value)
+
+    def bulk_add_points(
+        self, guild_id: int, user_ids: list[int], delta: int, *, kind: str = "adjust"
+    ) -> int:
+        if not user_ids or delta == 0:
+            return 0
+        request = self._client.rpc(
+            "bulk_add_points",
+            {
+                "p_guild_id": guild_id,
+                "p_user_ids": user_ids,
+                "p_delta": delta,
+                "p_kind": kind,
+                "p_strategy": self._strategy.name,
+            },
+        )
+        data = self._call(request, context="bulk_add_points", retry=False)
+        self._publish(points_key(guild_id))
+        value = self._extract_scalar(data)
+        return 0 if value is None else int(value)
+
+    def import_points(
+        self, guild_id: int, rows: list[dict[str, int]], *, mode: str = "set"
+    ) -> int:
+        if not rows:
+            return 0
+        if mode not in POINT_IMPORT_MODES:
+            raise DatabaseError(f"unknown import mode: {mode}")
+        request = self._client.rpc(
+            "import_points",
+            {
+                "p_guild_id": guild_id,
+                "p_rows": rows,
+                "p_mode": mode,
+                "p_strategy": self._strategy.name,
+            },
+        )
+        data = self._call(request, context="import_points", retry=mode == "set")
+        self._publish(points_key(guild_id))
         value = self._extract_scalar(data)
         return 0 if value is None else int(value)
 
+    def fetch_points_page(
+        self, guild_id: int, *, after_user_id: int | None = None, limit: int = 1000
+    ) -> list[dict[str, Any]]:
+        return self.fetch_export_page(
+            guild_id, "points", after=after_user_id, limit=limit
+        )
+
+    def fetch_export_page(
+        self,
+        guild_id: int,
+        source: str,
+        *,
+        after: int | None = None,
+        limit: int = 1000,
+    ) -> list[dict[str, Any]]:
+        spec = EXPORT_SOURCES.get(source)
+        if spec is None:
+            raise DatabaseError(f"unknown export source: {source}")
+        query = (
+            self._client.table(spec.table or self._strategy.balance_source)
+            .select(", ".join(spec.columns))
+            .eq("guild_id", guild_id)
+        )
+        if after is not None:
+            query = query.gt(spec.key, after)
+        request = query.order(spec.key).limit(limit)
+        data = self._call(request, context=f"fetch_export_page({source})")
+        return [] if data is None else list(data)
+
     def top_rank(self, guild_id: int, limit: int = 10) -> list[dict[str, Any]]:
-        response = (
-            self._client.table("points")
+        request = (
+            self._client.table(self._strategy.balance_source)
             .select("user_id, points")
             .eq("guild_id", guild_id)
             .order("points", desc=True)
             .limit(limit)
-            .execute()
         )
-        data = self._unwrap(response, context="top_rank")
+        data = self._call(request, context="top_rank")
         return [] if data is None else list(data)
 
-    def transfer(
-        self, guild_id: int, sender_id: int, recipient_id: int, points: int
-    ) -> bool:
-        if points <= 0:
-            return False
-        response = self._client.rpc(
-            "transfer_points",
+    def rank_page(
+        self,
+        guild_id: int,
+        *,
+        after: tuple[int, int] | None = None,
+        inclusive: bool = False,
+        limit: int = 10,
+    ) -> list[dict[str, Any]]:
+        query = (
+            self._client.table(self._strategy.balance_source)
+            .select("user_id, points")
+            .eq("guild_id", guild_id)
+        )
+        if after is not None:
+            points, user_id = after
+            op = "gte" if inclusive else "gt"
+            query = query.or_(
+                f"points.lt.{points},and(points.eq.{points},user_id.{op}.{user_id})"
+            )
+        request = (
+            query.order("points", desc=True).order("user_id").limit(limit)
+        )
+        data = self._call(request, context="rank_page")
+        return [] if data is None else list(data)
+
+    def user_rank(self, guild_id: int, user_id: int) -> dict[str, int] | None:
+        request = self._client.rpc(
+            "user_rank",
             {
                 "p_guild_id": guild_id,
-                "p_sender_id": sender_id,
-                "p_recipient_id": recipient_id,
-                "p_points": points,
+                "p_user_id": user_id,
+                "p_strategy": self._strategy.name,
             },
-        ).execute()
-        data = self._unwrap(response, context="transfer_points")
+        )
+        data = self._call(request, context="user_rank")
         value = self._extract_scalar(data)
+        if not isinstance(value, dict):
+            return None
+        return {"rank": int(value["rank"]), "points": int(value["points"])}
+
+    def transfer(
+        self,
+        guild_id: int,
+        sender_id: int,
+        recipient_id: int,
+        points: int,
+        *,
+        kind: str = "transfer",
+        request_id: str | None = None,
+    ) -> bool:
+        if points <= 0:
+            return False
+        params: dict[str, Any] = {
+            "p_guild_id": guild_id,
+            "p_sender_id": sender_id,
+            "p_recipient_id": recipient_id,
+            "p_points": points,
+        }
+        if self._strategy.records_kind:
+            params["p_kind"] = kind
+        value = self._run_point_request(
+            self._strategy.transfer_rpc,
+            params,
+            request_id=request_id,
+            context="transfer_points",
+        )
+        if value:
+            self._publish(
+                points_key(guild_id, sender_id), points_key(guild_id, recipient_id)
+            )
         return bool(value)
 
+    def compact_points(self) -> int:
+        if self._strategy.compact_rpc is None:
+            return 0
+        request = self._client.rpc(self._strategy.compact_rpc)
+        data = self._call(request, context=self._strategy.compact_rpc)
+        value = self._extract_scalar(data)
+        return 0 if value is None else int(value)
+
+    def take_leaderboard_snapshot(self) -> int:
+        request = self._client.rpc(
+            "take_leaderboard_snapshot", {"p_strategy": self._strategy.name}
+        )
+        data = self._call(request, context="take_leaderboard_snapshot")
+        value = self._extract_scalar(data)
+        return 0 if value is None else int(value)
+
+    def leaderboard_gains(
+        self, guild_id: int, since: datetime, limit: int = 10
+    ) -> list[dict[str, Any]]:
+        request = self._client.rpc(
+            "leaderboard_gains",
+            {"p_guild_id": guild_id, "p_since": since.isoformat(), "p_limit": limit},
+        )
+        data = self._call(request, context="leaderboard_gains")
+        return [] if data is None else list(data)
+
+    def leaderboard_climbers(
+        self, guild_id: int, since: datetime, limit: int = 10
+    ) -> list[dict[str, Any]]:
+        request = self._client.rpc(
+            "leaderboard_climbers",
+            {"p_guild_id": guild_id, "p_since": since.isoformat(), "p_limit": limit},
+        )
+        data = self._call(request, context="leaderboard_climbers")
+        return [] if data is None else list(data)
+
     def has_remove_permission(self, guild_id: int, user_id: int) -> bool:
-        response = (
+        request = (
             self._client.table("point_remove_permissions")
             .select("user_id")
             .eq("guild_id", guild_id)
             .eq("user_id", user_id)
             .limit(1)
-            .execute()
         )
-        data = self._unwrap(response, context="has_remove_permission")
+        data = self._call(request, context="has_remove_permission")
         return bool(data)
 
     def grant_remove_permission(self, guild_id: int, user_id: int) -> None:
-        response = (
+        request = (
             self._client.table("point_remove_permissions")
             .upsert(
                 {"guild_id": guild_id, "user_id": user_id},
                 on_conflict="guild_id,user_id",
             )
-            .execute()
         )
-        self._unwrap(response, context="grant_remove_permission")
+        self._call(request, context="grant_remove_permission")
+        self._publish(guild_settings_key(guild_id))
 
     def revoke_remove_permission(self, guild_id: int, user_id: int) -> bool:
-        response = (
+        request = (
             self._client.table("point_remove_permissions")
             .delete()
             .eq("guild_id", guild_id)
             .eq("user_id", user_id)
-            .execute()
         )
-        data = self._unwrap(response, context="revoke_remove_permission")
+        data = self._call(request, context="revoke_remove_permission")
+        self._publish(guild_settings_key(guild_id))
         return bool(data)
 
     def set_clan_register_channel(self, guild_id: int, channel_id: int) -> None:
-        response = (
+        request = (
             self._client.table("clan_register_settings")
             .upsert(
                 {"guild_id": guild_id, "channel_id": channel_id}, on_conflict="guild_id"
             )
-            .execute()
         )
-        self._unwrap(response, context="set_clan_register_channel")
+        self._call(request, context="set_clan_register_channel")
+        self._publish(guild_settings_key(guild_id))
 
     def get_clan_register_channel(self, guild_id: int) -> int | None:
-        response = (
+        request = (
             self._client.table("clan_register_settings")
             .select("channel_id")
             .eq("guild_id", guild_id)
             .limit(1)
-            .execute()
         )
-        data = self._unwrap(response, context="get_clan_register_channel")
+        data = self._call(request, context="get_clan_register_channel")
         if not data:
             return None
         return int(data[0]["channel_id"])
 
     def set_role_buy_price(self, guild_id: int, role_id: int, price: int) -> None:
-        response = (
+        request = (
             self._client.table("role_buy_settings")
             .upsert(
                 {"guild_id": guild_id, "role_id": role_id, "price": price},
                 on_conflict="guild_id,role_id",
             )
-            .execute()
         )
-        self._unwrap(response, context="set_role_buy_price")
+        self._call(request, context="set_role_buy_price")
+        self._publish(guild_settings_key(guild_id))
 
     def get_role_buy_price(self, guild_id: int, role_id: int) -> int | None:
-        response = (
+        request = (
             self._client.table("role_buy_settings")
             .select("price")
             .eq("guild_id", guild_id)
             .eq("role_id", role_id)
             .limit(1)
-            .execute()
         )
-        data = self._unwrap(response, context="get_role_buy_price")
+        data = self._call(request, context="get_role_buy_price")
         if not data:
             return None
         return int(data[0]["price"])
 
+    def get_guild_settings(self, guild_id: int) -> dict[str, Any]:
+        request = self._client.rpc(
+            "get_guild_settings", {"p_guild_id": guild_id}
+        )
+        data = self._call(request, context="get_guild_settings")
+        value = self._extract_scalar(data)
+        return value if isinstance(value, dict) else {}
+
+    def get_earning_rules(self, guild_id: int) -> dict[str, Any]:
+        request = (
+            self._client.table("earning_rules")
+            .select("rules")
+            .eq("guild_id", guild_id)
+            .limit(1)
+        )
+        data = self._call(request, context="get_earning_rules")
+        if not data or not isinstance(data[0].get("rules"), dict):
+            return {}
+        return data[0]["rules"]
+
+    def set_earning_rules(self, guild_id: int, rules: dict[str, Any]) -> None:
+        request = (
+            self._client.table("earning_rules")
+            .upsert(
+                {
+                    "guild_id": guild_id,
+                    "rules": rules,
+                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                },
+                on_conflict="guild_id",
+            )
+        )
+        self._call(request, context="set_earning_rules")
+        self._publish(guild_settings_key(guild_id))
+
+    def purchase_role(
+        self, guild_id: int, user_id: int, role_id: int
+    ) -> dict[str, Any]:
+        request = self._client.rpc(
+            "purchase_role",
+            {
+                "p_guild_id": guild_id,
+                "p_user_id": user_id,
+                "p_role_id": role_id,
+                "p_strategy": self._strategy.name,
+            },
+        )
+        data = self._call(request, context="purchase_role", retry=False)
+        value = self._extract_scalar(data)
+        result = value if isinstance(value, dict) else {}
+        if result.get("status") == "ok":
+            self._publish(points_key(guild_id, user_id))
+        return result
+
+    def release_purchase(self, guild_id: int, user_id: int, purchase_id: int) -> bool:
+        request = self._client.rpc(
+            "release_purchase",
+            {"p_purchase_id": purchase_id, "p_strategy": self._strategy.name},
+        )
+        data = self._call(request, context="release_purchase")
+        value = self._extract_scalar(data)
+        if value:
+            self._publish(points_key(guild_id, user_id))
+        return bool(value)
+
+    def insert_game_rounds(self, rows: list[dict[str, Any]]) -> None:
+        if not rows:
+            return
+        request = self._client.table("game_rounds").insert(rows)
+        self._call(request, context="insert_game_rounds", retry=False)
+
 
-__all__ = ["Database", "DatabaseError"]
+__all__ = [
+    "DEFAULT_POINT_SHARD_COUNT",
+    "EXPORT_SOURCES",
+    "POINTS_MANY_CHUNK_SIZE",
+    "POINTS_STRATEGIES",
+    "POINT_IMPORT_MODES",
+    "POINT_EVENT_KINDS",
+    "CircuitOpenError",
+    "Database",
+    "DatabaseBusyError",
+    "DatabaseError",
+    "DatabaseUnavailableError",
+    "ExportSource",
+    "PointsStrategy",
+]
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, TypeVar
+import asyncio
+import contextvars
+import threading
+import time
+
+from data.database import DatabaseBusyError
+from data.resilience import LatencyHistogram
+
+DEFAULT_DB_EXECUTOR_WORKERS = 8
+DEFAULT_DB_EXECUTOR_QUEUE = 64
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True, slots=True)
+class ExecutorStats:
+    workers: int
+    running: int
+    queued: int
+    max_queue: int
+    completed: int
+    rejected: int
+    wait: LatencyHistogram
+
+    @property
+    def saturation(self) -> float:
+        return self.running / self.workers if self.workers else 0.0
+
+
+class DatabaseExecutor:
+    """Dedicated, bounded thread pool for the synchronous Supabase client.
+
+    At most ``max_queue`` calls may wait for a worker; beyond that ``run``
+    raises ``DatabaseBusyError`` instead of queueing, so a slow database
+    turns into quick busy replies rather than an unbounded backlog.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = DEFAULT_DB_EXECUTOR_WORKERS,
+        max_queue: int = DEFAULT_DB_EXECUTOR_QUEUE,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.wait = LatencyHistogram()
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="db")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+
+    async def run(
+        self, func: Callable[..., _T], /, *args: Any, shed: bool = True, **kwargs: Any
+    ) -> _T:
+        # shed=False is for compensating writes (game payouts) that must follow
+        # a committed debit; they queue past the limit instead of failing.
+        with self._lock:
+            if shed and self._queued >= self.max_queue:
+                self._rejected += 1
+                raise DatabaseBusyError(
+                    f"{getattr(func, '__name__', 'call')} shed: "
+                    f"{self._queued} database calls already queued"
+                )
+            self._queued += 1
+        submitted = time.monotonic()
+        # Like asyncio.to_thread: the worker sees the caller's contextvars
+        # (the current trace span).
+        context = contextvars.copy_context()
+
+        def call() -> _T:
+            self.wait.observe(time.monotonic() - submitted)
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            try:
+                return context.run(func, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        future = self._pool.submit(call)
+        future.add_done_callback(self._forget_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def _forget_cancelled(self, future: Future) -> None:
+        # Cancelled while still queued: ``call`` never ran.
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def stats(self) -> ExecutorStats:
+        with self._lock:
+            return ExecutorStats(
+                workers=self.max_workers,
+                running=self._running,
+                queued=self._queued,
+                max_queue=self.max_queue,
+                completed=self._completed,
+                rejected=self._rejected,
+                wait=self.wait,
+            )
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+__all__ = [
+    "DEFAULT_DB_EXECUTOR_QUEUE",
+    "DEFAULT_DB_EXECUTOR_WORKERS",
+    "DatabaseExecutor",
+    "ExecutorStats",
+]
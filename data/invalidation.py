@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+from typing import Callable
+import threading
+import uuid
+
+INVALIDATION_BUS_KINDS = ("memory", "postgres")
+INVALIDATION_CHANNEL = "myami_invalidation"
+INVALIDATION_RECONNECT_SECONDS = 5.0
+INVALIDATION_POLL_SECONDS = 1.0
+INVALIDATION_CLOSE_TIMEOUT_SECONDS = 5.0
+
+InvalidationListener = Callable[[str], None]
+
+
+def points_key(guild_id: int, user_id: int | None = None) -> str:
+    if user_id is None:
+        return f"points:{guild_id}"
+    return f"points:{guild_id}:{user_id}"
+
+
+def guild_settings_key(guild_id: int) -> str:
+    return f"guild_settings:{guild_id}"
+
+
+def parse_key(key: str) -> tuple[str, list[int]]:
+    kind, _, rest = key.partition(":")
+    ids = [int(part) for part in rest.split(":") if part.isdigit()]
+    return kind, ids
+
+
+class InvalidationBus:
+    def __init__(self) -> None:
+        self._listeners: list[InvalidationListener] = []
+
+    def subscribe(self, listener: InvalidationListener) -> None:
+        self._listeners.append(listener)
+
+    def publish(self, key: str) -> None:
+        raise NotImplementedError
+
+    def start(self) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+    def _dispatch(self, key: str) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(key)
+            except Exception as exc:
+                print(f"[invalidation] listener failed for {key}: {exc}")
+
+
+class InProcessInvalidationBus(InvalidationBus):
+    def publish(self, key: str) -> None:
+        self._dispatch(key)
+
+
+class PostgresInvalidationBus(InvalidationBus):
+    """Fans keys out to every bot process through Postgres LISTEN/NOTIFY.
+
+    ``publish`` only queues the key; a publisher thread sends everything queued
+    since its last round trip in one ``pg_notify`` statement, so writers never
+    wait on (or serialize behind) the notification.
+    """
+
+    def __init__(self, dsn: str, *, channel: str = INVALIDATION_CHANNEL) -> None:
+        super().__init__()
+        self._dsn = dsn
+        self._channel = channel
+        self._origin = uuid.uuid4().hex
+        # dict as an insertion-ordered set: repeated keys are sent once.
+        self._pending: dict[str, None] = {}
+        self._pending_lock = threading.Lock()
+        self._pending_ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._publisher: threading.Thread | None = None
+
+    def publish(self, key: str) -> None:
+        self._dispatch(key)
+        with self._pending_lock:
+            self._pending[key] = None
+        self._pending_ready.set()
+
+    def start(self) -> None:
+        self._stop.clear()
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._listen_forever, name="invalidation-listener", daemon=True
+            )
+            self._thread.start()
+        if self._publisher is None or not self._publisher.is_alive():
+            self._publisher = threading.Thread(
+                target=self._publish_forever, name="invalidation-publisher", daemon=True
+            )
+            self._publisher.start()
+
+    def close(self) -> None:
+        # The publisher drains what is still queued before it exits.
+        self._stop.set()
+        self._pending_ready.set()
+        for thread in (self._publisher, self._thread):
+            if thread is not None:
+                thread.join(timeout=INVALIDATION_CLOSE_TIMEOUT_SECONDS)
+        self._publisher = None
+        self._thread = None
+
+    def _connect(self):
+        try:
+            import psycopg
+        except ImportError as exc:
+            raise RuntimeError(
+                "INVALIDATION_BUS=postgres requires the psycopg package "
+                '(install the "postgres" extra or "psycopg[binary]").'
+            ) from exc
+        return psycopg.connect(self._dsn, autocommit=True)
+
+    def _publish_forever(self) -> None:
+        conn = None
+        try:
+            while True:
+                if not self._stop.is_set():
+                    self._pending_ready.wait()
+                with self._pending_lock:
+                    keys = list(self._pending)
+                    self._pending.clear()
+                    self._pending_ready.clear()
+                if not keys:
+                    if self._stop.is_set():
+                        return
+                    continue
+                conn = self._send(conn, keys)
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _send(self, conn, keys: list[str]):
+        payloads = [f"{self._origin}:{key}" for key in keys]
+        try:
+            if conn is None or conn.closed:
+                conn = self._connect()
+            conn.execute(
+                "select pg_notify(%s, payload) from unnest(%s::text[]) as payload",
+                (self._channel, payloads),
+            )
+        except Exception as exc:
+            # Other processes fall back to their read cache TTL for these keys.
+            print(f"[invalidation] publish failed for {len(keys)} keys: {exc}")
+            if conn is not None:
+                conn.close()
+            return None
+        return conn
+
+    def _listen_forever(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with self._connect() as conn:
+                    conn.execute(f'listen "{self._channel}"')
+                    print(f"[invalidation] listening on {self._channel}")
+                    while not self._stop.is_set():
+                        for notify in conn.notifies(timeout=INVALIDATION_POLL_SECONDS):
+                            self._handle_payload(notify.payload)
+            except Exception as exc:
+                if self._stop.is_set():
+                    return
+                print(f"[invalidation] listener error: {exc}")
+                self._stop.wait(INVALIDATION_RECONNECT_SECONDS)
+
+    def _handle_payload(self, payload: str) -> None:
+        origin, _, key = payload.partition(":")
+        if origin == self._origin or key == "":
+            return
+        self._dispatch(key)
+
+
+def create_invalidation_bus(kind: str, *, dsn: str | None = None) -> InvalidationBus:
+    if kind == "memory":
+        return InProcessInvalidationBus()
+    if kind == "postgres":
+        if not dsn:
+            raise ValueError("INVALIDATION_BUS=postgres requires SUPABASE_DB_URL.")
+        return PostgresInvalidationBus(dsn)
+    raise ValueError(f"unknown invalidation bus: {kind}")
+
+
+__all__ = [
+    "INVALIDATION_BUS_KINDS",
+    "INVALIDATION_CHANNEL",
+    "InProcessInvalidationBus",
+    "InvalidationBus",
+    "InvalidationListener",
+    "PostgresInvalidationBus",
+    "create_invalidation_bus",
+    "guild_settings_key",
+    "parse_key",
+    "points_key",
+]
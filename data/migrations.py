@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+import hashlib
+import json
+import re
+
+from data.database import Database, DatabaseError
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "supabase" / "migrations"
+
+_MIGRATION_FILE_PATTERN = re.compile(r"^(\d+)_([a-z0-9_]+)\.sql$")
+
+
+@dataclass(frozen=True, slots=True)
+class Migration:
+    version: int
+    name: str
+    sql: str
+
+
+@dataclass(frozen=True, slots=True)
+class SchemaCheckResult:
+    version: int
+    cached: bool
+
+
+def load_migrations(directory: Path = MIGRATIONS_DIR) -> list[Migration]:
+    migrations: list[Migration] = []
+    seen: set[int] = set()
+    for path in sorted(directory.glob("*.sql")):
+        match = _MIGRATION_FILE_PATTERN.match(path.name)
+        if match is None:
+            raise ValueError(f"invalid migration file name: {path.name}")
+        version = int(match.group(1))
+        if version in seen:
+            raise ValueError(f"duplicate migration version: {version}")
+        seen.add(version)
+        migrations.append(
+            Migration(
+                version=version,
+                name=match.group(2),
+                sql=path.read_text(encoding="utf-8"),
+            )
+        )
+    migrations.sort(key=lambda migration: migration.version)
+    return migrations
+
+
+def migrations_checksum(migrations: list[Migration]) -> str:
+    digest = hashlib.sha256()
+    for migration in migrations:
+        digest.update(f"{migration.version}:{migration.name}\n".encode("utf-8"))
+        digest.update(migration.sql.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SchemaCheck:
+    """Compares schema_version with the newest local migration; never writes."""
+
+    def __init__(
+        self,
+        db: Database,
+        *,
+        migrations: list[Migration],
+        marker_path: Path | None,
+        target: str,
+    ) -> None:
+        self._db = db
+        self._migrations = migrations
+        self._marker_path = marker_path
+        self._target = target
+        self._checksum = migrations_checksum(migrations)
+
+    @property
+    def latest_version(self) -> int:
+        return self._migrations[-1].version if self._migrations else 0
+
+    def is_ready_cached(self) -> bool:
+        marker = self._read_marker()
+        if marker is None:
+            return False
+        return (
+            marker.get("target") == self._target
+            and marker.get("checksum") == self._checksum
+            and marker.get("version") == self.latest_version
+        )
+
+    def run(self) -> SchemaCheckResult:
+        if self.is_ready_cached():
+            return SchemaCheckResult(version=self.latest_version, cached=True)
+        version = self._db.get_schema_version()
+        if version is None:
+            raise DatabaseError(
+                "schema_version is missing. Run supabase/supabase_init.sql "
+                "(see _docs/guide/deployment/railway.md)."
+            )
+        if version < self.latest_version:
+            raise DatabaseError(
+                f"schema version {version} is behind migrations "
+                f"({self.latest_version}). Apply supabase/migrations with "
+                "supabase/apply_migrations.sh."
+            )
+        if version > self.latest_version:
+            raise DatabaseError(
+                f"schema version {version} is ahead of migrations "
+                f"({self.latest_version}). Deploy the matching bot version."
+            )
+        self._write_marker(version)
+        return SchemaCheckResult(version=version, cached=False)
+
+    def invalidate(self) -> None:
+        if self._marker_path is not None:
+            self._marker_path.unlink(missing_ok=True)
+
+    def _read_marker(self) -> dict | None:
+        if self._marker_path is None:
+            return None
+        try:
+            data = json.loads(self._marker_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
+
+    def _write_marker(self, version: int) -> None:
+        if self._marker_path is None:
+            return
+        payload = {
+            "target": self._target,
+            "checksum": self._checksum,
+            "version": version,
+        }
+        try:
+            self._marker_path.parent.mkdir(parents=True, exist_ok=True)
+            self._marker_path.write_text(json.dumps(payload), encoding="utf-8")
+        except OSError as exc:
+            print(f"[startup] schema marker write failed: {exc}")
+
+
+__all__ = [
+    "MIGRATIONS_DIR",
+    "Migration",
+    "SchemaCheck",
+    "SchemaCheckResult",
+    "load_migrations",
+    "migrations_checksum",
+]
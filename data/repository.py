@@ -1,12 +1,68 @@
-from data.database import Database
+from data.database import Database, DatabaseUnavailableError
+from data.invalidation import parse_key, points_key
+from data.singleflight import SingleFlight, SingleFlightStats
+from data.spool import PointSpool
+from data.tracing import traced_methods
 
 
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Any
+import threading
+import uuid
 
+# Earned points may be spooled during an outage; spends and transfers need a
+# live balance check and fail instead.
+SPOOLABLE_POINT_KINDS = frozenset({"message", "voice"})
+SPOOL_REPLAY_BATCH_SIZE = 200
+LAST_POINTS_CACHE_SIZE = 10_000
 
+_MISSING = object()
+
+
+@dataclass(frozen=True, slots=True)
+class PointsReading:
+    points: int | None
+    stale: bool
+
+
+@dataclass(frozen=True, slots=True)
+class RankPageReading:
+    rows: list[dict[str, Any]]
+    stale: bool
+
+
+# Bookkeeping reads that would only add root spans from the diagnostics loop.
+_UNTRACED_METHODS = frozenset(
+    {
+        "can_spool",
+        "cached_reads",
+        "database_metrics",
+        "handle_invalidation",
+        "read_coalescing_stats",
+        "spooled_count",
+    }
+)
+
+
+@traced_methods("PointsRepository", exclude=_UNTRACED_METHODS)
 class PointsRepository:
-    def __init__(self, db: Database):
+    def __init__(
+        self,
+        db: Database,
+        *,
+        spool: PointSpool | None = None,
+        read_cache_ttl_seconds: float = 0.0,
+    ):
         self._db = db
+        self._spool = spool
+        # Concurrent identical reads share one query; writes published on the
+        # invalidation bus drop in-flight and micro-cached results.
+        self._reads = SingleFlight(ttl_seconds=read_cache_ttl_seconds)
+        self._last_points: OrderedDict[tuple[int, int], int | None] = OrderedDict()
+        self._last_top: dict[int, list[dict[str, Any]]] = {}
+        self._cache_lock = threading.Lock()
 
     def ensure_schema(self) -> None:
         self._db.ensure_schema()
@@ -15,21 +71,281 @@ class PointsRepository:
         self._db.ensure_user(guild_id, user_id)
 
     def get_points(self, guild_id: int, user_id: int) -> int | None:
-        return self._db.get_points(guild_id, user_id)
+        return self.read_points(guild_id, user_id).points
+
+    def read_points(self, guild_id: int, user_id: int) -> PointsReading:
+        try:
+            points = self._reads.do(
+                ("points", guild_id, user_id),
+                lambda: self._db.get_points(guild_id, user_id),
+            )
+        except DatabaseUnavailableError:
+            reading = self._stale_reading(guild_id, user_id)
+            if reading is None:
+                raise
+            return reading
+        self._remember_points(guild_id, user_id, points)
+        return PointsReading(points=points, stale=False)
+
+    def get_points_many(
+        self, guild_id: int, user_ids: list[int]
+    ) -> dict[int, int | None]:
+        try:
+            points = self._db.get_points_many(guild_id, user_ids)
+        except DatabaseUnavailableError:
+            # All or nothing: a partial answer would look like missing users.
+            readings = {
+                user_id: self._stale_reading(guild_id, user_id)
+                for user_id in user_ids
+            }
+            if any(reading is None for reading in readings.values()):
+                raise
+            return {user_id: reading.points for user_id, reading in readings.items()}
+        for user_id, value in points.items():
+            self._remember_points(guild_id, user_id, value)
+        return points
 
-    def add_points(self, guild_id: int, user_id: int, delta: int) -> int:
-        return self._db.add_points(guild_id, user_id, delta)
+    def add_points(
+        self,
+        guild_id: int,
+        user_id: int,
+        delta: int,
+        *,
+        kind: str = "adjust",
+        request_id: str | None = None,
+    ) -> int:
+        request_id = request_id or uuid.uuid4().hex
+        try:
+            points = self._db.add_points(
+                guild_id, user_id, delta, kind=kind, request_id=request_id
+            )
+        except DatabaseUnavailableError:
+            if not self.can_spool(kind):
+                raise
+            # Same request id as the failed attempt: if that attempt did land,
+            # the replay is deduplicated by run_point_request.
+            return self.spool_points(
+                guild_id, user_id, delta, kind=kind, request_id=request_id
+            )
+        self._remember_points(guild_id, user_id, points)
+        return points
+
+    def can_spool(self, kind: str) -> bool:
+        return self._spool is not None and kind in SPOOLABLE_POINT_KINDS
+
+    def spool_points(
+        self, guild_id: int, user_id: int, delta: int, *, kind: str, request_id: str
+    ) -> int:
+        self._spool.append(
+            request_id=request_id,
+            guild_id=guild_id,
+            user_id=user_id,
+            delta=delta,
+            kind=kind,
+        )
+        # Nothing is published for a spooled delta.
+        self.handle_invalidation(points_key(guild_id, user_id))
+        with self._cache_lock:
+            cached = self._last_points.get((guild_id, user_id))
+        base = cached if isinstance(cached, int) else 0
+        return base + self._pending_delta(guild_id, user_id)
 
     def top_rank(self, guild_id: int, limit: int = 10) -> list[dict[str, Any]]:
-        return self._db.top_rank(guild_id, limit)
+        return self._reads.do(
+            ("top_rank", guild_id, limit),
+            lambda: self._db.top_rank(guild_id, limit),
+        )
+
+    def rank_page(
+        self,
+        guild_id: int,
+        *,
+        after: tuple[int, int] | None = None,
+        inclusive: bool = False,
+        limit: int = 10,
+    ) -> list[dict[str, Any]]:
+        return self.read_rank_page(
+            guild_id, after=after, inclusive=inclusive, limit=limit
+        ).rows
+
+    def read_rank_page(
+        self,
+        guild_id: int,
+        *,
+        after: tuple[int, int] | None = None,
+        inclusive: bool = False,
+        limit: int = 10,
+    ) -> RankPageReading:
+        try:
+            rows = self._reads.do(
+                ("rank_page", guild_id, after, inclusive, limit),
+                lambda: self._db.rank_page(
+                    guild_id, after=after, inclusive=inclusive, limit=limit
+                ),
+            )
+        except DatabaseUnavailableError:
+            # Only the first page falls back: a cursor into a stale ordering
+            # would skip or repeat users.
+            with self._cache_lock:
+                cached = self._last_top.get(guild_id)
+            if after is not None or cached is None:
+                raise
+            return RankPageReading(rows=cached[:limit], stale=True)
+        if after is None:
+            with self._cache_lock:
+                self._last_top[guild_id] = rows
+        return RankPageReading(rows=rows, stale=False)
+
+    def user_rank(self, guild_id: int, user_id: int) -> dict[str, int] | None:
+        return self._db.user_rank(guild_id, user_id)
 
     def transfer(
-        self, guild_id: int, sender_id: int, recipient_id: int, points: int
+        self,
+        guild_id: int,
+        sender_id: int,
+        recipient_id: int,
+        points: int,
+        *,
+        kind: str = "transfer",
+        request_id: str | None = None,
     ) -> bool:
-        return self._db.transfer(guild_id, sender_id, recipient_id, points)
+        return self._db.transfer(
+            guild_id, sender_id, recipient_id, points, kind=kind, request_id=request_id
+        )
+
+    def bulk_add_points(
+        self, guild_id: int, user_ids: list[int], delta: int, *, kind: str = "adjust"
+    ) -> int:
+        return self._db.bulk_add_points(guild_id, user_ids, delta, kind=kind)
+
+    def import_points(
+        self, guild_id: int, rows: list[dict[str, int]], *, mode: str = "set"
+    ) -> int:
+        return self._db.import_points(guild_id, rows, mode=mode)
+
+    def fetch_points_page(
+        self, guild_id: int, *, after_user_id: int | None = None, limit: int = 1000
+    ) -> list[dict[str, Any]]:
+        return self._db.fetch_points_page(
+            guild_id, after_user_id=after_user_id, limit=limit
+        )
+
+    def fetch_export_page(
+        self,
+        guild_id: int,
+        source: str,
+        *,
+        after: int | None = None,
+        limit: int = 1000,
+    ) -> list[dict[str, Any]]:
+        return self._db.fetch_export_page(guild_id, source, after=after, limit=limit)
 
-    def award_point_for_message(self, guild_id: int, user_id: int) -> int:
-        return self.add_points(guild_id, user_id, 1)
+    def compact_points(self) -> int:
+        return self._db.compact_points()
+
+    def replay_spooled(self, batch_size: int = SPOOL_REPLAY_BATCH_SIZE) -> int:
+        if self._spool is None:
+            return 0
+        replayed = 0
+        while True:
+            batch = self._spool.peek(batch_size)
+            if not batch:
+                return replayed
+            self._db.replay_point_requests(
+                [
+                    {
+                        "request_id": delta.request_id,
+                        "guild_id": delta.guild_id,
+                        "user_id": delta.user_id,
+                        "delta": delta.delta,
+                        "kind": delta.kind,
+                    }
+                    for delta in batch
+                ]
+            )
+            self._spool.ack(batch[-1].id)
+            replayed += len(batch)
+
+    def spooled_count(self) -> int:
+        return 0 if self._spool is None else len(self._spool)
+
+    def _pending_delta(self, guild_id: int, user_id: int) -> int:
+        if self._spool is None or len(self._spool) == 0:
+            return 0
+        return self._spool.pending_delta(guild_id, user_id)
+
+    def _stale_reading(self, guild_id: int, user_id: int) -> PointsReading | None:
+        with self._cache_lock:
+            cached = self._last_points.get((guild_id, user_id), _MISSING)
+        if cached is _MISSING:
+            return None
+        pending = self._pending_delta(guild_id, user_id)
+        if cached is None and pending == 0:
+            return PointsReading(points=None, stale=True)
+        return PointsReading(points=(cached or 0) + pending, stale=True)
+
+    def _remember_points(self, guild_id: int, user_id: int, points: int | None) -> None:
+        key = (guild_id, user_id)
+        with self._cache_lock:
+            self._last_points[key] = points
+            self._last_points.move_to_end(key)
+            if len(self._last_points) > LAST_POINTS_CACHE_SIZE:
+                self._last_points.popitem(last=False)
+
+    def cached_reads(self) -> dict[str, list[tuple[Any, Any]]]:
+        with self._cache_lock:
+            reads = {
+                "last_points": list(self._last_points.items()),
+                "last_top": list(self._last_top.items()),
+            }
+        reads["read_cache"] = self._reads.cached_items()
+        return reads
+
+    def read_coalescing_stats(self) -> SingleFlightStats:
+        return self._reads.stats()
+
+    def handle_invalidation(self, key: str) -> None:
+        kind, ids = parse_key(key)
+        if kind != "points" or not ids:
+            return
+        guild_id = ids[0]
+        user_id = ids[1] if len(ids) > 1 else None
+        # Any balance change can reorder the guild's ranking.
+        self._reads.forget(
+            lambda read: read[1] == guild_id
+            and (user_id is None or read[0] != "points" or read[2] == user_id)
+        )
+
+    def prune_point_requests(self) -> int:
+        return self._db.prune_point_requests()
+
+    def database_metrics(self) -> dict[str, dict[str, int]]:
+        return self._db.metrics.snapshot()
+
+    def take_leaderboard_snapshot(self) -> int:
+        return self._db.take_leaderboard_snapshot()
+
+    def leaderboard_gains(
+        self, guild_id: int, since: datetime, limit: int = 10
+    ) -> list[dict[str, Any]]:
+        return self._db.leaderboard_gains(guild_id, since, limit)
+
+    def leaderboard_climbers(
+        self, guild_id: int, since: datetime, limit: int = 10
+    ) -> list[dict[str, Any]]:
+        return self._db.leaderboard_climbers(guild_id, since, limit)
+
+    def award_point_for_message(
+        self,
+        guild_id: int,
+        user_id: int,
+        points: int = 1,
+        *,
+        request_id: str | None = None,
+    ) -> int:
+        return self.add_points(
+            guild_id, user_id, points, kind="message", request_id=request_id
+        )
 
     def get_user_points(self, guild_id: int, user_id: int) -> int | None:
         return self.get_points(guild_id, user_id)
@@ -45,7 +361,7 @@ class PointsRepository:
     def remove_points(
         self, guild_id: int, admin_id: int, target_id: int, points: int
     ) -> bool:
-        return self.transfer(guild_id, target_id, admin_id, points)
+        return self.transfer(guild_id, target_id, admin_id, points, kind="remove")
 
     def has_remove_permission(self, guild_id: int, user_id: int) -> bool:
         return self._db.has_remove_permission(guild_id, user_id)
@@ -68,5 +384,30 @@ class PointsRepository:
     def get_role_buy_price(self, guild_id: int, role_id: int) -> int | None:
         return self._db.get_role_buy_price(guild_id, role_id)
 
+    def get_guild_settings(self, guild_id: int) -> dict[str, Any]:
+        return self._db.get_guild_settings(guild_id)
+
+    def get_earning_rules(self, guild_id: int) -> dict[str, Any]:
+        return self._db.get_earning_rules(guild_id)
+
+    def set_earning_rules(self, guild_id: int, rules: dict[str, Any]) -> None:
+        self._db.set_earning_rules(guild_id, rules)
+
+    def purchase_role(
+        self, guild_id: int, user_id: int, role_id: int
+    ) -> dict[str, Any]:
+        return self._db.purchase_role(guild_id, user_id, role_id)
+
+    def release_purchase(self, guild_id: int, user_id: int, purchase_id: int) -> bool:
+        return self._db.release_purchase(guild_id, user_id, purchase_id)
+
+    def record_game_rounds(self, rows: list[dict[str, Any]]) -> None:
+        self._db.insert_game_rounds(rows)
+
 
-__all__ = ["PointsRepository"]
+__all__ = [
+    "PointsReading",
+    "PointsRepository",
+    "RankPageReading",
+    "SPOOLABLE_POINT_KINDS",
+]
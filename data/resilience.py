@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Any, Callable
+import random
+import threading
+import time
+
+# serialization_failure, deadlock_detected, query_canceled (statement timeout),
+# admin_shutdown, connection exceptions and PostgREST's "could not connect".
+TRANSIENT_ERROR_CODES = frozenset(
+    {
+        "40001",
+        "40P01",
+        "57014",
+        "57P01",
+        "08000",
+        "08003",
+        "08006",
+        "PGRST000",
+        "PGRST001",
+        "PGRST002",
+        "PGRST003",
+    }
+)
+
+DEFAULT_RETRY_ATTEMPTS = 3
+DEFAULT_RETRY_BASE_SECONDS = 0.1
+DEFAULT_RETRY_MAX_SECONDS = 1.0
+DEFAULT_BREAKER_FAILURES = 5
+DEFAULT_BREAKER_RESET_SECONDS = 30.0
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    code = getattr(exc, "code", None)
+    if isinstance(code, str) and code != "":
+        return code in TRANSIENT_ERROR_CODES
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    try:
+        import httpx
+    except ImportError:
+        return False
+    return isinstance(exc, httpx.TransportError)
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    max_attempts: int = DEFAULT_RETRY_ATTEMPTS
+    base_seconds: float = DEFAULT_RETRY_BASE_SECONDS
+    max_seconds: float = DEFAULT_RETRY_MAX_SECONDS
+
+    def backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(cap, base * 2^(attempt-1))].
+        ceiling = min(self.max_seconds, self.base_seconds * (2 ** (attempt - 1)))
+        return random.uniform(0.0, ceiling)
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = DEFAULT_BREAKER_FAILURES,
+        reset_seconds: float = DEFAULT_BREAKER_RESET_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.OPEN or self._probing:
+                return False
+            # Half-open: let exactly one probe through.
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._probing = False
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+
+class DatabaseMetrics:
+    """Per-operation outcome counters (ok / retry / failed / error / circuit_open / replayed)."""
+
+    def __init__(self) -> None:
+        self._counts: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, outcome: str) -> None:
+        with self._lock:
+            outcomes = self._counts.setdefault(operation, {})
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {operation: dict(outcomes) for operation, outcomes in self._counts.items()}
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram (seconds) with Prometheus-style cumulative export."""
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._counts[bisect_left(self.bounds, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q: float) -> float | None:
+        # Upper bound of the bucket holding the q-th observation.
+        with self._lock:
+            if self.count == 0:
+                return None
+            rank = q * self.count
+            seen = 0
+            for index, count in enumerate(self._counts):
+                seen += count
+                if seen >= rank:
+                    return self.bounds[index] if index < len(self.bounds) else self.max
+            return self.max
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            cumulative = []
+            running = 0
+            for bound, count in zip(self.bounds, self._counts):
+                running += count
+                cumulative.append((bound, running))
+            return {
+                "buckets": cumulative,
+                "count": self.count,
+                "sum": self.total,
+                "max": self.max,
+            }
+
+
+__all__ = [
+    "CircuitBreaker",
+    "DatabaseMetrics",
+    "LATENCY_BUCKETS",
+    "LatencyHistogram",
+    "RetryPolicy",
+    "TRANSIENT_ERROR_CODES",
+    "is_transient_error",
+]
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, TypeVar
+import threading
+import time
+
+_T = TypeVar("_T")
+
+# Expired results are only dropped when their key is read again, so sweep
+# them once the table grows past this many entries.
+_SWEEP_THRESHOLD = 1024
+
+
+@dataclass(frozen=True, slots=True)
+class SingleFlightStats:
+    leaders: int
+    shared: int
+    cache_hits: int
+    in_flight: int
+    cached: int
+
+
+class _Call:
+    __slots__ = ("done", "value", "error", "forgotten")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+        self.forgotten = False
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one.
+
+    The first caller for a key runs ``func``; callers arriving while it is in
+    flight wait for and share its result or exception. With ``ttl_seconds``
+    set, a successful result is also served to later callers for that long.
+    ``forget`` drops in-flight calls and cached results for matching keys, so
+    a read that started before a write is never handed to a caller that
+    arrives after it.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._results: dict[Hashable, tuple[float, Any]] = {}
+        self._leaders = 0
+        self._shared = 0
+        self._cache_hits = 0
+
+    def do(self, key: Hashable, func: Callable[[], _T]) -> _T:
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                expires_at, value = cached
+                if self._clock() < expires_at:
+                    self._cache_hits += 1
+                    return value
+                del self._results[key]
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self._leaders += 1
+                leader = True
+            else:
+                self._shared += 1
+                leader = False
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+        try:
+            call.value = func()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                if (
+                    call.error is None
+                    and not call.forgotten
+                    and self.ttl_seconds > 0
+                ):
+                    now = self._clock()
+                    if len(self._results) >= _SWEEP_THRESHOLD:
+                        self._sweep(now)
+                    self._results[key] = (now + self.ttl_seconds, call.value)
+            call.done.set()
+        return call.value
+
+    def _sweep(self, now: float) -> None:
+        expired = [key for key, (at, _) in self._results.items() if at <= now]
+        for key in expired:
+            del self._results[key]
+
+    def forget(self, match: Callable[[Hashable], bool]) -> None:
+        with self._lock:
+            for key in [key for key in self._calls if match(key)]:
+                self._calls.pop(key).forgotten = True
+            for key in [key for key in self._results if match(key)]:
+                del self._results[key]
+
+    def clear(self) -> None:
+        self.forget(lambda key: True)
+
+    def cached_items(self) -> list[tuple[Hashable, Any]]:
+        with self._lock:
+            return [(key, value) for key, (_, value) in self._results.items()]
+
+    def stats(self) -> SingleFlightStats:
+        with self._lock:
+            return SingleFlightStats(
+                leaders=self._leaders,
+                shared=self._shared,
+                cache_hits=self._cache_hits,
+                in_flight=len(self._calls),
+                cached=len(self._results),
+            )
+
+
+__all__ = ["SingleFlight", "SingleFlightStats"]
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+create table if not exists point_spool (
+  id integer primary key autoincrement,
+  request_id text not null unique,
+  guild_id integer not null,
+  user_id integer not null,
+  delta integer not null,
+  kind text not null,
+  created_at real not null
+);
+create index if not exists point_spool_guild_user_idx
+  on point_spool (guild_id, user_id);
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class SpooledDelta:
+    id: int
+    request_id: str
+    guild_id: int
+    user_id: int
+    delta: int
+    kind: str
+    created_at: float
+
+
+class PointSpool:
+    """Append-only SQLite queue of point deltas captured while the DB is unavailable."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("pragma journal_mode=wal")
+        self._conn.execute("pragma synchronous=normal")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._count = self._conn.execute("select count(*) from point_spool").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(
+        self, *, request_id: str, guild_id: int, user_id: int, delta: int, kind: str
+    ) -> None:
+        with self._lock:
+            cursor = self._conn.execute(
+                "insert or ignore into point_spool "
+                "(request_id, guild_id, user_id, delta, kind, created_at) "
+                "values (?, ?, ?, ?, ?, ?)",
+                (request_id, guild_id, user_id, delta, kind, time.time()),
+            )
+            self._conn.commit()
+            self._count += cursor.rowcount
+
+    def peek(self, limit: int) -> list[SpooledDelta]:
+        with self._lock:
+            rows = self._conn.execute(
+                "select id, request_id, guild_id, user_id, delta, kind, created_at "
+                "from point_spool order by id limit ?",
+                (limit,),
+            ).fetchall()
+        return [SpooledDelta(*row) for row in rows]
+
+    def ack(self, up_to_id: int) -> None:
+        with self._lock:
+            cursor = self._conn.execute(
+                "delete from point_spool where id <= ?", (up_to_id,)
+            )
+            self._conn.commit()
+            self._count -= cursor.rowcount
+
+    def pending_delta(self, guild_id: int, user_id: int) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "select coalesce(sum(delta), 0) from point_spool "
+                "where guild_id = ? and user_id = ?",
+                (guild_id, user_id),
+            ).fetchone()
+        return int(row[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+__all__ = ["PointSpool", "SpooledDelta"]
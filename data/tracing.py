@@ -0,0 +1,497 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+import functools
+import inspect
+import json
+import queue
+import random
+import secrets
+import threading
+import time
+
+TRACE_EXPORTERS = ("none", "json", "otlp")
+DEFAULT_OTLP_ENDPOINT = "http://localhost:4318"
+TRACE_BATCH_SIZE = 256
+TRACE_QUEUE_SIZE = 4096
+TRACE_FLUSH_SECONDS = 5.0
+OTLP_TIMEOUT_SECONDS = 5.0
+
+STATUS_UNSET = "UNSET"
+STATUS_OK = "OK"
+STATUS_ERROR = "ERROR"
+
+_OTLP_STATUS_CODES = {STATUS_UNSET: 0, STATUS_OK: 1, STATUS_ERROR: 2}
+
+_T = TypeVar("_T")
+
+
+class Span:
+    """A timed operation; the subset of the OpenTelemetry ``Span`` API we use."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        trace_id: str,
+        parent_id: str | None,
+        processor: BatchSpanProcessor,
+        attributes: dict[str, Any] | None = None,
+    ) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes: dict[str, Any] = dict(attributes or {})
+        self.events: list[tuple[str, int, dict[str, Any]]] = []
+        self.status = STATUS_UNSET
+        self.status_description: str | None = None
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self._processor = processor
+
+    def is_recording(self) -> bool:
+        return self.end_ns is None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, attributes: dict[str, Any] | None = None) -> None:
+        self.events.append((name, time.time_ns(), dict(attributes or {})))
+
+    def set_status(self, status: str, description: str | None = None) -> None:
+        self.status = status
+        self.status_description = description
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.add_event(
+            "exception",
+            {"exception.type": type(exc).__name__, "exception.message": str(exc)},
+        )
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        self._processor.on_end(self)
+
+
+class NonRecordingSpan:
+    """Carries the trace decision for unsampled traces; records nothing."""
+
+    def __init__(self, trace_id: str = "", span_id: str = "") -> None:
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+    def is_recording(self) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: dict[str, Any] | None = None) -> None:
+        pass
+
+    def set_status(self, status: str, description: str | None = None) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+INVALID_SPAN = NonRecordingSpan()
+_current_span: ContextVar[Span | NonRecordingSpan | None] = ContextVar(
+    "myami_current_span", default=None
+)
+
+
+def get_current_span() -> Span | NonRecordingSpan:
+    return _current_span.get() or INVALID_SPAN
+
+
+def set_current_span(span: Span | NonRecordingSpan) -> Token:
+    # For spans that outlive a ``with`` block (a command's root span).
+    return _current_span.set(span)
+
+
+class NoOpTracer:
+    enabled = False
+
+    def start_span(
+        self, name: str, *, attributes: dict[str, Any] | None = None
+    ) -> NonRecordingSpan:
+        return INVALID_SPAN
+
+    @contextmanager
+    def start_as_current_span(
+        self, name: str, *, attributes: dict[str, Any] | None = None
+    ) -> Iterator[NonRecordingSpan]:
+        yield INVALID_SPAN
+
+    def shutdown(self) -> None:
+        pass
+
+
+class Tracer(NoOpTracer):
+    """Parent-based sampling; spans are handed to a background batch exporter."""
+
+    enabled = True
+
+    def __init__(
+        self, processor: BatchSpanProcessor, *, sample_ratio: float = 1.0
+    ) -> None:
+        self._processor = processor
+        self.sample_ratio = sample_ratio
+
+    def start_span(
+        self, name: str, *, attributes: dict[str, Any] | None = None
+    ) -> Span | NonRecordingSpan:
+        parent = _current_span.get()
+        if parent is None:
+            trace_id = secrets.token_hex(16)
+            if random.random() >= self.sample_ratio:
+                return NonRecordingSpan(trace_id)
+            return Span(
+                name,
+                trace_id=trace_id,
+                parent_id=None,
+                processor=self._processor,
+                attributes=attributes,
+            )
+        if isinstance(parent, NonRecordingSpan):
+            return parent
+        return Span(
+            name,
+            trace_id=parent.trace_id,
+            parent_id=parent.span_id,
+            processor=self._processor,
+            attributes=attributes,
+        )
+
+    @contextmanager
+    def start_as_current_span(
+        self, name: str, *, attributes: dict[str, Any] | None = None
+    ) -> Iterator[Span | NonRecordingSpan]:
+        span = self.start_span(name, attributes=attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.record_exception(exc)
+            span.set_status(STATUS_ERROR, type(exc).__name__)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def shutdown(self) -> None:
+        self._processor.shutdown()
+
+
+_tracer: NoOpTracer = NoOpTracer()
+
+
+def get_tracer() -> NoOpTracer:
+    return _tracer
+
+
+def set_tracer(tracer: NoOpTracer) -> None:
+    global _tracer
+    _tracer = tracer
+
+
+def span_to_otlp(span: Span) -> dict[str, Any]:
+    status: dict[str, Any] = {"code": _OTLP_STATUS_CODES[span.status]}
+    if span.status_description:
+        status["message"] = span.status_description
+    payload: dict[str, Any] = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes(span.attributes),
+        "status": status,
+    }
+    if span.parent_id is not None:
+        payload["parentSpanId"] = span.parent_id
+    if span.events:
+        payload["events"] = [
+            {
+                "name": name,
+                "timeUnixNano": str(timestamp),
+                "attributes": _otlp_attributes(attributes),
+            }
+            for name, timestamp, attributes in span.events
+        ]
+    return payload
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    encoded = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            # OTLP/JSON carries 64-bit ints as strings; snowflakes need it.
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        encoded.append({"key": key, "value": typed})
+    return encoded
+
+
+class JsonFileSpanExporter:
+    """Appends one OTLP/JSON span per line to a local file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def export(self, spans: list[Span]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as handle:
+            for span in spans:
+                handle.write(json.dumps(span_to_otlp(span), ensure_ascii=False))
+                handle.write("\n")
+
+
+class OtlpHttpSpanExporter:
+    """POSTs OTLP/JSON to ``<endpoint>/v1/traces`` (collector or any stand-in)."""
+
+    def __init__(
+        self,
+        endpoint: str = DEFAULT_OTLP_ENDPOINT,
+        *,
+        service_name: str = "myami",
+        timeout: float = OTLP_TIMEOUT_SECONDS,
+    ) -> None:
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def export(self, spans: list[Span]) -> None:
+        import urllib.request
+
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes(
+                            {"service.name": self.service_name}
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "myami"},
+                            "spans": [span_to_otlp(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(body).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class BatchSpanProcessor:
+    """Queues ended spans and exports them from a daemon thread.
+
+    Ending a span only enqueues it; when the queue is full the span is dropped
+    and counted rather than blocking the caller.
+    """
+
+    def __init__(
+        self,
+        exporter: JsonFileSpanExporter | OtlpHttpSpanExporter,
+        *,
+        batch_size: int = TRACE_BATCH_SIZE,
+        queue_size: int = TRACE_QUEUE_SIZE,
+        flush_seconds: float = TRACE_FLUSH_SECONDS,
+    ) -> None:
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.dropped = 0
+        self._queue: queue.Queue[Span | None] = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(
+            target=self._run, name="trace-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def on_end(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self) -> None:
+        try:
+            self._queue.put(None, timeout=self.flush_seconds)
+        except queue.Full:
+            return
+        self._thread.join(self.flush_seconds)
+
+    def _run(self) -> None:
+        while True:
+            batch: list[Span] = []
+            deadline = time.monotonic() + self.flush_seconds
+            stop = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    span = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if span is None:
+                    stop = True
+                    break
+                batch.append(span)
+            if batch:
+                try:
+                    self.exporter.export(batch)
+                except Exception as exc:
+                    print(f"[trace] export of {len(batch)} spans failed: {exc}")
+            if stop:
+                return
+
+
+def create_tracer(
+    exporter: str,
+    *,
+    json_path: str | Path | None = None,
+    otlp_endpoint: str = DEFAULT_OTLP_ENDPOINT,
+    sample_ratio: float = 1.0,
+) -> NoOpTracer:
+    if exporter == "none":
+        return NoOpTracer()
+    if exporter == "json":
+        if json_path is None:
+            raise ValueError("the json trace exporter needs a file path")
+        span_exporter: JsonFileSpanExporter | OtlpHttpSpanExporter = (
+            JsonFileSpanExporter(json_path)
+        )
+    elif exporter == "otlp":
+        span_exporter = OtlpHttpSpanExporter(otlp_endpoint)
+    else:
+        raise ValueError(f"unknown trace exporter: {exporter}")
+    return Tracer(BatchSpanProcessor(span_exporter), sample_ratio=sample_ratio)
+
+
+def _id_attributes(signature: inspect.Signature) -> list[tuple[str, str]]:
+    # guild_id -> guild.id, target_id -> target.id, ...
+    return [
+        (name, name[: -len("_id")] + ".id")
+        for name in signature.parameters
+        if name.endswith("_id")
+    ]
+
+
+def traced(name: str) -> Callable[[Callable[..., _T]], Callable[..., _T]]:
+    """Runs the function in a span, tagged with its ``*_id`` arguments."""
+
+    def decorate(func: Callable[..., _T]) -> Callable[..., _T]:
+        signature = inspect.signature(func)
+        id_params = _id_attributes(signature)
+
+        def attributes_for(args: tuple, kwargs: dict[str, Any]) -> dict[str, Any]:
+            attributes: dict[str, Any] = {}
+            if id_params:
+                bound = signature.bind_partial(*args, **kwargs).arguments
+                for param, key in id_params:
+                    value = bound.get(param)
+                    if isinstance(value, int):
+                        attributes[key] = value
+            return attributes
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                tracer = _tracer
+                if not tracer.enabled:
+                    return await func(*args, **kwargs)
+                with tracer.start_as_current_span(
+                    name, attributes=attributes_for(args, kwargs)
+                ):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> _T:
+            tracer = _tracer
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.start_as_current_span(
+                name, attributes=attributes_for(args, kwargs)
+            ):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def traced_methods(
+    prefix: str, *, exclude: frozenset[str] = frozenset()
+) -> Callable[[type[_T]], type[_T]]:
+    """Class decorator applying ``traced`` to every public method."""
+
+    def decorate(cls: type[_T]) -> type[_T]:
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or attr in exclude:
+                continue
+            if not inspect.isfunction(value):
+                continue
+            setattr(cls, attr, traced(f"{prefix}.{attr}")(value))
+        return cls
+
+    return decorate
+
+
+__all__ = [
+    "BatchSpanProcessor",
+    "DEFAULT_OTLP_ENDPOINT",
+    "INVALID_SPAN",
+    "JsonFileSpanExporter",
+    "NoOpTracer",
+    "NonRecordingSpan",
+    "OtlpHttpSpanExporter",
+    "STATUS_ERROR",
+    "STATUS_OK",
+    "STATUS_UNSET",
+    "Span",
+    "TRACE_EXPORTERS",
+    "Tracer",
+    "create_tracer",
+    "get_current_span",
+    "get_tracer",
+    "set_current_span",
+    "set_tracer",
+    "span_to_otlp",
+    "traced",
+    "traced_methods",
+]
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+import threading
+
+from data.database import DatabaseUnavailableError
+from data.invalidation import parse_key
+from service.earning.rules import EarningPolicy, EarningRules, compile_earning_rules
+from service.time.clock import Clock, SystemClock
+
+
+@dataclass(frozen=True, slots=True)
+class GuildSettings:
+    clan_register_channel_id: int | None
+    role_prices: dict[int, int]
+    remove_permitted_user_ids: frozenset[int]
+    earning_policy: EarningPolicy
+
+    @classmethod
+    def from_row(cls, row: dict[str, Any]) -> GuildSettings:
+        channel_id = row.get("clan_register_channel_id")
+        role_prices = row.get("role_prices") or {}
+        permitted = row.get("remove_permitted_user_ids") or []
+        earning_rules = EarningRules.from_row(row.get("earning_rules"))
+        return cls(
+            clan_register_channel_id=None if channel_id is None else int(channel_id),
+            role_prices={int(role_id): int(price) for role_id, price in role_prices.items()},
+            remove_permitted_user_ids=frozenset(int(user_id) for user_id in permitted),
+            earning_policy=compile_earning_rules(earning_rules),
+        )
+
+
+@dataclass(slots=True)
+class _CacheEntry:
+    settings: GuildSettings
+    loaded_at: float
+
+
+class GuildSettingsCache:
+    def __init__(
+        self,
+        repo,
+        *,
+        ttl_seconds: float | None = None,
+        clock: Clock | None = None,
+    ) -> None:
+        self._repo = repo
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock or SystemClock()
+        self._entries: dict[int, _CacheEntry] = {}
+        self._generations: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def items(self) -> list[tuple[int, GuildSettings]]:
+        with self._lock:
+            return [(guild_id, entry.settings) for guild_id, entry in self._entries.items()]
+
+    def get(self, guild_id: int) -> GuildSettings:
+        now = self.clock.now()
+        with self._lock:
+            entry = self._entries.get(guild_id)
+            generation = self._generations.get(guild_id, 0)
+        if entry is not None and not self._is_expired(entry, now=now):
+            return entry.settings
+        try:
+            row = self._repo.get_guild_settings(guild_id)
+        except DatabaseUnavailableError:
+            # An expired entry beats failing every message during an outage.
+            if entry is None:
+                raise
+            return entry.settings
+        settings = GuildSettings.from_row(row)
+        with self._lock:
+            # Skip the store if a write invalidated the guild while loading.
+            if self._generations.get(guild_id, 0) == generation:
+                self._entries[guild_id] = _CacheEntry(settings=settings, loaded_at=now)
+        return settings
+
+    async def load(
+        self, guild_id: int, run: Callable[..., Awaitable[GuildSettings]]
+    ) -> GuildSettings:
+        """Like ``get``, but a miss is loaded through ``run`` (the DB executor)."""
+        now = self.clock.now()
+        with self._lock:
+            entry = self._entries.get(guild_id)
+        if entry is not None and not self._is_expired(entry, now=now):
+            return entry.settings
+        return await run(self.get, guild_id)
+
+    def peek(self, guild_id: int) -> GuildSettings | None:
+        with self._lock:
+            entry = self._entries.get(guild_id)
+        return None if entry is None else entry.settings
+
+    def invalidate(self, guild_id: int) -> None:
+        with self._lock:
+            self._entries.pop(guild_id, None)
+            self._generations[guild_id] = self._generations.get(guild_id, 0) + 1
+
+    def handle_invalidation(self, key: str) -> None:
+        kind, ids = parse_key(key)
+        if kind != "guild_settings":
+            return
+        if ids:
+            self.invalidate(ids[0])
+        else:
+            self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            for guild_id in self._entries:
+                self._generations[guild_id] = self._generations.get(guild_id, 0) + 1
+            self._entries.clear()
+
+    def _is_expired(self, entry: _CacheEntry, *, now: float) -> bool:
+        if self.ttl_seconds is None:
+            return False
+        return now - entry.loaded_at >= self.ttl_seconds
+
+
+__all__ = ["GuildSettings", "GuildSettingsCache"]
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import asyncio
+import sys
+import threading
+import time
+import traceback
+import weakref
+
+from data.resilience import LatencyHistogram
+
+LOOP_LAG_INTERVAL_SECONDS = 0.5
+LOOP_LAG_THRESHOLD_SECONDS = 0.25
+LOOP_STALL_STACK_LIMIT = 30
+
+
+@dataclass(frozen=True, slots=True)
+class LoopStall:
+    label: str
+    seconds: float
+    stack: str
+    at: float
+
+
+@dataclass(slots=True)
+class _PendingStall:
+    beat: float
+    label: str
+    stack: str
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag and names whatever blocked the loop.
+
+    A heartbeat coroutine records how late each ``interval`` sleep wakes up.
+    A watchdog thread notices a missed heartbeat while the loop is still
+    blocked and captures the loop thread's stack plus the running task's label
+    (``label_current_task``, else the task name discord.py gives each event).
+    """
+
+    def __init__(
+        self,
+        *,
+        interval_seconds: float = LOOP_LAG_INTERVAL_SECONDS,
+        threshold_seconds: float = LOOP_LAG_THRESHOLD_SECONDS,
+    ) -> None:
+        self.interval_seconds = interval_seconds
+        self.threshold_seconds = threshold_seconds
+        self.lag = LatencyHistogram()
+        self.stalls: dict[str, LatencyHistogram] = {}
+        self.last_stall: LoopStall | None = None
+        self._labels: weakref.WeakKeyDictionary[asyncio.Task, str] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._last_beat = time.monotonic()
+        self._pending: _PendingStall | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._heartbeat(), name="loop-lag-heartbeat")
+        self._thread = threading.Thread(
+            target=self._watch, name="loop-lag-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def label_current_task(self, label: str) -> None:
+        task = asyncio.current_task()
+        if task is not None:
+            self._labels[task] = label
+
+    def stall_summary(self) -> list[tuple[str, LatencyHistogram]]:
+        with self._lock:
+            items = list(self.stalls.items())
+        return sorted(items, key=lambda item: item[1].total, reverse=True)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._last_beat = now
+            self.lag.observe(lag)
+            if lag >= self.threshold_seconds:
+                self._record_stall(lag, now=now)
+
+    def _record_stall(self, seconds: float, *, now: float) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, None
+            label = pending.label if pending is not None else "unknown"
+            stack = pending.stack if pending is not None else ""
+            histogram = self.stalls.get(label)
+            if histogram is None:
+                histogram = self.stalls[label] = LatencyHistogram()
+        histogram.observe(seconds)
+        self.last_stall = LoopStall(label=label, seconds=seconds, stack=stack, at=now)
+        print(f"[loop] event loop blocked for {seconds * 1000:.0f}ms by {label}")
+
+    def _watch(self) -> None:
+        poll = min(self.interval_seconds, self.threshold_seconds) / 4
+        while not self._stop.wait(poll):
+            beat = self._last_beat
+            overdue = time.monotonic() - beat - self.interval_seconds
+            if overdue < self.threshold_seconds:
+                continue
+            with self._lock:
+                if self._pending is not None and self._pending.beat == beat:
+                    continue
+            # Still blocked: this is the stack doing the blocking.
+            label = self._running_label()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = (
+                "".join(traceback.format_stack(frame, limit=LOOP_STALL_STACK_LIMIT))
+                if frame is not None
+                else ""
+            )
+            with self._lock:
+                self._pending = _PendingStall(beat=beat, label=label, stack=stack)
+            print(
+                f"[loop] event loop blocked for {overdue * 1000:.0f}ms+ by {label}\n"
+                f"{stack}",
+                end="",
+            )
+
+    def _running_label(self) -> str:
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        if task is None:
+            return "callback"
+        return self._labels.get(task) or task.get_name()
+
+
+__all__ = [
+    "LOOP_LAG_INTERVAL_SECONDS",
+    "LOOP_LAG_THRESHOLD_SECONDS",
+    "LoopLagMonitor",
+    "LoopStall",
+]
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Iterable
+import os
+import sys
+import threading
+import tracemalloc
+
+TRACEMALLOC_ENV = "MYAMI_TRACEMALLOC"
+TRACEMALLOC_DEFAULT_FRAMES = 1
+MEMORY_SIZE_SAMPLE = 200
+MEMORY_TOP_ALLOCATORS = 15
+
+_ATOMIC_TYPES = (int, float, bool, str, bytes, type(None))
+
+
+def deep_sizeof(obj: Any, *, _seen: set[int] | None = None) -> int:
+    """Recursive ``sys.getsizeof`` over containers, dataclasses and slots."""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, _ATOMIC_TYPES):
+        return size
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_sizeof(key, _seen=seen) + deep_sizeof(value, _seen=seen)
+        return size
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        for item in obj:
+            size += deep_sizeof(item, _seen=seen)
+        return size
+    if hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), _seen=seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            size += deep_sizeof(getattr(obj, slot), _seen=seen)
+    return size
+
+
+def approx_sizeof_items(
+    items: Iterable[Any], count: int, *, sample: int = MEMORY_SIZE_SAMPLE
+) -> int:
+    """Sizes the first ``sample`` items deeply and extrapolates to ``count``."""
+    if count <= 0:
+        return 0
+    sampled = list(islice(items, sample))
+    if not sampled:
+        return 0
+    seen: set[int] = set()
+    total = sum(deep_sizeof(item, _seen=seen) for item in sampled)
+    return int(total * count / len(sampled))
+
+
+def shallow_sizeof_items(
+    items: Iterable[Any], count: int, *, sample: int = MEMORY_SIZE_SAMPLE
+) -> int:
+    # For objects that reference shared state (discord.py models point back at
+    # their guild and connection), only the objects themselves are counted.
+    if count <= 0:
+        return 0
+    sampled = list(islice(items, sample))
+    if not sampled:
+        return 0
+    total = 0
+    for item in sampled:
+        total += sys.getsizeof(item)
+        for slot in getattr(type(item), "__slots__", ()):
+            value = getattr(item, slot, None)
+            if isinstance(value, _ATOMIC_TYPES):
+                total += sys.getsizeof(value)
+    return int(total * count / len(sampled))
+
+
+@dataclass(frozen=True, slots=True)
+class StoreStats:
+    name: str
+    entries: int
+    approx_bytes: int
+
+
+@dataclass(frozen=True, slots=True)
+class AllocationStat:
+    location: str
+    size_bytes: int
+    size_diff_bytes: int
+    count: int
+    count_diff: int
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GiB"
+
+
+def current_rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            resident_pages = int(handle.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+class MemoryProfiler:
+    """tracemalloc wrapper keeping the previous snapshot for growth diffs."""
+
+    def __init__(self) -> None:
+        self._previous: tracemalloc.Snapshot | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def enable_from_env(self) -> None:
+        raw = os.getenv(TRACEMALLOC_ENV, "").strip().lower()
+        if raw in {"", "0", "false", "no", "off"}:
+            return
+        frames = int(raw) if raw.isdigit() else TRACEMALLOC_DEFAULT_FRAMES
+        self.start(frames)
+
+    def start(self, frames: int = TRACEMALLOC_DEFAULT_FRAMES) -> None:
+        if tracemalloc.is_tracing():
+            return
+        tracemalloc.start(frames)
+        print(f"[memory] tracemalloc started ({frames} frames)")
+
+    def stop(self) -> None:
+        with self._lock:
+            self._previous = None
+        tracemalloc.stop()
+
+    def top_allocators(self, limit: int = MEMORY_TOP_ALLOCATORS) -> list[AllocationStat]:
+        """Takes a snapshot; stats are diffs against the previous one, if any."""
+        if not tracemalloc.is_tracing():
+            self.start()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            )
+        )
+        with self._lock:
+            previous, self._previous = self._previous, snapshot
+        if previous is None:
+            return [
+                AllocationStat(
+                    location=str(stat.traceback),
+                    size_bytes=stat.size,
+                    size_diff_bytes=0,
+                    count=stat.count,
+                    count_diff=0,
+                )
+                for stat in snapshot.statistics("lineno")[:limit]
+            ]
+        return [
+            AllocationStat(
+                location=str(stat.traceback),
+                size_bytes=stat.size,
+                size_diff_bytes=stat.size_diff,
+                count=stat.count,
+                count_diff=stat.count_diff,
+            )
+            for stat in snapshot.compare_to(previous, "lineno")[:limit]
+        ]
+
+    def traced_memory(self) -> tuple[int, int] | None:
+        if not tracemalloc.is_tracing():
+            return None
+        return tracemalloc.get_traced_memory()
+
+
+memory_profiler = MemoryProfiler()
+
+
+__all__ = [
+    "AllocationStat",
+    "MemoryProfiler",
+    "StoreStats",
+    "TRACEMALLOC_ENV",
+    "approx_sizeof_items",
+    "current_rss_bytes",
+    "deep_sizeof",
+    "format_bytes",
+    "memory_profiler",
+    "shallow_sizeof_items",
+]
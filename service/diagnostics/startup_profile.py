@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from importlib.abc import Loader, MetaPathFinder
+from importlib.machinery import ModuleSpec
+from typing import Iterator
+import os
+import sys
+import threading
+import time
+
+STARTUP_PROFILE_ENV = "MYAMI_STARTUP_PROFILE"
+STARTUP_PROFILE_TOP_IMPORTS = 25
+
+
+class _TimingLoader(Loader):
+    def __init__(self, loader: Loader, finder: _ImportTimingFinder) -> None:
+        self._loader = loader
+        self._finder = finder
+
+    def __getattr__(self, name: str):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec: ModuleSpec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        self._finder.enter(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._finder.exit(module.__name__)
+
+
+class _ImportTimingFinder(MetaPathFinder):
+    def __init__(self) -> None:
+        self.inclusive: dict[str, float] = {}
+        self.exclusive: dict[str, float] = {}
+        self._local = threading.local()
+
+    def find_spec(self, fullname: str, path, target=None) -> ModuleSpec | None:
+        if getattr(self._local, "finding", False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+        if spec.loader is None or not hasattr(spec.loader, "exec_module"):
+            return spec
+        spec.loader = _TimingLoader(spec.loader, self)
+        return spec
+
+    def enter(self, name: str) -> None:
+        stack = self._stack()
+        stack.append((name, time.perf_counter(), 0.0))
+
+    def exit(self, name: str) -> None:
+        stack = self._stack()
+        entry_name, started, child_seconds = stack.pop()
+        elapsed = time.perf_counter() - started
+        self.inclusive[entry_name] = self.inclusive.get(entry_name, 0.0) + elapsed
+        self.exclusive[entry_name] = (
+            self.exclusive.get(entry_name, 0.0) + elapsed - child_seconds
+        )
+        if stack:
+            parent_name, parent_started, parent_child = stack[-1]
+            stack[-1] = (parent_name, parent_started, parent_child + elapsed)
+
+    def _stack(self) -> list[tuple[str, float, float]]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
+
+
+class StartupProfiler:
+    def __init__(self) -> None:
+        self.enabled = False
+        self._started = time.perf_counter()
+        self._finder: _ImportTimingFinder | None = None
+        self.sections: list[tuple[str, float]] = []
+
+    def enable_from_env(self) -> None:
+        raw = os.getenv(STARTUP_PROFILE_ENV, "")
+        if raw.strip().lower() in {"1", "true", "yes", "on"}:
+            self.enable()
+
+    def enable(self) -> None:
+        if self.enabled:
+            return
+        self.enabled = True
+        self._finder = _ImportTimingFinder()
+        sys.meta_path.insert(0, self._finder)
+        print("[profile] startup profiling enabled")
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.sections.append((name, elapsed))
+            print(f"[profile] {name}: {elapsed * 1000:.1f}ms")
+
+    def mark(self, name: str) -> None:
+        if not self.enabled:
+            return
+        elapsed = time.perf_counter() - self._started
+        print(f"[profile] {name} at +{elapsed * 1000:.1f}ms")
+
+    def report_imports(self, limit: int = STARTUP_PROFILE_TOP_IMPORTS) -> None:
+        if not self.enabled or self._finder is None:
+            return
+        ranked = sorted(
+            self._finder.inclusive.items(), key=lambda item: item[1], reverse=True
+        )
+        print(f"[profile] slowest imports (top {limit}, inclusive / self):")
+        for name, inclusive in ranked[:limit]:
+            exclusive = self._finder.exclusive.get(name, 0.0)
+            print(
+                f"[profile]   {name}: {inclusive * 1000:.1f}ms / "
+                f"{exclusive * 1000:.1f}ms"
+            )
+
+
+startup_profiler = StartupProfiler()
+
+
+__all__ = ["STARTUP_PROFILE_ENV", "StartupProfiler", "startup_profiler"]
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+
+def channel_scope(channel: Any) -> tuple[int, ...]:
+    """Ids a rule may name for ``channel``: itself, its thread parent, its category."""
+    ids = [channel.id]
+    parent_id = getattr(channel, "parent_id", None)
+    if parent_id is not None and parent_id != channel.id:
+        ids.append(parent_id)
+        parent = getattr(channel, "parent", None)
+        category_id = getattr(parent, "category_id", None)
+    else:
+        category_id = getattr(channel, "category_id", None)
+    if category_id is not None and category_id not in ids:
+        ids.append(category_id)
+    return tuple(ids)
+
+
+def _assign_bits(ids: Iterable[int]) -> dict[int, int]:
+    return {item_id: 1 << position for position, item_id in enumerate(sorted(set(ids)))}
+
+
+class EarningIndex:
+    """Maps the role and channel ids one guild's rules mention to bit positions.
+
+    Rules become integer masks, so eligibility is a few ``&`` on ints instead
+    of set lookups over every role a member holds.
+    """
+
+    def __init__(self, *, role_ids: Iterable[int], channel_ids: Iterable[int]) -> None:
+        self.role_bits = _assign_bits(role_ids)
+        self.channel_bits = _assign_bits(channel_ids)
+        # channel id -> mask of its scope; dropped when channels move.
+        self._channel_masks: dict[int, int] = {}
+
+    def roles_mask(self, role_ids: Iterable[int]) -> int:
+        mask = 0
+        for role_id in role_ids:
+            mask |= self.role_bits.get(role_id, 0)
+        return mask
+
+    def channels_mask(self, channel_ids: Iterable[int]) -> int:
+        mask = 0
+        for channel_id in channel_ids:
+            mask |= self.channel_bits.get(channel_id, 0)
+        return mask
+
+    def member_mask(self, member: Any) -> int:
+        # Probes only the indexed roles (Member.get_role is a bisect over the
+        # member's sorted role ids), never the member's full role list.
+        get_role = getattr(member, "get_role", None)
+        if get_role is None or not self.role_bits:
+            return 0
+        mask = 0
+        for role_id, bit in self.role_bits.items():
+            if get_role(role_id) is not None:
+                mask |= bit
+        return mask
+
+    def channel_mask(self, channel: Any) -> int:
+        if not self.channel_bits:
+            return 0
+        mask = self._channel_masks.get(channel.id)
+        if mask is None:
+            mask = self.channels_mask(channel_scope(channel))
+            self._channel_masks[channel.id] = mask
+        return mask
+
+    def clear_channels(self) -> None:
+        self._channel_masks.clear()
+
+
+__all__ = ["EarningIndex", "channel_scope"]
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable
+import math
+
+from service.earning.bitset_index import EarningIndex
+
+DEFAULT_MESSAGE_POINTS = 1
+DEFAULT_MIN_MESSAGE_LENGTH = 0
+DEFAULT_VOICE_INTERVAL_SECONDS = 7 * 60
+DEFAULT_VOICE_MIN_MEMBERS = 2
+
+MAX_MESSAGE_POINTS = 100
+MAX_MIN_MESSAGE_LENGTH = 2000
+MIN_VOICE_INTERVAL_SECONDS = 60
+MAX_VOICE_INTERVAL_SECONDS = 24 * 60 * 60
+MAX_VOICE_MIN_MEMBERS = 99
+MAX_ROLE_MULTIPLIER = 10.0
+
+CHANNEL_RULE_MODES = ("allow", "deny", "clear")
+
+# Closures take the masks from EarningIndex, not raw ids.
+ChannelPredicate = Callable[[int], bool]
+RoleMultiplier = Callable[[int], float]
+MessagePoints = Callable[[int, int, int], int]
+VoiceEligible = Callable[[bool, int, int], bool]
+
+
+@dataclass(frozen=True, slots=True)
+class EarningRules:
+    message_points: int = DEFAULT_MESSAGE_POINTS
+    min_message_length: int = DEFAULT_MIN_MESSAGE_LENGTH
+    allowed_channel_ids: frozenset[int] = frozenset()
+    denied_channel_ids: frozenset[int] = frozenset()
+    role_multipliers: dict[int, float] = field(default_factory=dict)
+    voice_interval_seconds: int = DEFAULT_VOICE_INTERVAL_SECONDS
+    voice_min_members: int = DEFAULT_VOICE_MIN_MEMBERS
+    voice_allow_muted: bool = False
+
+    @classmethod
+    def from_row(cls, row: dict[str, Any] | None) -> EarningRules:
+        row = row or {}
+        default = cls()
+        return cls(
+            message_points=int(row.get("message_points", default.message_points)),
+            min_message_length=int(
+                row.get("min_message_length", default.min_message_length)
+            ),
+            allowed_channel_ids=frozenset(
+                int(channel_id) for channel_id in row.get("allowed_channel_ids") or []
+            ),
+            denied_channel_ids=frozenset(
+                int(channel_id) for channel_id in row.get("denied_channel_ids") or []
+            ),
+            role_multipliers={
+                int(role_id): float(multiplier)
+                for role_id, multiplier in (row.get("role_multipliers") or {}).items()
+            },
+            voice_interval_seconds=max(
+                MIN_VOICE_INTERVAL_SECONDS,
+                int(row.get("voice_interval_seconds", default.voice_interval_seconds)),
+            ),
+            voice_min_members=int(
+                row.get("voice_min_members", default.voice_min_members)
+            ),
+            voice_allow_muted=bool(
+                row.get("voice_allow_muted", default.voice_allow_muted)
+            ),
+        )
+
+    def to_row(self) -> dict[str, Any]:
+        return {
+            "message_points": self.message_points,
+            "min_message_length": self.min_message_length,
+            "allowed_channel_ids": sorted(self.allowed_channel_ids),
+            "denied_channel_ids": sorted(self.denied_channel_ids),
+            "role_multipliers": {
+                str(role_id): multiplier
+                for role_id, multiplier in sorted(self.role_multipliers.items())
+            },
+            "voice_interval_seconds": self.voice_interval_seconds,
+            "voice_min_members": self.voice_min_members,
+            "voice_allow_muted": self.voice_allow_muted,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class EarningPolicy:
+    """Rules compiled once per guild into closures over ``index`` bitmasks."""
+
+    rules: EarningRules
+    index: EarningIndex
+    uses_channels: bool
+    uses_roles: bool
+    channel_allowed: ChannelPredicate
+    role_multiplier: RoleMultiplier
+    message_points: MessagePoints
+    voice_eligible: VoiceEligible
+
+    @property
+    def voice_interval_seconds(self) -> int:
+        return self.rules.voice_interval_seconds
+
+    def channel_mask(self, channel: Any) -> int:
+        return self.index.channel_mask(channel) if self.uses_channels else 0
+
+    def member_mask(self, member: Any) -> int:
+        return self.index.member_mask(member) if self.uses_roles else 0
+
+
+def _any_channel(channel_mask: int) -> bool:
+    return True
+
+
+def _unit_multiplier(role_mask: int) -> float:
+    return 1.0
+
+
+def _compile_channel_predicate(
+    index: EarningIndex, allowed: frozenset[int], denied: frozenset[int]
+) -> ChannelPredicate:
+    # A channel matches through its own id, its thread parent or its category;
+    # a deny match always wins over an allow match.
+    if not allowed and not denied:
+        return _any_channel
+    allow_mask = index.channels_mask(allowed)
+    deny_mask = index.channels_mask(denied)
+    if not allowed:
+        return lambda channel_mask: not channel_mask & deny_mask
+    if not denied:
+        return lambda channel_mask: bool(channel_mask & allow_mask)
+    return lambda channel_mask: not channel_mask & deny_mask and bool(
+        channel_mask & allow_mask
+    )
+
+
+def _compile_role_multiplier(
+    index: EarningIndex, multipliers: dict[int, float]
+) -> RoleMultiplier:
+    if not multipliers:
+        return _unit_multiplier
+    # Any 0x role excludes the member; otherwise the best matching tier wins.
+    excluded_mask = index.roles_mask(
+        role_id for role_id, multiplier in multipliers.items() if multiplier == 0.0
+    )
+    tiers: dict[float, list[int]] = {}
+    for role_id, multiplier in multipliers.items():
+        if multiplier != 0.0:
+            tiers.setdefault(multiplier, []).append(role_id)
+    tier_masks = [
+        (index.roles_mask(role_ids), multiplier)
+        for multiplier, role_ids in sorted(tiers.items(), reverse=True)
+    ]
+
+    def role_multiplier(role_mask: int) -> float:
+        if role_mask & excluded_mask:
+            return 0.0
+        for tier_mask, multiplier in tier_masks:
+            if role_mask & tier_mask:
+                return multiplier
+        return 1.0
+
+    return role_multiplier
+
+
+def _compile_message_points(
+    rules: EarningRules,
+    channel_allowed: ChannelPredicate,
+    role_multiplier: RoleMultiplier,
+) -> MessagePoints:
+    base = rules.message_points
+    min_length = rules.min_message_length
+    if base <= 0:
+        return lambda channel_mask, role_mask, length: 0
+    if channel_allowed is _any_channel and role_multiplier is _unit_multiplier:
+        if min_length <= 0:
+            return lambda channel_mask, role_mask, length: base
+        return lambda channel_mask, role_mask, length: base if length >= min_length else 0
+
+    def message_points(channel_mask: int, role_mask: int, length: int) -> int:
+        if length < min_length or not channel_allowed(channel_mask):
+            return 0
+        multiplier = role_multiplier(role_mask)
+        if multiplier == 0.0:
+            return 0
+        # Round half up, and never below 1: only a 0x role excludes a member.
+        return max(1, math.floor(base * multiplier + 0.5))
+
+    return message_points
+
+
+def _compile_voice_eligible(
+    rules: EarningRules, channel_allowed: ChannelPredicate
+) -> VoiceEligible:
+    allow_muted = rules.voice_allow_muted
+    min_members = rules.voice_min_members
+
+    def voice_eligible(muted: bool, member_count: int, channel_mask: int) -> bool:
+        if muted and not allow_muted:
+            return False
+        if member_count < min_members:
+            return False
+        return channel_allowed(channel_mask)
+
+    return voice_eligible
+
+
+def compile_earning_rules(rules: EarningRules) -> EarningPolicy:
+    index = EarningIndex(
+        role_ids=rules.role_multipliers,
+        channel_ids=rules.allowed_channel_ids | rules.denied_channel_ids,
+    )
+    channel_allowed = _compile_channel_predicate(
+        index, rules.allowed_channel_ids, rules.denied_channel_ids
+    )
+    role_multiplier = _compile_role_multiplier(index, rules.role_multipliers)
+    return EarningPolicy(
+        rules=rules,
+        index=index,
+        uses_channels=channel_allowed is not _any_channel,
+        uses_roles=role_multiplier is not _unit_multiplier,
+        channel_allowed=channel_allowed,
+        role_multiplier=role_multiplier,
+        message_points=_compile_message_points(rules, channel_allowed, role_multiplier),
+        voice_eligible=_compile_voice_eligible(rules, channel_allowed),
+    )
+
+
+DEFAULT_EARNING_POLICY = compile_earning_rules(EarningRules())
+
+
+__all__ = [
+    "CHANNEL_RULE_MODES",
+    "DEFAULT_EARNING_POLICY",
+    "DEFAULT_MESSAGE_POINTS",
+    "DEFAULT_VOICE_INTERVAL_SECONDS",
+    "DEFAULT_VOICE_MIN_MEMBERS",
+    "EarningPolicy",
+    "EarningRules",
+    "MAX_MESSAGE_POINTS",
+    "MAX_MIN_MESSAGE_LENGTH",
+    "MAX_ROLE_MULTIPLIER",
+    "MAX_VOICE_INTERVAL_SECONDS",
+    "MAX_VOICE_MIN_MEMBERS",
+    "MIN_VOICE_INTERVAL_SECONDS",
+    "compile_earning_rules",
+]
@@ -4,6 +4,8 @@ from dataclasses import dataclass
 
 import discord
 
+from data.async_repository import AsyncPointsRepository
+from service.ledger.game_rounds import GameRoundWriter
 from service.random.rng import Rng
 from service.time.clock import Clock
 from service.sessions.game_sessions import GameSession
@@ -15,10 +17,11 @@ class GameContext:
     channel_id: int
     user_id: int
     message: discord.Message
-    points_repo: object
+    points_repo: AsyncPointsRepository
     now: float
     rng: Rng
     clock: Clock
+    ledger: GameRoundWriter | None = None
 
 
 class BaseGame:
@@ -7,6 +7,7 @@ from service.games.support import (
     ensure_balance,
     parse_bet_with_choice,
     parse_coin_choice,
+    record_round,
     validate_bet,
 )
 from service.sessions.game_sessions import GameInputSession, GameSession
@@ -24,7 +25,7 @@ class CoinGame(BaseGame):
                 if bet_error is not None:
                     await context.message.channel.send(bet_error)
                     return None
-                can_pay, required, points = ensure_balance(
+                can_pay, required, points = await ensure_balance(
                     context.points_repo,
                     context.guild_id,
                     context.user_id,
@@ -68,7 +69,7 @@ class CoinGame(BaseGame):
             if bet_error is not None:
                 await context.message.channel.send(bet_error)
                 return session
-            can_pay, required, points = ensure_balance(
+            can_pay, required, points = await ensure_balance(
                 context.points_repo,
                 context.guild_id,
                 context.user_id,
@@ -97,7 +98,7 @@ class CoinGame(BaseGame):
         await context.message.channel.send("入力待ちが時間切れで終了しました。")
 
     async def _resolve(self, context: GameContext, bet: int, choice: str) -> GameSession | None:
-        can_pay, required, points = ensure_balance(
+        can_pay, required, points = await ensure_balance(
             context.points_repo,
             context.guild_id,
             context.user_id,
@@ -110,12 +111,15 @@ class CoinGame(BaseGame):
             )
             return None
 
-        context.points_repo.add_points(context.guild_id, context.user_id, -bet)
+        await context.points_repo.add_points(
+            context.guild_id, context.user_id, -bet, kind="game"
+        )
         result = context.rng.choice(["heads", "tails"])
         multiplier = 1.7 if result == choice else 0.0
-        payout = apply_payout(
+        payout = await apply_payout(
             context.points_repo, context.guild_id, context.user_id, bet, multiplier
         )
+        record_round(context, self.game_key, bet, payout)
         net = payout - bet
         result_label = coin_label(result)
         choice_label = coin_label(choice)
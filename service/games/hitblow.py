@@ -8,6 +8,7 @@ from service.games.support import (
     is_cancel_message,
     normalize_digits,
     parse_bet,
+    record_round,
     validate_bet,
 )
 from service.sessions.game_sessions import GameInputSession, GameSession, HitBlowSession
@@ -50,7 +51,7 @@ class HitBlowGame(BaseGame):
                 if bet_error is not None:
                     await context.message.channel.send(bet_error)
                     return session
-                can_pay, required, points = ensure_balance(
+                can_pay, required, points = await ensure_balance(
                     context.points_repo,
                     context.guild_id,
                     context.user_id,
@@ -70,6 +71,7 @@ class HitBlowGame(BaseGame):
 
         content = raw.strip()
         if is_cancel_message(content):
+            record_round(context, self.game_key, session.bet, 0, outcome="forfeit")
             await context.message.channel.send(
                 "hit&blow を終了しました。賭けるポイントは没収されます。"
             )
@@ -87,9 +89,10 @@ class HitBlowGame(BaseGame):
         hits, blows = self._count_hits_blows(normalized, session.target)
 
         if hits == HIT_BLOW_DIGITS:
-            payout = apply_payout(
+            payout = await apply_payout(
                 context.points_repo, context.guild_id, context.user_id, session.bet, 3.0
             )
+            record_round(context, self.game_key, session.bet, payout)
             net = payout - session.bet
             await context.message.channel.send(
                 f"🎉 正解！ {session.target}\n倍率: x3.0 / 差引: {net:+}ポイント"
@@ -97,6 +100,7 @@ class HitBlowGame(BaseGame):
             return None
 
         if session.attempts_left <= 0:
+            record_round(context, self.game_key, session.bet, 0)
             await context.message.channel.send(
                 f"残念！正解は {session.target} でした。賭けるポイントは没収されます。"
             )
@@ -108,6 +112,8 @@ class HitBlowGame(BaseGame):
         return session
 
     async def timeout(self, context: GameContext, session: GameSession) -> None:
+        if isinstance(session, HitBlowSession):
+            record_round(context, self.game_key, session.bet, 0, outcome="timeout")
         await context.message.channel.send("hit&blow は時間切れで終了しました。")
 
     async def _start_session(self, context: GameContext, bet: int) -> GameSession | None:
@@ -115,7 +121,7 @@ class HitBlowGame(BaseGame):
         if bet_error is not None:
             await context.message.channel.send(bet_error)
             return None
-        can_pay, required, points = ensure_balance(
+        can_pay, required, points = await ensure_balance(
             context.points_repo,
             context.guild_id,
             context.user_id,
@@ -128,7 +134,9 @@ class HitBlowGame(BaseGame):
             )
             return None
 
-        context.points_repo.add_points(context.guild_id, context.user_id, -bet)
+        await context.points_repo.add_points(
+            context.guild_id, context.user_id, -bet, kind="game"
+        )
         target = "".join(context.rng.sample("0123456789", HIT_BLOW_DIGITS))
         session = HitBlowSession(
             game=self.game_key,
@@ -9,6 +9,7 @@ from service.games.support import (
     janken_result,
     parse_bet_with_choice,
     parse_janken_choice,
+    record_round,
     validate_bet,
 )
 from service.sessions.game_sessions import GameInputSession, GameSession, JankenSession
@@ -65,7 +66,7 @@ class JankenGame(BaseGame):
                 if bet_error is not None:
                     await context.message.channel.send(bet_error)
                     return session
-                can_pay, required, points = ensure_balance(
+                can_pay, required, points = await ensure_balance(
                     context.points_repo,
                     context.guild_id,
                     context.user_id,
@@ -94,6 +95,7 @@ class JankenGame(BaseGame):
             return session
 
         if is_cancel_message(raw):
+            record_round(context, self.game_key, session.bet, 0, outcome="forfeit")
             await context.message.channel.send(
                 "じゃんけんをキャンセルしました。賭けるポイントは没収されます。"
             )
@@ -105,12 +107,14 @@ class JankenGame(BaseGame):
         return await self._resolve(context, session, choice)
 
     async def timeout(self, context: GameContext, session: GameSession) -> None:
+        if isinstance(session, JankenSession):
+            record_round(context, self.game_key, session.bet, 0, outcome="timeout")
         await context.message.channel.send("じゃんけんは時間切れで終了しました。")
 
     async def _start_session(
         self, context: GameContext, bet: int, choice: str
     ) -> GameSession | None:
-        can_pay, required, points = ensure_balance(
+        can_pay, required, points = await ensure_balance(
             context.points_repo,
             context.guild_id,
             context.user_id,
@@ -123,7 +127,9 @@ class JankenGame(BaseGame):
             )
             return None
 
-        context.points_repo.add_points(context.guild_id, context.user_id, -bet)
+        await context.points_repo.add_points(
+            context.guild_id, context.user_id, -bet, kind="game"
+        )
         session = JankenSession(
             game=self.game_key,
             bet=bet,
@@ -142,13 +148,14 @@ class JankenGame(BaseGame):
             await context.message.channel.send("あいこ！もう一回（グー/チョキ/パー）")
             return session
         multiplier = 2.0 if result == "win" else 0.0
-        payout = apply_payout(
+        payout = await apply_payout(
             context.points_repo,
             context.guild_id,
             context.user_id,
             session.bet,
             multiplier,
         )
+        record_round(context, self.game_key, session.bet, payout)
         net = payout - session.bet
         choice_label = janken_label(choice)
         opponent_label = janken_label(opponent)
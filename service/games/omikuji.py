@@ -1,7 +1,13 @@
 from __future__ import annotations
 
 from service.games.base import BaseGame, GameContext
-from service.games.support import apply_payout, ensure_balance, parse_bet, validate_bet
+from service.games.support import (
+    apply_payout,
+    ensure_balance,
+    parse_bet,
+    record_round,
+    validate_bet,
+)
 from service.sessions.game_sessions import GameInputSession, GameSession
 
 
@@ -40,7 +46,7 @@ class OmikujiGame(BaseGame):
             if bet_error is not None:
                 await context.message.channel.send(bet_error)
                 return session
-            can_pay, required, points = ensure_balance(
+            can_pay, required, points = await ensure_balance(
                 context.points_repo,
                 context.guild_id,
                 context.user_id,
@@ -63,7 +69,7 @@ class OmikujiGame(BaseGame):
         if bet_error is not None:
             await context.message.channel.send(bet_error)
             return None
-        can_pay, required, points = ensure_balance(
+        can_pay, required, points = await ensure_balance(
             context.points_repo,
             context.guild_id,
             context.user_id,
@@ -76,11 +82,14 @@ class OmikujiGame(BaseGame):
             )
             return None
 
-        context.points_repo.add_points(context.guild_id, context.user_id, -bet)
+        await context.points_repo.add_points(
+            context.guild_id, context.user_id, -bet, kind="game"
+        )
         outcome, multiplier = self._draw_omikuji(context)
-        payout = apply_payout(
+        payout = await apply_payout(
             context.points_repo, context.guild_id, context.user_id, bet, multiplier
         )
+        record_round(context, self.game_key, bet, payout)
         net = payout - bet
         await context.message.channel.send(
             f"おみくじ結果: {outcome}\n倍率: x{multiplier:.1f} / 差引: {net:+}ポイント"
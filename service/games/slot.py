@@ -4,7 +4,13 @@ import asyncio
 
 from bot.constants import SLOT_RARE_SYMBOLS, SLOT_SYMBOLS
 from service.games.base import BaseGame, GameContext
-from service.games.support import apply_payout, ensure_balance, parse_bet, validate_bet
+from service.games.support import (
+    apply_payout,
+    ensure_balance,
+    parse_bet,
+    record_round,
+    validate_bet,
+)
 from service.sessions.game_sessions import GameInputSession, GameSession
 
 SLOT_ANIMATION_STEPS = 3
@@ -46,7 +52,7 @@ class SlotGame(BaseGame):
             if bet_error is not None:
                 await context.message.channel.send(bet_error)
                 return session
-            can_pay, required, points = ensure_balance(
+            can_pay, required, points = await ensure_balance(
                 context.points_repo,
                 context.guild_id,
                 context.user_id,
@@ -69,7 +75,7 @@ class SlotGame(BaseGame):
         if bet_error is not None:
             await context.message.channel.send(bet_error)
             return None
-        can_pay, required, points = ensure_balance(
+        can_pay, required, points = await ensure_balance(
             context.points_repo,
             context.guild_id,
             context.user_id,
@@ -82,7 +88,9 @@ class SlotGame(BaseGame):
             )
             return None
 
-        context.points_repo.add_points(context.guild_id, context.user_id, -bet)
+        await context.points_repo.add_points(
+            context.guild_id, context.user_id, -bet, kind="game"
+        )
 
         slot_message = await context.message.channel.send("🎰 | ??? | ??? | ???")
         reels = ["❓", "❓", "❓"]
@@ -94,9 +102,10 @@ class SlotGame(BaseGame):
             )
 
         multiplier = self._slot_multiplier(reels)
-        payout = apply_payout(
+        payout = await apply_payout(
             context.points_repo, context.guild_id, context.user_id, bet, multiplier
         )
+        record_round(context, self.game_key, bet, payout)
         net = payout - bet
         result_line = f"結果: {reels[0]} {reels[1]} {reels[2]}"
         await context.message.channel.send(
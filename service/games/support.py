@@ -9,6 +9,9 @@ from bot.constants import (
     JANKEN_ALIASES,
     JANKEN_LABELS,
 )
+from data.async_repository import AsyncPointsRepository
+from service.games.base import GameContext
+from service.ledger.game_rounds import GameRound
 
 MIN_BET = 100
 
@@ -57,28 +60,65 @@ def validate_bet(bet: int) -> str | None:
     return None
 
 
-def ensure_balance(
-    points_repo,
+async def ensure_balance(
+    points_repo: AsyncPointsRepository,
     guild_id: int,
     user_id: int,
     bet: int,
     *,
     max_loss_multiplier: float,
 ) -> tuple[bool, int, int]:
-    points = points_repo.get_user_points(guild_id, user_id) or 0
+    points = await points_repo.get_user_points(guild_id, user_id) or 0
     required = int(math.ceil(bet * max_loss_multiplier))
     return points >= required, required, points
 
 
-def apply_payout(
-    points_repo, guild_id: int, user_id: int, bet: int, multiplier: float
+async def apply_payout(
+    points_repo: AsyncPointsRepository,
+    guild_id: int,
+    user_id: int,
+    bet: int,
+    multiplier: float,
 ) -> int:
     payout = int(round(bet * multiplier))
     if payout != 0:
-        points_repo.add_points(guild_id, user_id, payout)
+        # The bet is already debited, so the payout is never shed as busy.
+        await points_repo.add_points(
+            guild_id, user_id, payout, kind="game", shed=False
+        )
     return payout
 
 
+def record_round(
+    context: GameContext,
+    game: str,
+    bet: int,
+    payout: int,
+    *,
+    outcome: str | None = None,
+) -> None:
+    if context.ledger is None:
+        return
+    if outcome is None:
+        if payout > bet:
+            outcome = "win"
+        elif payout == bet:
+            outcome = "even"
+        else:
+            outcome = "lose"
+    context.ledger.record(
+        GameRound(
+            guild_id=context.guild_id,
+            user_id=context.user_id,
+            game=game,
+            bet=bet,
+            payout=payout,
+            outcome=outcome,
+            ts=context.now,
+        )
+    )
+
+
 def is_cancel_message(raw: str) -> bool:
     normalized = raw.strip().lower()
     return normalized in {word.lower() for word in CANCEL_WORDS}
@@ -131,6 +171,7 @@ __all__ = [
     "validate_bet",
     "ensure_balance",
     "apply_payout",
+    "record_round",
     "is_cancel_message",
     "cancel_words_label",
     "parse_janken_choice",
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, AsyncIterator, Awaitable, Callable
+import csv
+import gzip
+import json
+import os
+import tempfile
+
+from data.database import EXPORT_SOURCES
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_PAGE_SIZE = 1000
+
+# Runs a blocking repository call off the event loop; the bot passes its DB
+# executor's ``run``.
+BlockingRunner = Callable[..., Awaitable[Any]]
+
+
+@dataclass(frozen=True, slots=True)
+class ExportResult:
+    path: Path
+    filename: str
+    rows: int
+    size_bytes: int
+
+
+async def iter_export_pages(
+    points_repo,
+    guild_id: int,
+    source: str,
+    *,
+    page_size: int = EXPORT_PAGE_SIZE,
+    run: BlockingRunner = asyncio.to_thread,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    key = EXPORT_SOURCES[source].key
+    after: int | None = None
+    while True:
+        page = await run(
+            points_repo.fetch_export_page,
+            guild_id,
+            source,
+            after=after,
+            limit=page_size,
+        )
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        after = int(page[-1][key])
+
+
+class _ExportWriter:
+    def __init__(self, handle: IO[str], columns: tuple[str, ...]) -> None:
+        self._handle = handle
+        self._columns = columns
+
+    def write_header(self) -> None:
+        return None
+
+    def write_rows(self, rows: list[dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+
+class _CsvExportWriter(_ExportWriter):
+    def __init__(self, handle: IO[str], columns: tuple[str, ...]) -> None:
+        super().__init__(handle, columns)
+        self._writer = csv.writer(handle, lineterminator="\n")
+
+    def write_header(self) -> None:
+        self._writer.writerow(self._columns)
+
+    def write_rows(self, rows: list[dict[str, Any]]) -> None:
+        self._writer.writerows(
+            [row.get(column) for column in self._columns] for row in rows
+        )
+
+
+class _NdjsonExportWriter(_ExportWriter):
+    def write_rows(self, rows: list[dict[str, Any]]) -> None:
+        self._handle.writelines(
+            json.dumps(
+                {column: row.get(column) for column in self._columns},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+            + "\n"
+            for row in rows
+        )
+
+
+def _create_writer(fmt: str, handle: IO[str], columns: tuple[str, ...]) -> _ExportWriter:
+    if fmt == "csv":
+        return _CsvExportWriter(handle, columns)
+    if fmt == "ndjson":
+        return _NdjsonExportWriter(handle, columns)
+    raise ValueError(f"unknown export format: {fmt}")
+
+
+async def export_to_file(
+    points_repo,
+    guild_id: int,
+    *,
+    source: str = "points",
+    fmt: str = "csv",
+    compress: bool = False,
+    page_size: int = EXPORT_PAGE_SIZE,
+    run: BlockingRunner = asyncio.to_thread,
+) -> ExportResult:
+    """Writes one page at a time to a temp file; the caller deletes ``path``."""
+    spec = EXPORT_SOURCES.get(source)
+    if spec is None:
+        raise ValueError(f"unknown export source: {source}")
+    filename = f"{source}-{guild_id}.{fmt}" + (".gz" if compress else "")
+    fd, raw_path = tempfile.mkstemp(prefix="myami-export-", suffix=f"-{filename}")
+    os.close(fd)
+    path = Path(raw_path)
+    rows = 0
+    try:
+        if compress:
+            handle = gzip.open(path, "wt", encoding="utf-8", newline="")
+        else:
+            handle = path.open("w", encoding="utf-8", newline="")
+        with handle:
+            writer = _create_writer(fmt, handle, spec.columns)
+            writer.write_header()
+            async for page in iter_export_pages(
+                points_repo, guild_id, source, page_size=page_size, run=run
+            ):
+                writer.write_rows(page)
+                rows += len(page)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return ExportResult(
+        path=path, filename=filename, rows=rows, size_bytes=path.stat().st_size
+    )
+
+
+__all__ = [
+    "BlockingRunner",
+    "EXPORT_FORMATS",
+    "EXPORT_PAGE_SIZE",
+    "ExportResult",
+    "export_to_file",
+    "iter_export_pages",
+]
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from data.database import DatabaseError
+
+GAME_ROUND_FLUSH_SECONDS = 5.0
+GAME_ROUND_BATCH_SIZE = 200
+GAME_ROUND_MAX_BUFFER = 10_000
+
+
+@dataclass(frozen=True, slots=True)
+class GameRound:
+    guild_id: int
+    user_id: int
+    game: str
+    bet: int
+    payout: int
+    outcome: str
+    ts: float
+
+    def to_row(self) -> dict[str, Any]:
+        return {
+            "guild_id": self.guild_id,
+            "user_id": self.user_id,
+            "game": self.game,
+            "bet": self.bet,
+            "payout": self.payout,
+            "outcome": self.outcome,
+            "ts": datetime.fromtimestamp(self.ts, tz=timezone.utc).isoformat(),
+        }
+
+
+class GameRoundWriter:
+    """Buffers finished rounds in memory and bulk-inserts them off the reply path."""
+
+    def __init__(
+        self,
+        *,
+        points_repo,
+        flush_interval: float = GAME_ROUND_FLUSH_SECONDS,
+        batch_size: int = GAME_ROUND_BATCH_SIZE,
+        max_buffer: int = GAME_ROUND_MAX_BUFFER,
+    ) -> None:
+        self.points_repo = points_repo
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._buffer: deque[GameRound] = deque(maxlen=max_buffer)
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+        self._closing = False
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def pending(self) -> list[GameRound]:
+        return list(self._buffer)
+
+    def record(self, game_round: GameRound) -> None:
+        self._buffer.append(game_round)
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._closing = False
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        # Not cancel(): a cancelled flush would lose the batch it had taken.
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as exc:
+            print(f"[ledger] final game round flush failed: {exc!r}")
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            while self._buffer:
+                batch = [
+                    self._buffer.popleft()
+                    for _ in range(min(self.batch_size, len(self._buffer)))
+                ]
+                rows = [game_round.to_row() for game_round in batch]
+                written = False
+                try:
+                    await self.points_repo.record_game_rounds(rows)
+                    written = True
+                except DatabaseError as exc:
+                    print(f"[ledger] game round flush failed: {exc}")
+                    return
+                finally:
+                    if not written:
+                        self._buffer.extendleft(reversed(batch))
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._closing:
+                return
+            try:
+                await self.flush()
+            except Exception as exc:
+                # Keep the writer alive; the batch is back in the buffer.
+                print(f"[ledger] game round flush failed: {exc!r}")
+
+
+__all__ = [
+    "GAME_ROUND_BATCH_SIZE",
+    "GAME_ROUND_FLUSH_SECONDS",
+    "GAME_ROUND_MAX_BUFFER",
+    "GameRound",
+    "GameRoundWriter",
+]
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import csv
+import io
+
+POINTS_CSV_HEADER = ("user_id", "points")
+
+
+class PointsCsvError(ValueError):
+    def __init__(self, line: int, message: str) -> None:
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+def parse_points_csv(text: str) -> list[dict[str, int]]:
+    rows: list[dict[str, int]] = []
+    # import_points sums repeated users, which would break set mode.
+    seen: dict[int, int] = {}
+    reader = csv.reader(io.StringIO(text.lstrip("\ufeff")))
+    for line, record in enumerate(reader, start=1):
+        cells = [cell.strip() for cell in record]
+        if not any(cells):
+            continue
+        if line == 1 and tuple(cell.lower() for cell in cells[:2]) == POINTS_CSV_HEADER:
+            continue
+        if len(cells) < 2:
+            raise PointsCsvError(line, "expected user_id,points")
+        try:
+            user_id = int(cells[0])
+            points = int(cells[1])
+        except ValueError:
+            raise PointsCsvError(line, "user_id and points must be integers") from None
+        if user_id <= 0:
+            raise PointsCsvError(line, "user_id must be positive")
+        if user_id in seen:
+            raise PointsCsvError(
+                line, f"duplicate user_id {user_id} (first on line {seen[user_id]})"
+            )
+        seen[user_id] = line
+        rows.append({"user_id": user_id, "points": points})
+    return rows
+
+
+__all__ = ["POINTS_CSV_HEADER", "PointsCsvError", "parse_points_csv"]
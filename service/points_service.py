@@ -1,8 +1,29 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-
-from data.repository import PointsRepository
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Callable, Iterator
+import asyncio
+
+from data.database import POINT_IMPORT_MODES
+from data.repository import PointsReading, PointsRepository
+from data.tracing import traced_methods
+from service.cache.guild_settings import GuildSettingsCache
+from service.earning.rules import (
+    CHANNEL_RULE_MODES,
+    MAX_MESSAGE_POINTS,
+    MAX_MIN_MESSAGE_LENGTH,
+    MAX_ROLE_MULTIPLIER,
+    MAX_VOICE_INTERVAL_SECONDS,
+    MAX_VOICE_MIN_MEMBERS,
+    MIN_VOICE_INTERVAL_SECONDS,
+    EarningRules,
+)
+from service.ledger.export import BlockingRunner, ExportResult, export_to_file
+from service.ledger.points_csv import PointsCsvError, parse_points_csv
+
+# Users or CSV rows sent per set-based RPC call.
+BULK_CHUNK_SIZE = 1000
 
 
 class PointsServiceError(Exception):
@@ -41,10 +62,65 @@ class PermissionNotGrantedError(PointsServiceError):
     pass
 
 
+class InvalidImportError(PointsServiceError):
+    pass
+
+
+class InvalidEarningRuleError(PointsServiceError):
+    pass
+
+
 @dataclass(frozen=True, slots=True)
 class RolePurchase:
     role_id: int
     price: int
+    purchase_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class RankEntry:
+    rank: int
+    user_id: int
+    points: int
+
+    @property
+    def cursor(self) -> tuple[int, int]:
+        return (self.points, self.user_id)
+
+
+@dataclass(frozen=True, slots=True)
+class RankPage:
+    entries: list[RankEntry]
+    has_next: bool
+    stale: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class PointsGain:
+    user_id: int
+    gained: int
+
+
+@dataclass(frozen=True, slots=True)
+class RankClimb:
+    user_id: int
+    rank_before: int
+    rank_now: int
+
+    @property
+    def climbed(self) -> int:
+        return self.rank_before - self.rank_now
+
+
+@dataclass(frozen=True, slots=True)
+class PointsImportResult:
+    rows: int
+    applied: int
+
+
+def _chunks(items: list, size: int = BULK_CHUNK_SIZE) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
 
 
 def _require_positive_points(points: int) -> None:
@@ -52,16 +128,83 @@ def _require_positive_points(points: int) -> None:
         raise InvalidPointsError("points must be positive")
 
 
+@traced_methods("PointsService")
 class PointsService:
-    def __init__(self, repo: PointsRepository) -> None:
+    def __init__(
+        self,
+        repo: PointsRepository,
+        *,
+        settings_cache: GuildSettingsCache | None = None,
+    ) -> None:
         self._repo = repo
+        self._settings = settings_cache or GuildSettingsCache(repo)
 
     def get_user_points(self, guild_id: int, user_id: int) -> int | None:
         return self._repo.get_user_points(guild_id, user_id)
 
+    def get_user_points_many(
+        self, guild_id: int, user_ids: list[int]
+    ) -> dict[int, int | None]:
+        return self._repo.get_points_many(guild_id, user_ids)
+
+    def read_user_points(self, guild_id: int, user_id: int) -> PointsReading:
+        return self._repo.read_points(guild_id, user_id)
+
     def get_top_rank(self, guild_id: int, limit: int = 10) -> list[dict]:
         return self._repo.get_top_rank(guild_id, limit)
 
+    def get_rank_page(
+        self,
+        guild_id: int,
+        *,
+        after: tuple[int, int] | None = None,
+        inclusive: bool = False,
+        start_rank: int = 1,
+        page_size: int = 10,
+    ) -> RankPage:
+        reading = self._repo.read_rank_page(
+            guild_id, after=after, inclusive=inclusive, limit=page_size + 1
+        )
+        rows = reading.rows
+        entries = [
+            RankEntry(
+                rank=start_rank + index,
+                user_id=int(row["user_id"]),
+                points=int(row["points"]),
+            )
+            for index, row in enumerate(rows[:page_size])
+        ]
+        if reading.stale:
+            # Later pages have no fallback, so don't offer them.
+            return RankPage(entries=entries, has_next=False, stale=True)
+        return RankPage(entries=entries, has_next=len(rows) > page_size)
+
+    def get_user_rank(self, guild_id: int, user_id: int) -> RankEntry | None:
+        result = self._repo.user_rank(guild_id, user_id)
+        if result is None:
+            return None
+        return RankEntry(rank=result["rank"], user_id=user_id, points=result["points"])
+
+    def get_points_gained(
+        self, guild_id: int, since: datetime, limit: int = 10
+    ) -> list[PointsGain]:
+        return [
+            PointsGain(user_id=int(row["user_id"]), gained=int(row["gained"]))
+            for row in self._repo.leaderboard_gains(guild_id, since, limit)
+        ]
+
+    def get_biggest_climbers(
+        self, guild_id: int, since: datetime, limit: int = 10
+    ) -> list[RankClimb]:
+        return [
+            RankClimb(
+                user_id=int(row["user_id"]),
+                rank_before=int(row["rank_before"]),
+                rank_now=int(row["rank_now"]),
+            )
+            for row in self._repo.leaderboard_climbers(guild_id, since, limit)
+        ]
+
     def send_points(
         self,
         guild_id: int,
@@ -84,7 +227,7 @@ class PointsService:
         is_admin: bool,
     ) -> None:
         _require_positive_points(points)
-        if not is_admin and not self._repo.has_remove_permission(guild_id, admin_id):
+        if not is_admin and not self.has_remove_permission(guild_id, admin_id):
             raise PermissionDeniedError("remove permission is required")
         target_points = self._repo.get_user_points(guild_id, target_id)
         if target_points is None:
@@ -95,57 +238,238 @@ class PointsService:
         if not success:
             raise OperationFailedError("remove points failed")
 
+    def grant_points_bulk(
+        self, guild_id: int, user_ids: list[int], points: int
+    ) -> int:
+        _require_positive_points(points)
+        return self._bulk_add(guild_id, user_ids, points)
+
+    def revoke_points_bulk(
+        self, guild_id: int, user_ids: list[int], points: int
+    ) -> int:
+        _require_positive_points(points)
+        return self._bulk_add(guild_id, user_ids, -points)
+
+    def import_points_csv(
+        self, guild_id: int, text: str, *, mode: str = "set"
+    ) -> PointsImportResult:
+        if mode not in POINT_IMPORT_MODES:
+            raise InvalidImportError(f"unknown import mode: {mode}")
+        try:
+            rows = parse_points_csv(text)
+        except PointsCsvError as exc:
+            raise InvalidImportError(str(exc)) from exc
+        if mode == "set" and any(row["points"] < 0 for row in rows):
+            raise InvalidImportError("points must not be negative in set mode")
+        applied = 0
+        for chunk in _chunks(rows):
+            applied += self._repo.import_points(guild_id, chunk, mode=mode)
+        return PointsImportResult(rows=len(rows), applied=applied)
+
+    async def export_to_file(
+        self,
+        guild_id: int,
+        *,
+        source: str = "points",
+        fmt: str = "csv",
+        compress: bool = False,
+        run: BlockingRunner | None = None,
+    ) -> ExportResult:
+        return await export_to_file(
+            self._repo,
+            guild_id,
+            source=source,
+            fmt=fmt,
+            compress=compress,
+            run=run or asyncio.to_thread,
+        )
+
+    def _bulk_add(self, guild_id: int, user_ids: list[int], delta: int) -> int:
+        unique_ids = list(dict.fromkeys(user_ids))
+        affected = 0
+        for chunk in _chunks(unique_ids):
+            affected += self._repo.bulk_add_points(
+                guild_id, chunk, delta, kind="adjust"
+            )
+        return affected
+
+    def has_remove_permission(self, guild_id: int, user_id: int) -> bool:
+        settings = self._settings.get(guild_id)
+        return user_id in settings.remove_permitted_user_ids
+
     def grant_remove_permission(self, guild_id: int, user_id: int) -> None:
-        self._repo.grant_remove_permission(guild_id, user_id)
+        try:
+            self._repo.grant_remove_permission(guild_id, user_id)
+        finally:
+            self._settings.invalidate(guild_id)
 
     def revoke_remove_permission(self, guild_id: int, user_id: int) -> None:
-        removed = self._repo.revoke_remove_permission(guild_id, user_id)
+        try:
+            removed = self._repo.revoke_remove_permission(guild_id, user_id)
+        finally:
+            self._settings.invalidate(guild_id)
         if not removed:
             raise PermissionNotGrantedError("permission not granted")
 
     def get_clan_register_channel(self, guild_id: int) -> int:
-        channel_id = self._repo.get_clan_register_channel(guild_id)
+        channel_id = self._settings.get(guild_id).clan_register_channel_id
         if channel_id is None:
             raise MissingClanRegisterChannelError("clan register channel missing")
         return channel_id
 
     def set_clan_register_channel(self, guild_id: int, channel_id: int) -> None:
-        self._repo.set_clan_register_channel(guild_id, channel_id)
+        try:
+            self._repo.set_clan_register_channel(guild_id, channel_id)
+        finally:
+            self._settings.invalidate(guild_id)
 
     def set_role_buy_price(self, guild_id: int, role_id: int, price: int) -> None:
         _require_positive_points(price)
-        self._repo.set_role_buy_price(guild_id, role_id, price)
+        try:
+            self._repo.set_role_buy_price(guild_id, role_id, price)
+        finally:
+            self._settings.invalidate(guild_id)
 
     def get_role_buy_price(self, guild_id: int, role_id: int) -> int | None:
-        return self._repo.get_role_buy_price(guild_id, role_id)
+        return self._settings.get(guild_id).role_prices.get(role_id)
+
+    def get_earning_rules(self, guild_id: int) -> EarningRules:
+        return self._settings.get(guild_id).earning_policy.rules
 
-    def validate_role_purchase(
-        self, guild_id: int, role_id: int, user_id: int
-    ) -> RolePurchase:
-        price = self._repo.get_role_buy_price(guild_id, role_id)
-        if price is None:
+    def update_earning_rules(
+        self,
+        guild_id: int,
+        *,
+        message_points: int | None = None,
+        min_message_length: int | None = None,
+        voice_interval_seconds: int | None = None,
+        voice_min_members: int | None = None,
+        voice_allow_muted: bool | None = None,
+    ) -> EarningRules:
+        if message_points is not None and not 0 <= message_points <= MAX_MESSAGE_POINTS:
+            raise InvalidEarningRuleError(
+                f"message_points must be between 0 and {MAX_MESSAGE_POINTS}"
+            )
+        if min_message_length is not None and not (
+            0 <= min_message_length <= MAX_MIN_MESSAGE_LENGTH
+        ):
+            raise InvalidEarningRuleError(
+                f"min_message_length must be between 0 and {MAX_MIN_MESSAGE_LENGTH}"
+            )
+        if voice_interval_seconds is not None and not (
+            MIN_VOICE_INTERVAL_SECONDS
+            <= voice_interval_seconds
+            <= MAX_VOICE_INTERVAL_SECONDS
+        ):
+            raise InvalidEarningRuleError(
+                "voice_interval_seconds must be between "
+                f"{MIN_VOICE_INTERVAL_SECONDS} and {MAX_VOICE_INTERVAL_SECONDS}"
+            )
+        if voice_min_members is not None and not (
+            1 <= voice_min_members <= MAX_VOICE_MIN_MEMBERS
+        ):
+            raise InvalidEarningRuleError(
+                f"voice_min_members must be between 1 and {MAX_VOICE_MIN_MEMBERS}"
+            )
+        changes = {
+            name: value
+            for name, value in (
+                ("message_points", message_points),
+                ("min_message_length", min_message_length),
+                ("voice_interval_seconds", voice_interval_seconds),
+                ("voice_min_members", voice_min_members),
+                ("voice_allow_muted", voice_allow_muted),
+            )
+            if value is not None
+        }
+        if not changes:
+            return self.get_earning_rules(guild_id)
+        return self._write_earning_rules(guild_id, lambda rules: replace(rules, **changes))
+
+    def set_earning_channel(self, guild_id: int, channel_id: int, mode: str) -> EarningRules:
+        if mode not in CHANNEL_RULE_MODES:
+            raise InvalidEarningRuleError(f"unknown channel rule mode: {mode}")
+
+        def change(rules: EarningRules) -> EarningRules:
+            allowed = rules.allowed_channel_ids - {channel_id}
+            denied = rules.denied_channel_ids - {channel_id}
+            if mode == "allow":
+                allowed |= {channel_id}
+            elif mode == "deny":
+                denied |= {channel_id}
+            return replace(rules, allowed_channel_ids=allowed, denied_channel_ids=denied)
+
+        return self._write_earning_rules(guild_id, change)
+
+    def set_role_multiplier(
+        self, guild_id: int, role_id: int, multiplier: float
+    ) -> EarningRules:
+        if not 0.0 <= multiplier <= MAX_ROLE_MULTIPLIER:
+            raise InvalidEarningRuleError(
+                f"multiplier must be between 0 and {MAX_ROLE_MULTIPLIER}"
+            )
+
+        def change(rules: EarningRules) -> EarningRules:
+            multipliers = dict(rules.role_multipliers)
+            if multiplier == 1.0:
+                multipliers.pop(role_id, None)
+            else:
+                multipliers[role_id] = multiplier
+            return replace(rules, role_multipliers=multipliers)
+
+        return self._write_earning_rules(guild_id, change)
+
+    def _write_earning_rules(
+        self, guild_id: int, change: Callable[[EarningRules], EarningRules]
+    ) -> EarningRules:
+        # Read-modify-write against the table, not the cache, so a stale cache
+        # entry never overwrites a newer admin change.
+        current = EarningRules.from_row(self._repo.get_earning_rules(guild_id))
+        updated = change(current)
+        try:
+            self._repo.set_earning_rules(guild_id, updated.to_row())
+        finally:
+            self._settings.invalidate(guild_id)
+        return updated
+
+    def purchase_role(self, guild_id: int, role_id: int, user_id: int) -> RolePurchase:
+        result = self._repo.purchase_role(guild_id, user_id, role_id)
+        status = result.get("status")
+        if status == "not_for_sale":
             raise RoleNotForSaleError("role is not for sale")
-        points = self._repo.get_user_points(guild_id, user_id)
-        if points is None or points < price:
+        if status == "insufficient":
             raise InsufficientPointsError("insufficient points")
-        return RolePurchase(role_id=role_id, price=price)
-
-    def charge_role_purchase(self, guild_id: int, user_id: int, price: int) -> None:
-        self._repo.add_points(guild_id, user_id, -price)
-
-    def refund_role_purchase(self, guild_id: int, user_id: int, price: int) -> None:
-        self._repo.add_points(guild_id, user_id, price)
+        if status != "ok":
+            raise OperationFailedError("role purchase failed")
+        return RolePurchase(
+            role_id=role_id,
+            price=int(result["price"]),
+            purchase_id=int(result["purchase_id"]),
+        )
+
+    def release_role_purchase(
+        self, guild_id: int, user_id: int, purchase: RolePurchase
+    ) -> None:
+        self._repo.release_purchase(guild_id, user_id, purchase.purchase_id)
 
 
 __all__ = [
+    "BULK_CHUNK_SIZE",
     "InsufficientPointsError",
+    "InvalidEarningRuleError",
+    "InvalidImportError",
     "InvalidPointsError",
     "MissingClanRegisterChannelError",
     "OperationFailedError",
     "PermissionDeniedError",
     "PermissionNotGrantedError",
+    "PointsGain",
+    "PointsImportResult",
     "PointsService",
     "PointsServiceError",
+    "RankClimb",
+    "RankEntry",
+    "RankPage",
     "RoleNotForSaleError",
     "RolePurchase",
     "TargetHasNoPointsError",
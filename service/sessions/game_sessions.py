@@ -45,6 +45,12 @@ class GameSessionStore:
     def has(self, user_id: int) -> bool:
         return user_id in self._sessions
 
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def items(self) -> list[tuple[int, GameSession]]:
+        return list(self._sessions.items())
+
 
 __all__ = [
     "GameSession",
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+import hashlib
+
+MESSAGE_AWARD_BURST = 5
+MESSAGE_AWARD_REFILL_SECONDS = 10.0
+MESSAGE_DUPLICATE_WINDOW_SECONDS = 60.0
+MESSAGE_DUPLICATE_HISTORY = 5
+MESSAGE_LIMITER_MAX_TRACKED = 50_000
+
+ALLOWED = "allowed"
+RATE_LIMITED = "rate_limited"
+DUPLICATE = "duplicate"
+
+
+def content_fingerprint(content: str) -> int | None:
+    normalized = " ".join(content.casefold().split())
+    if normalized == "":
+        return None
+    digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+@dataclass(slots=True)
+class _AwardState:
+    tokens: float
+    updated_at: float
+    recent: deque[tuple[int, float]] = field(default_factory=deque)
+
+
+class MessageAwardLimiter:
+    """Decides in memory whether a message earns points.
+
+    Each (guild, user) has a token bucket of ``burst`` awards refilled one per
+    ``refill_seconds``; a message whose normalized text matches one of the
+    user's last ``duplicate_history`` messages within the window earns nothing.
+    """
+
+    def __init__(
+        self,
+        *,
+        burst: int = MESSAGE_AWARD_BURST,
+        refill_seconds: float = MESSAGE_AWARD_REFILL_SECONDS,
+        duplicate_window_seconds: float = MESSAGE_DUPLICATE_WINDOW_SECONDS,
+        duplicate_history: int = MESSAGE_DUPLICATE_HISTORY,
+        max_tracked: int = MESSAGE_LIMITER_MAX_TRACKED,
+    ) -> None:
+        self.burst = burst
+        self.refill_seconds = refill_seconds
+        self.duplicate_window_seconds = duplicate_window_seconds
+        self.duplicate_history = duplicate_history
+        self.max_tracked = max_tracked
+        self._states: OrderedDict[tuple[int, int], _AwardState] = OrderedDict()
+        self.stats: dict[str, int] = {ALLOWED: 0, RATE_LIMITED: 0, DUPLICATE: 0}
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def items(self) -> list[tuple[tuple[int, int], _AwardState]]:
+        return list(self._states.items())
+
+    def check(self, guild_id: int, user_id: int, content: str, *, now: float) -> str:
+        state = self._state(guild_id, user_id, now=now)
+        fingerprint = (
+            content_fingerprint(content) if self.duplicate_history > 0 else None
+        )
+        if fingerprint is not None:
+            recent = state.recent
+            while recent and now - recent[0][1] > self.duplicate_window_seconds:
+                recent.popleft()
+            duplicate = any(seen == fingerprint for seen, _ in recent)
+            recent.append((fingerprint, now))
+            if len(recent) > self.duplicate_history:
+                recent.popleft()
+            if duplicate:
+                return self._record(DUPLICATE)
+        elapsed = max(0.0, now - state.updated_at)
+        state.tokens = min(float(self.burst), state.tokens + elapsed / self.refill_seconds)
+        state.updated_at = now
+        if state.tokens < 1.0:
+            return self._record(RATE_LIMITED)
+        state.tokens -= 1.0
+        return self._record(ALLOWED)
+
+    def _state(self, guild_id: int, user_id: int, *, now: float) -> _AwardState:
+        key = (guild_id, user_id)
+        state = self._states.get(key)
+        if state is None:
+            state = _AwardState(tokens=float(self.burst), updated_at=now)
+            self._states[key] = state
+            if len(self._states) > self.max_tracked:
+                self._states.popitem(last=False)
+        else:
+            self._states.move_to_end(key)
+        return state
+
+    def _record(self, decision: str) -> str:
+        self.stats[decision] += 1
+        return decision
+
+
+__all__ = [
+    "ALLOWED",
+    "DUPLICATE",
+    "MessageAwardLimiter",
+    "RATE_LIMITED",
+    "content_fingerprint",
+]
@@ -10,6 +10,8 @@ class VoiceSession:
     last_ts: float
     carry_seconds: float
     accruing: bool
+    # Role multiplier from the guild's earning rules; scales accrued seconds.
+    rate: float = 1.0
 
 
 class VoiceSessionStore:
@@ -25,6 +27,9 @@ class VoiceSessionStore:
     def pop(self, user_id: int) -> VoiceSession | None:
         return self._sessions.pop(user_id, None)
 
+    def __len__(self) -> int:
+        return len(self._sessions)
+
     def items(self) -> list[tuple[int, VoiceSession]]:
         return list(self._sessions.items())
 
@@ -0,0 +1,25 @@
+#!/bin/sh
+# Applies pending supabase/migrations/*.sql files in order, each in one
+# transaction together with its schema_version row.
+# Usage: SUPABASE_DB_URL=postgresql://... supabase/apply_migrations.sh
+set -eu
+
+: "${SUPABASE_DB_URL:?set SUPABASE_DB_URL to the Postgres connection string}"
+
+dir=$(dirname "$0")/migrations
+current=$(psql "$SUPABASE_DB_URL" -v ON_ERROR_STOP=1 -tA \
+  -c "select coalesce(max(version), 0) from public.schema_version")
+
+for file in "$dir"/[0-9]*_*.sql; do
+  base=$(basename "$file" .sql)
+  version=$(expr "${base%%_*}" + 0)
+  name=${base#*_}
+  if [ "$version" -le "$current" ]; then
+    continue
+  fi
+  echo "applying $base"
+  psql "$SUPABASE_DB_URL" -v ON_ERROR_STOP=1 --single-transaction \
+    -f "$file" \
+    -c "insert into public.schema_version (version, name) values ($version, '$name')" \
+    -c "notify pgrst, 'reload schema'"
+done
@@ -0,0 +1,130 @@
+create table if not exists public.points (
+  guild_id bigint not null,
+  user_id bigint not null,
+  points integer not null default 0,
+  primary key (guild_id, user_id)
+);
+
+create table if not exists public.point_remove_permissions (
+  guild_id bigint not null,
+  user_id bigint not null,
+  primary key (guild_id, user_id)
+);
+
+create table if not exists public.clan_register_settings (
+  guild_id bigint primary key,
+  channel_id bigint not null
+);
+
+create table if not exists public.role_buy_settings (
+  guild_id bigint not null,
+  role_id bigint not null,
+  price integer not null,
+  primary key (guild_id, role_id)
+);
+
+create or replace function public.ensure_points_schema()
+returns void
+language plpgsql
+as $$
+begin
+  create table if not exists public.points (
+    guild_id bigint not null,
+    user_id bigint not null,
+    points integer not null default 0,
+    primary key (guild_id, user_id)
+  );
+  create table if not exists public.point_remove_permissions (
+    guild_id bigint not null,
+    user_id bigint not null,
+    primary key (guild_id, user_id)
+  );
+  create table if not exists public.clan_register_settings (
+    guild_id bigint primary key,
+    channel_id bigint not null
+  );
+  create table if not exists public.role_buy_settings (
+    guild_id bigint not null,
+    role_id bigint not null,
+    price integer not null,
+    primary key (guild_id, role_id)
+  );
+  create table if not exists public.game_rounds (
+    id bigserial primary key,
+    guild_id bigint not null,
+    user_id bigint not null,
+    game text not null,
+    bet integer not null,
+    payout integer not null,
+    outcome text not null,
+    ts timestamptz not null default now()
+  );
+  create index if not exists game_rounds_guild_user_ts_idx
+    on public.game_rounds (guild_id, user_id, ts);
+end;
+$$;
+
+create or replace function public.add_points(
+  p_guild_id bigint,
+  p_user_id bigint,
+  p_delta integer
+)
+returns integer
+language plpgsql
+as $$
+declare
+  new_points integer;
+begin
+  insert into public.points (guild_id, user_id, points)
+  values (p_guild_id, p_user_id, 0)
+  on conflict (guild_id, user_id) do nothing;
+
+  update public.points
+  set points = points + p_delta
+  where guild_id = p_guild_id and user_id = p_user_id
+  returning points into new_points;
+
+  return new_points;
+end;
+$$;
+
+create or replace function public.transfer_points(
+  p_guild_id bigint,
+  p_sender_id bigint,
+  p_recipient_id bigint,
+  p_points integer
+)
+returns boolean
+language plpgsql
+as $$
+declare
+  sender_points integer;
+begin
+  if p_points <= 0 then
+    return false;
+  end if;
+
+  insert into public.points (guild_id, user_id, points)
+  values (p_guild_id, p_sender_id, 0), (p_guild_id, p_recipient_id, 0)
+  on conflict (guild_id, user_id) do nothing;
+
+  select points into sender_points
+  from public.points
+  where guild_id = p_guild_id and user_id = p_sender_id
+  for update;
+
+  if sender_points < p_points then
+    return false;
+  end if;
+
+  update public.points
+  set points = points - p_points
+  where guild_id = p_guild_id and user_id = p_sender_id;
+
+  update public.points
+  set points = points + p_points
+  where guild_id = p_guild_id and user_id = p_recipient_id;
+
+  return true;
+end;
+$$;
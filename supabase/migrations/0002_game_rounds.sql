@@ -0,0 +1,13 @@
+create table if not exists public.game_rounds (
+  id bigserial primary key,
+  guild_id bigint not null,
+  user_id bigint not null,
+  game text not null,
+  bet integer not null,
+  payout integer not null,
+  outcome text not null,
+  ts timestamptz not null default now()
+);
+
+create index if not exists game_rounds_guild_user_ts_idx
+  on public.game_rounds (guild_id, user_id, ts);
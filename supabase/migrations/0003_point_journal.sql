@@ -0,0 +1,177 @@
+-- Journal strategy (POINTS_STRATEGY=journal)
+-- Point changes are appended to point_events and periodically folded into
+-- point_snapshots by compact_point_events. A balance is the snapshot plus the
+-- events after its last_event_id, so reads only scan a bounded tail.
+create table if not exists public.point_events (
+  id bigserial primary key,
+  guild_id bigint not null,
+  user_id bigint not null,
+  kind text not null check (
+    kind in ('message', 'voice', 'game', 'transfer', 'remove', 'role_purchase', 'adjust')
+  ),
+  delta integer not null,
+  created_at timestamptz not null default now()
+);
+
+create index if not exists point_events_guild_user_id_idx
+  on public.point_events (guild_id, user_id, id);
+
+create index if not exists point_events_created_at_idx
+  on public.point_events (created_at);
+
+create table if not exists public.point_snapshots (
+  guild_id bigint not null,
+  user_id bigint not null,
+  points integer not null default 0,
+  last_event_id bigint not null default 0,
+  updated_at timestamptz not null default now(),
+  primary key (guild_id, user_id)
+);
+
+create or replace view public.point_journal_balances as
+with tail as (
+  select e.guild_id, e.user_id, sum(e.delta)::bigint as delta
+  from public.point_events e
+  left join public.point_snapshots s
+    on s.guild_id = e.guild_id and s.user_id = e.user_id
+  where e.id > coalesce(s.last_event_id, 0)
+  group by e.guild_id, e.user_id
+)
+select
+  coalesce(s.guild_id, t.guild_id) as guild_id,
+  coalesce(s.user_id, t.user_id) as user_id,
+  (coalesce(s.points, 0) + coalesce(t.delta, 0))::integer as points
+from public.point_snapshots s
+full join tail t on t.guild_id = s.guild_id and t.user_id = s.user_id;
+
+create or replace function public.journal_get_points(
+  p_guild_id bigint,
+  p_user_id bigint
+)
+returns integer
+language plpgsql
+stable
+as $$
+declare
+  snapshot_points integer;
+  snapshot_event_id bigint;
+  tail_delta bigint;
+  tail_count integer;
+begin
+  select points, last_event_id into snapshot_points, snapshot_event_id
+  from public.point_snapshots
+  where guild_id = p_guild_id and user_id = p_user_id;
+
+  select coalesce(sum(delta), 0), count(*) into tail_delta, tail_count
+  from public.point_events
+  where guild_id = p_guild_id
+    and user_id = p_user_id
+    and id > coalesce(snapshot_event_id, 0);
+
+  if snapshot_points is null and tail_count = 0 then
+    return null;
+  end if;
+  return (coalesce(snapshot_points, 0) + tail_delta)::integer;
+end;
+$$;
+
+create or replace function public.journal_add_points(
+  p_guild_id bigint,
+  p_user_id bigint,
+  p_delta integer,
+  p_kind text default 'adjust'
+)
+returns integer
+language plpgsql
+as $$
+begin
+  insert into public.point_events (guild_id, user_id, kind, delta)
+  values (p_guild_id, p_user_id, p_kind, p_delta);
+
+  return public.journal_get_points(p_guild_id, p_user_id);
+end;
+$$;
+
+create or replace function public.journal_transfer_points(
+  p_guild_id bigint,
+  p_sender_id bigint,
+  p_recipient_id bigint,
+  p_points integer,
+  p_kind text default 'transfer'
+)
+returns boolean
+language plpgsql
+as $$
+declare
+  sender_points integer;
+begin
+  if p_points <= 0 then
+    return false;
+  end if;
+
+  perform pg_advisory_xact_lock(
+    hashtextextended(format('points:%s:%s', p_guild_id, p_sender_id), 0)
+  );
+
+  sender_points := coalesce(public.journal_get_points(p_guild_id, p_sender_id), 0);
+  if sender_points < p_points then
+    return false;
+  end if;
+
+  insert into public.point_events (guild_id, user_id, kind, delta)
+  values
+    (p_guild_id, p_sender_id, p_kind, -p_points),
+    (p_guild_id, p_recipient_id, p_kind, p_points);
+
+  return true;
+end;
+$$;
+
+-- Events younger than p_min_age_seconds are left in the tail so that a
+-- transaction still holding a lower, uncommitted id is never skipped.
+create or replace function public.compact_point_events(
+  p_min_age_seconds integer default 300
+)
+returns integer
+language plpgsql
+as $$
+declare
+  cutoff_id bigint;
+  folded integer;
+begin
+  if not pg_try_advisory_xact_lock(hashtextextended('compact_point_events', 0)) then
+    return 0;
+  end if;
+
+  select coalesce(max(id), 0) into cutoff_id
+  from public.point_events
+  where created_at < now() - make_interval(secs => p_min_age_seconds);
+
+  with pending as (
+    select
+      e.guild_id,
+      e.user_id,
+      sum(e.delta)::integer as delta,
+      max(e.id) as last_id,
+      count(*)::integer as event_count
+    from public.point_events e
+    left join public.point_snapshots s
+      on s.guild_id = e.guild_id and s.user_id = e.user_id
+    where e.id <= cutoff_id and e.id > coalesce(s.last_event_id, 0)
+    group by e.guild_id, e.user_id
+  ),
+  folded_rows as (
+    insert into public.point_snapshots (guild_id, user_id, points, last_event_id, updated_at)
+    select guild_id, user_id, delta, last_id, now()
+    from pending
+    on conflict (guild_id, user_id) do update
+    set points = public.point_snapshots.points + excluded.points,
+        last_event_id = excluded.last_event_id,
+        updated_at = now()
+    returning 1
+  )
+  select coalesce(sum(event_count), 0) into folded from pending;
+
+  return folded;
+end;
+$$;
@@ -0,0 +1,173 @@
+-- Sharded strategy (POINTS_STRATEGY=sharded)
+-- Positive deltas land on one of p_shard_count sub-rows per user so that
+-- heavy chatters do not serialize on a single points row. Balances are the
+-- points row plus its shards; merge_point_shards folds shards back.
+create table if not exists public.point_shards (
+  guild_id bigint not null,
+  user_id bigint not null,
+  shard smallint not null,
+  points integer not null default 0,
+  primary key (guild_id, user_id, shard)
+);
+
+create or replace view public.point_sharded_balances as
+select
+  p.guild_id,
+  p.user_id,
+  (p.points + coalesce(s.points, 0))::integer as points
+from public.points p
+left join (
+  select guild_id, user_id, sum(points)::bigint as points
+  from public.point_shards
+  group by guild_id, user_id
+) s on s.guild_id = p.guild_id and s.user_id = p.user_id;
+
+create or replace function public.sharded_get_points(
+  p_guild_id bigint,
+  p_user_id bigint
+)
+returns integer
+language sql
+stable
+as $$
+  select (p.points + coalesce((
+    select sum(s.points)
+    from public.point_shards s
+    where s.guild_id = p.guild_id and s.user_id = p.user_id
+  ), 0))::integer
+  from public.points p
+  where p.guild_id = p_guild_id and p.user_id = p_user_id;
+$$;
+
+create or replace function public.fold_point_shards(
+  p_guild_id bigint,
+  p_user_id bigint
+)
+returns integer
+language plpgsql
+as $$
+declare
+  folded bigint;
+  new_points integer;
+begin
+  with moved as (
+    delete from public.point_shards
+    where guild_id = p_guild_id and user_id = p_user_id
+    returning points
+  )
+  select coalesce(sum(points), 0) into folded from moved;
+
+  update public.points
+  set points = points + folded
+  where guild_id = p_guild_id and user_id = p_user_id
+  returning points into new_points;
+
+  return new_points;
+end;
+$$;
+
+create or replace function public.sharded_add_points(
+  p_guild_id bigint,
+  p_user_id bigint,
+  p_delta integer,
+  p_shard_count integer default 8
+)
+returns integer
+language plpgsql
+as $$
+declare
+  target_shard smallint;
+begin
+  insert into public.points (guild_id, user_id, points)
+  values (p_guild_id, p_user_id, 0)
+  on conflict (guild_id, user_id) do nothing;
+
+  if p_delta < 0 then
+    update public.points
+    set points = points + p_delta
+    where guild_id = p_guild_id and user_id = p_user_id;
+  elsif p_delta > 0 then
+    target_shard := mod(
+      abs(hashtextextended(pg_backend_pid()::text || clock_timestamp()::text, 0)),
+      greatest(p_shard_count, 1)
+    );
+    insert into public.point_shards (guild_id, user_id, shard, points)
+    values (p_guild_id, p_user_id, target_shard, p_delta)
+    on conflict (guild_id, user_id, shard) do update
+    set points = public.point_shards.points + excluded.points;
+  end if;
+
+  return public.sharded_get_points(p_guild_id, p_user_id);
+end;
+$$;
+
+create or replace function public.sharded_transfer_points(
+  p_guild_id bigint,
+  p_sender_id bigint,
+  p_recipient_id bigint,
+  p_points integer
+)
+returns boolean
+language plpgsql
+as $$
+declare
+  sender_points integer;
+begin
+  if p_points <= 0 then
+    return false;
+  end if;
+
+  insert into public.points (guild_id, user_id, points)
+  values (p_guild_id, p_sender_id, 0), (p_guild_id, p_recipient_id, 0)
+  on conflict (guild_id, user_id) do nothing;
+
+  perform 1
+  from public.points
+  where guild_id = p_guild_id and user_id = p_sender_id
+  for update;
+
+  sender_points := public.fold_point_shards(p_guild_id, p_sender_id);
+  if sender_points < p_points then
+    return false;
+  end if;
+
+  update public.points
+  set points = points - p_points
+  where guild_id = p_guild_id and user_id = p_sender_id;
+
+  update public.points
+  set points = points + p_points
+  where guild_id = p_guild_id and user_id = p_recipient_id;
+
+  return true;
+end;
+$$;
+
+create or replace function public.merge_point_shards()
+returns integer
+language plpgsql
+as $$
+declare
+  merged integer;
+begin
+  with moved as (
+    delete from public.point_shards
+    returning guild_id, user_id, points
+  ),
+  totals as (
+    select guild_id, user_id, sum(points)::integer as points
+    from moved
+    group by guild_id, user_id
+  ),
+  applied as (
+    update public.points p
+    set points = p.points + t.points
+    from totals t
+    where p.guild_id = t.guild_id and p.user_id = t.user_id
+    returning 1
+  )
+  select count(*) into merged from applied;
+
+  return merged;
+end;
+$$;
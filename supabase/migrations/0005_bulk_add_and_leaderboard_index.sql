@@ -0,0 +1,39 @@
+create index if not exists points_guild_points_idx
+  on public.points (guild_id, points desc, user_id);
+
+-- Applies the same delta to many users in one statement. The journal strategy
+-- appends one event per user; the other strategies upsert the points rows
+-- directly since bulk grants are rare and do not contend.
+create or replace function public.bulk_add_points(
+  p_guild_id bigint,
+  p_user_ids bigint[],
+  p_delta integer,
+  p_kind text default 'adjust',
+  p_strategy text default 'direct'
+)
+returns integer
+language plpgsql
+as $$
+declare
+  affected integer;
+begin
+  if p_delta = 0 or coalesce(array_length(p_user_ids, 1), 0) = 0 then
+    return 0;
+  end if;
+
+  if p_strategy = 'journal' then
+    insert into public.point_events (guild_id, user_id, kind, delta)
+    select p_guild_id, user_id, p_kind, p_delta
+    from (select distinct unnest(p_user_ids) as user_id) ids;
+  else
+    insert into public.points (guild_id, user_id, points)
+    select p_guild_id, user_id, p_delta
+    from (select distinct unnest(p_user_ids) as user_id) ids
+    on conflict (guild_id, user_id) do update
+    set points = public.points.points + excluded.points;
+  end if;
+
+  get diagnostics affected = row_count;
+  return affected;
+end;
+$$;
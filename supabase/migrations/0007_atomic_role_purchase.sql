@@ -0,0 +1,150 @@
+create table if not exists public.role_purchases (
+  id bigserial primary key,
+  guild_id bigint not null,
+  user_id bigint not null,
+  role_id bigint not null,
+  price integer not null,
+  status text not null default 'charged' check (status in ('charged', 'released')),
+  created_at timestamptz not null default now(),
+  released_at timestamptz
+);
+
+create index if not exists role_purchases_guild_user_idx
+  on public.role_purchases (guild_id, user_id, created_at);
+
+-- Serializes spenders of a single balance and returns it. The journal strategy
+-- shares its advisory lock with journal_transfer_points; the others lock the
+-- points row (folding pending shards first for the sharded strategy).
+create or replace function public.lock_point_balance(
+  p_guild_id bigint,
+  p_user_id bigint,
+  p_strategy text default 'direct'
+)
+returns integer
+language plpgsql
+as $$
+declare
+  balance integer;
+begin
+  if p_strategy = 'journal' then
+    perform pg_advisory_xact_lock(
+      hashtextextended(format('points:%s:%s', p_guild_id, p_user_id), 0)
+    );
+    return coalesce(public.journal_get_points(p_guild_id, p_user_id), 0);
+  end if;
+
+  insert into public.points (guild_id, user_id, points)
+  values (p_guild_id, p_user_id, 0)
+  on conflict (guild_id, user_id) do nothing;
+
+  select points into balance
+  from public.points
+  where guild_id = p_guild_id and user_id = p_user_id
+  for update;
+
+  if p_strategy = 'sharded' then
+    balance := public.fold_point_shards(p_guild_id, p_user_id);
+  end if;
+  return balance;
+end;
+$$;
+
+create or replace function public.apply_point_delta(
+  p_guild_id bigint,
+  p_user_id bigint,
+  p_delta integer,
+  p_kind text default 'adjust',
+  p_strategy text default 'direct'
+)
+returns void
+language plpgsql
+as $$
+begin
+  if p_strategy = 'journal' then
+    insert into public.point_events (guild_id, user_id, kind, delta)
+    values (p_guild_id, p_user_id, p_kind, p_delta);
+    return;
+  end if;
+
+  insert into public.points (guild_id, user_id, points)
+  values (p_guild_id, p_user_id, p_delta)
+  on conflict (guild_id, user_id) do update
+  set points = public.points.points + excluded.points;
+end;
+$$;
+
+create or replace function public.purchase_role(
+  p_guild_id bigint,
+  p_user_id bigint,
+  p_role_id bigint,
+  p_strategy text default 'direct'
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+  role_price integer;
+  balance integer;
+  new_purchase_id bigint;
+begin
+  select price into role_price
+  from public.role_buy_settings
+  where guild_id = p_guild_id and role_id = p_role_id;
+
+  if role_price is null then
+    return jsonb_build_object('status', 'not_for_sale');
+  end if;
+
+  balance := public.lock_point_balance(p_guild_id, p_user_id, p_strategy);
+  if balance < role_price then
+    return jsonb_build_object(
+      'status', 'insufficient',
+      'price', role_price,
+      'balance', balance
+    );
+  end if;
+
+  perform public.apply_point_delta(
+    p_guild_id, p_user_id, -role_price, 'role_purchase', p_strategy
+  );
+
+  insert into public.role_purchases (guild_id, user_id, role_id, price)
+  values (p_guild_id, p_user_id, p_role_id, role_price)
+  returning id into new_purchase_id;
+
+  return jsonb_build_object(
+    'status', 'ok',
+    'purchase_id', new_purchase_id,
+    'price', role_price,
+    'balance', balance - role_price
+  );
+end;
+$$;
+
+-- Compensates a purchase whose role could not be granted. Releasing twice is
+-- a no-op, so callers may retry.
+create or replace function public.release_purchase(
+  p_purchase_id bigint,
+  p_strategy text default 'direct'
+)
+returns boolean
+language plpgsql
+as $$
+declare
+  purchase public.role_purchases%rowtype;
+begin
+  update public.role_purchases
+  set status = 'released', released_at = now()
+  where id = p_purchase_id and status = 'charged'
+  returning * into purchase;
+
+  if not found then
+    return false;
+  end if;
+
+  perform public.apply_point_delta(
+    purchase.guild_id, purchase.user_id, purchase.price, 'role_purchase', p_strategy
+  );
+  return true;
+end;
+$$;
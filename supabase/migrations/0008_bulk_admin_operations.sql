@@ -0,0 +1,102 @@
+-- Bulk revokes never push a balance below zero. Sharded balances are folded
+-- first so the clamp sees the whole balance rather than the points row alone.
+create or replace function public.bulk_add_points(
+  p_guild_id bigint,
+  p_user_ids bigint[],
+  p_delta integer,
+  p_kind text default 'adjust',
+  p_strategy text default 'direct'
+)
+returns integer
+language plpgsql
+as $$
+declare
+  affected integer;
+begin
+  if p_delta = 0 or coalesce(array_length(p_user_ids, 1), 0) = 0 then
+    return 0;
+  end if;
+
+  if p_strategy = 'journal' then
+    insert into public.point_events (guild_id, user_id, kind, delta)
+    select p_guild_id, ids.user_id, p_kind, greatest(p_delta, -coalesce(b.points, 0))
+    from (select distinct unnest(p_user_ids) as user_id) ids
+    left join public.point_journal_balances b
+      on b.guild_id = p_guild_id and b.user_id = ids.user_id
+    where p_delta > 0 or coalesce(b.points, 0) > 0;
+  else
+    if p_delta < 0 and p_strategy = 'sharded' then
+      perform public.fold_point_shards(p_guild_id, ids.user_id)
+      from (select distinct unnest(p_user_ids) as user_id) ids;
+    end if;
+
+    insert into public.points (guild_id, user_id, points)
+    select p_guild_id, user_id, greatest(p_delta, 0)
+    from (select distinct unnest(p_user_ids) as user_id) ids
+    on conflict (guild_id, user_id) do update
+    set points = greatest(public.points.points + p_delta, 0);
+  end if;
+
+  get diagnostics affected = row_count;
+  return affected;
+end;
+$$;
+
+-- p_rows is a JSON array of {"user_id": ..., "points": ...}. 'set' overwrites
+-- balances, 'add' applies the values as deltas.
+create or replace function public.import_points(
+  p_guild_id bigint,
+  p_rows jsonb,
+  p_mode text default 'set',
+  p_strategy text default 'direct'
+)
+returns integer
+language plpgsql
+as $$
+declare
+  affected integer;
+begin
+  if p_mode not in ('set', 'add') then
+    raise exception 'unknown import mode: %', p_mode;
+  end if;
+
+  if p_strategy = 'journal' then
+    insert into public.point_events (guild_id, user_id, kind, delta)
+    select p_guild_id, r.user_id, 'adjust', r.delta
+    from (
+      select
+        rows.user_id,
+        case when p_mode = 'set' then rows.points - coalesce(b.points, 0) else rows.points end as delta
+      from (
+        select (value ->> 'user_id')::bigint as user_id, sum((value ->> 'points')::integer)::integer as points
+        from jsonb_array_elements(p_rows)
+        group by 1
+      ) rows
+      left join public.point_journal_balances b
+        on b.guild_id = p_guild_id and b.user_id = rows.user_id
+    ) r
+    where r.delta <> 0;
+  else
+    if p_mode = 'set' and p_strategy = 'sharded' then
+      delete from public.point_shards s
+      where s.guild_id = p_guild_id
+        and s.user_id in (
+          select (value ->> 'user_id')::bigint from jsonb_array_elements(p_rows)
+        );
+    end if;
+
+    insert into public.points (guild_id, user_id, points)
+    select p_guild_id, (value ->> 'user_id')::bigint, sum((value ->> 'points')::integer)::integer
+    from jsonb_array_elements(p_rows)
+    group by 2
+    on conflict (guild_id, user_id) do update
+    set points = case
+      when p_mode = 'set' then excluded.points
+      else public.points.points + excluded.points
+    end;
+  end if;
+
+  get diagnostics affected = row_count;
+  return affected;
+end;
+$$;
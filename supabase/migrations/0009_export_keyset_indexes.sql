@@ -0,0 +1,6 @@
+-- Guild exports page through these tables by (guild_id, id).
+create index if not exists game_rounds_guild_id_idx
+  on public.game_rounds (guild_id, id);
+
+create index if not exists point_events_guild_id_idx
+  on public.point_events (guild_id, id);
@@ -0,0 +1,50 @@
+-- A user's position in the leaderboard order (points desc, user_id asc), so
+-- it matches the keyset pages served to /rank. For the direct strategy both
+-- branches of the count are range scans on points_guild_points_idx.
+create or replace function public.user_rank(
+  p_guild_id bigint,
+  p_user_id bigint,
+  p_strategy text default 'direct'
+)
+returns jsonb
+language plpgsql
+stable
+as $$
+declare
+  v_points integer;
+  v_ahead bigint;
+begin
+  if p_strategy = 'journal' then
+    v_points := public.journal_get_points(p_guild_id, p_user_id);
+    if v_points is null then
+      return null;
+    end if;
+    select count(*) into v_ahead
+    from public.point_journal_balances b
+    where b.guild_id = p_guild_id
+      and (b.points > v_points or (b.points = v_points and b.user_id < p_user_id));
+  elsif p_strategy = 'sharded' then
+    v_points := public.sharded_get_points(p_guild_id, p_user_id);
+    if v_points is null then
+      return null;
+    end if;
+    select count(*) into v_ahead
+    from public.point_sharded_balances b
+    where b.guild_id = p_guild_id
+      and (b.points > v_points or (b.points = v_points and b.user_id < p_user_id));
+  else
+    select p.points into v_points
+    from public.points p
+    where p.guild_id = p_guild_id and p.user_id = p_user_id;
+    if not found then
+      return null;
+    end if;
+    select count(*) into v_ahead
+    from public.points p
+    where p.guild_id = p_guild_id
+      and (p.points > v_points or (p.points = v_points and p.user_id < p_user_id));
+  end if;
+
+  return jsonb_build_object('rank', v_ahead + 1, 'points', v_points);
+end;
+$$;
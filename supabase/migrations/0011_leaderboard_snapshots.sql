@@ -0,0 +1,142 @@
+-- Leaderboard history. Each snapshot stores only the users whose balance
+-- changed since the previous one (delta encoding); leaderboard_state holds
+-- the balances as of the latest snapshot so the next diff is a single join.
+create table if not exists public.leaderboard_snapshots (
+  id bigserial primary key,
+  guild_id bigint not null,
+  taken_at timestamptz not null default now()
+);
+
+create index if not exists leaderboard_snapshots_guild_taken_idx
+  on public.leaderboard_snapshots (guild_id, taken_at);
+
+create table if not exists public.leaderboard_deltas (
+  snapshot_id bigint not null references public.leaderboard_snapshots (id) on delete cascade,
+  user_id bigint not null,
+  delta integer not null,
+  primary key (snapshot_id, user_id)
+);
+
+create table if not exists public.leaderboard_state (
+  guild_id bigint not null,
+  user_id bigint not null,
+  points integer not null,
+  primary key (guild_id, user_id)
+);
+
+create or replace function public.point_balances(p_strategy text default 'direct')
+returns table (guild_id bigint, user_id bigint, points integer)
+language sql
+stable
+as $$
+  select b.guild_id, b.user_id, b.points from public.points b
+  where p_strategy not in ('journal', 'sharded')
+  union all
+  select b.guild_id, b.user_id, b.points from public.point_journal_balances b
+  where p_strategy = 'journal'
+  union all
+  select b.guild_id, b.user_id, b.points from public.point_sharded_balances b
+  where p_strategy = 'sharded';
+$$;
+
+create or replace function public.take_leaderboard_snapshot(p_strategy text default 'direct')
+returns integer
+language plpgsql
+as $$
+declare
+  affected integer;
+begin
+  with changed as (
+    select c.guild_id, c.user_id, c.points, c.points - coalesce(s.points, 0) as delta
+    from public.point_balances(p_strategy) c
+    left join public.leaderboard_state s
+      on s.guild_id = c.guild_id and s.user_id = c.user_id
+    where s.points is distinct from c.points
+  ),
+  snapshots as (
+    insert into public.leaderboard_snapshots (guild_id)
+    select distinct guild_id from changed
+    returning id, guild_id
+  ),
+  deltas as (
+    insert into public.leaderboard_deltas (snapshot_id, user_id, delta)
+    select sn.id, ch.user_id, ch.delta
+    from changed ch
+    join snapshots sn on sn.guild_id = ch.guild_id
+    returning 1
+  ),
+  state as (
+    insert into public.leaderboard_state (guild_id, user_id, points)
+    select guild_id, user_id, points from changed
+    on conflict (guild_id, user_id) do update set points = excluded.points
+    returning 1
+  )
+  select count(*) into affected from deltas;
+
+  return affected;
+end;
+$$;
+
+create or replace function public.leaderboard_gains(
+  p_guild_id bigint,
+  p_since timestamptz,
+  p_limit integer default 10
+)
+returns table (user_id bigint, gained bigint)
+language sql
+stable
+as $$
+  select d.user_id, sum(d.delta)::bigint as gained
+  from public.leaderboard_snapshots s
+  join public.leaderboard_deltas d on d.snapshot_id = s.id
+  where s.guild_id = p_guild_id and s.taken_at > p_since
+  group by d.user_id
+  having sum(d.delta) > 0
+  order by gained desc, d.user_id
+  limit p_limit;
+$$;
+
+-- Ranks are positions in (points desc, user_id) order as of the latest
+-- snapshot and as of p_since, rebuilt from the deltas taken after p_since.
+create or replace function public.leaderboard_climbers(
+  p_guild_id bigint,
+  p_since timestamptz,
+  p_limit integer default 10
+)
+returns table (user_id bigint, rank_before bigint, rank_now bigint, climbed bigint)
+language sql
+stable
+as $$
+  with gained as (
+    select d.user_id, sum(d.delta)::bigint as gained
+    from public.leaderboard_snapshots s
+    join public.leaderboard_deltas d on d.snapshot_id = s.id
+    where s.guild_id = p_guild_id and s.taken_at > p_since
+    group by d.user_id
+  ),
+  now_ranked as (
+    select
+      st.user_id,
+      st.points,
+      row_number() over (order by st.points desc, st.user_id) as rank
+    from public.leaderboard_state st
+    where st.guild_id = p_guild_id
+  ),
+  before_ranked as (
+    select
+      b.user_id,
+      row_number() over (order by b.points desc, b.user_id) as rank
+    from (
+      select n.user_id, n.points - coalesce(g.gained, 0) as points
+      from now_ranked n
+      left join gained g on g.user_id = n.user_id
+    ) b
+    where b.points > 0
+  )
+  select n.user_id, b.rank, n.rank, b.rank - n.rank as climbed
+  from now_ranked n
+  join before_ranked b on b.user_id = n.user_id
+  where b.rank > n.rank
+  order by climbed desc, n.rank
+  limit p_limit;
+$$;
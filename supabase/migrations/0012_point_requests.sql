@@ -0,0 +1,105 @@
+-- Idempotent point writes. The client picks a request id before the first
+-- attempt; a retry with the same id returns the stored result instead of
+-- applying the write again. Rows are pruned after a day.
+create table if not exists public.point_requests (
+  request_id text primary key,
+  operation text not null,
+  result jsonb,
+  created_at timestamptz not null default now()
+);
+
+create index if not exists point_requests_created_at_idx
+  on public.point_requests (created_at);
+
+create or replace function public.run_point_request(
+  p_request_id text,
+  p_operation text,
+  p_params jsonb
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+  v_result jsonb;
+begin
+  -- A concurrent duplicate blocks here until the first attempt commits.
+  insert into public.point_requests (request_id, operation)
+  values (p_request_id, p_operation)
+  on conflict (request_id) do nothing;
+
+  if not found then
+    select r.result into v_result
+    from public.point_requests r
+    where r.request_id = p_request_id;
+    return jsonb_build_object('value', v_result, 'replayed', true);
+  end if;
+
+  if p_operation = 'add_points' then
+    v_result := to_jsonb(public.add_points(
+      (p_params ->> 'p_guild_id')::bigint,
+      (p_params ->> 'p_user_id')::bigint,
+      (p_params ->> 'p_delta')::integer
+    ));
+  elsif p_operation = 'journal_add_points' then
+    v_result := to_jsonb(public.journal_add_points(
+      (p_params ->> 'p_guild_id')::bigint,
+      (p_params ->> 'p_user_id')::bigint,
+      (p_params ->> 'p_delta')::integer,
+      coalesce(p_params ->> 'p_kind', 'adjust')
+    ));
+  elsif p_operation = 'sharded_add_points' then
+    v_result := to_jsonb(public.sharded_add_points(
+      (p_params ->> 'p_guild_id')::bigint,
+      (p_params ->> 'p_user_id')::bigint,
+      (p_params ->> 'p_delta')::integer,
+      coalesce((p_params ->> 'p_shard_count')::integer, 8)
+    ));
+  elsif p_operation = 'transfer_points' then
+    v_result := to_jsonb(public.transfer_points(
+      (p_params ->> 'p_guild_id')::bigint,
+      (p_params ->> 'p_sender_id')::bigint,
+      (p_params ->> 'p_recipient_id')::bigint,
+      (p_params ->> 'p_points')::integer
+    ));
+  elsif p_operation = 'journal_transfer_points' then
+    v_result := to_jsonb(public.journal_transfer_points(
+      (p_params ->> 'p_guild_id')::bigint,
+      (p_params ->> 'p_sender_id')::bigint,
+      (p_params ->> 'p_recipient_id')::bigint,
+      (p_params ->> 'p_points')::integer,
+      coalesce(p_params ->> 'p_kind', 'transfer')
+    ));
+  elsif p_operation = 'sharded_transfer_points' then
+    v_result := to_jsonb(public.sharded_transfer_points(
+      (p_params ->> 'p_guild_id')::bigint,
+      (p_params ->> 'p_sender_id')::bigint,
+      (p_params ->> 'p_recipient_id')::bigint,
+      (p_params ->> 'p_points')::integer
+    ));
+  else
+    raise exception 'unknown point request operation: %', p_operation;
+  end if;
+
+  update public.point_requests
+  set result = v_result
+  where request_id = p_request_id;
+
+  return jsonb_build_object('value', v_result, 'replayed', false);
+end;
+$$;
+
+create or replace function public.prune_point_requests(
+  p_ttl_seconds integer default 86400
+)
+returns integer
+language plpgsql
+as $$
+declare
+  removed integer;
+begin
+  delete from public.point_requests
+  where created_at < now() - make_interval(secs => p_ttl_seconds);
+  get diagnostics removed = row_count;
+  return removed;
+end;
+$$;
@@ -0,0 +1,30 @@
+-- Replays deltas spooled locally during an outage, in spool order, in one
+-- transaction. Each item goes through run_point_request, so an item that
+-- already reached the database before the outage is not applied twice.
+create or replace function public.replay_point_requests(p_requests jsonb)
+returns integer
+language plpgsql
+as $$
+declare
+  item jsonb;
+  outcome jsonb;
+  applied integer := 0;
+begin
+  for item in
+    select e.value
+    from jsonb_array_elements(p_requests) with ordinality as e(value, idx)
+    order by e.idx
+  loop
+    outcome := public.run_point_request(
+      item ->> 'request_id',
+      item ->> 'operation',
+      item -> 'params'
+    );
+    if not coalesce((outcome ->> 'replayed')::boolean, false) then
+      applied := applied + 1;
+    end if;
+  end loop;
+
+  return applied;
+end;
+$$;
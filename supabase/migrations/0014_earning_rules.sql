@@ -0,0 +1,36 @@
+-- Per-guild earning rules (channel allow/deny, role multipliers, message and
+-- voice thresholds). Missing keys fall back to the bot's defaults.
+create table if not exists public.earning_rules (
+  guild_id bigint primary key,
+  rules jsonb not null default '{}'::jsonb,
+  updated_at timestamptz not null default now()
+);
+
+create or replace function public.get_guild_settings(p_guild_id bigint)
+returns jsonb
+language sql
+stable
+as $$
+  select jsonb_build_object(
+    'clan_register_channel_id', (
+      select channel_id
+      from public.clan_register_settings
+      where guild_id = p_guild_id
+    ),
+    'role_prices', coalesce((
+      select jsonb_object_agg(role_id::text, price)
+      from public.role_buy_settings
+      where guild_id = p_guild_id
+    ), '{}'::jsonb),
+    'remove_permitted_user_ids', coalesce((
+      select jsonb_agg(user_id)
+      from public.point_remove_permissions
+      where guild_id = p_guild_id
+    ), '[]'::jsonb),
+    'earning_rules', coalesce((
+      select rules
+      from public.earning_rules
+      where guild_id = p_guild_id
+    ), '{}'::jsonb)
+  );
+$$;
@@ -0,0 +1,37 @@
+-- Balances for a set of users in one call. Users without a balance are
+-- omitted. The journal and sharded branches reuse the per-user functions so
+-- each lookup stays an index probe instead of scanning the balance views.
+create or replace function public.get_points_many(
+  p_guild_id bigint,
+  p_user_ids bigint[],
+  p_strategy text default 'direct'
+)
+returns table (user_id bigint, points integer)
+language plpgsql
+stable
+as $$
+begin
+  if p_strategy = 'journal' then
+    return query
+    select b.user_id, b.points
+    from (
+      select distinct u.user_id, public.journal_get_points(p_guild_id, u.user_id) as points
+      from unnest(p_user_ids) as u(user_id)
+    ) b
+    where b.points is not null;
+  elsif p_strategy = 'sharded' then
+    return query
+    select b.user_id, b.points
+    from (
+      select distinct u.user_id, public.sharded_get_points(p_guild_id, u.user_id) as points
+      from unnest(p_user_ids) as u(user_id)
+    ) b
+    where b.points is not null;
+  else
+    return query
+    select p.user_id, p.points
+    from public.points p
+    where p.guild_id = p_guild_id and p.user_id = any(p_user_ids);
+  end if;
+end;
+$$;
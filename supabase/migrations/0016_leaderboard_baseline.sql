@@ -0,0 +1,56 @@
+-- A guild's first snapshot is a baseline: it seeds leaderboard_state without
+-- recording deltas, so gains/climbers never count whole balances as points
+-- earned. Users new to an already-tracked guild still get their balance as a
+-- delta (they had nothing before).
+create or replace function public.take_leaderboard_snapshot(p_strategy text default 'direct')
+returns integer
+language plpgsql
+as $$
+declare
+  affected integer;
+begin
+  with changed as (
+    select
+      c.guild_id,
+      c.user_id,
+      c.points,
+      c.points - coalesce(s.points, 0) as delta,
+      not exists (
+        select 1 from public.leaderboard_state k where k.guild_id = c.guild_id
+      ) as baseline
+    from public.point_balances(p_strategy) c
+    left join public.leaderboard_state s
+      on s.guild_id = c.guild_id and s.user_id = c.user_id
+    where s.points is distinct from c.points
+  ),
+  snapshots as (
+    insert into public.leaderboard_snapshots (guild_id)
+    select distinct guild_id from changed where not baseline
+    returning id, guild_id
+  ),
+  deltas as (
+    insert into public.leaderboard_deltas (snapshot_id, user_id, delta)
+    select sn.id, ch.user_id, ch.delta
+    from changed ch
+    join snapshots sn on sn.guild_id = ch.guild_id
+    returning 1
+  ),
+  state as (
+    insert into public.leaderboard_state (guild_id, user_id, points)
+    select guild_id, user_id, points from changed
+    on conflict (guild_id, user_id) do update set points = excluded.points
+    returning 1
+  )
+  select count(*) into affected from deltas;
+
+  return affected;
+end;
+$$;
+
+-- Snapshots taken by the previous version recorded each guild's first
+-- snapshot as whole balances; drop them (deltas cascade). leaderboard_state
+-- is left as is and serves as the baseline.
+delete from public.leaderboard_snapshots
+where id in (
+  select min(id) from public.leaderboard_snapshots group by guild_id
+);
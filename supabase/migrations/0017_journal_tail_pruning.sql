@@ -0,0 +1,80 @@
+-- point_journal_balances: a guild filter now reaches point_events. Snapshot
+-- rows read their own tail through the (guild_id, user_id, id) index, and
+-- users without a snapshot are aggregated in a separate branch, so a
+-- `where guild_id = ...` is pushed into both halves instead of sitting above
+-- a full join on coalesced keys.
+create or replace view public.point_journal_balances as
+select
+  s.guild_id,
+  s.user_id,
+  (
+    s.points + coalesce((
+      select sum(e.delta)
+      from public.point_events e
+      where e.guild_id = s.guild_id
+        and e.user_id = s.user_id
+        and e.id > s.last_event_id
+    ), 0)
+  )::integer as points
+from public.point_snapshots s
+union all
+select e.guild_id, e.user_id, sum(e.delta)::integer as points
+from public.point_events e
+where not exists (
+  select 1 from public.point_snapshots s
+  where s.guild_id = e.guild_id and s.user_id = e.user_id
+)
+group by e.guild_id, e.user_id;
+
+-- compact_point_events deletes the events it folded, so point_events only
+-- holds the uncompacted tail.
+create or replace function public.compact_point_events(
+  p_min_age_seconds integer default 300
+)
+returns integer
+language plpgsql
+as $$
+declare
+  cutoff_id bigint;
+  folded integer;
+begin
+  if not pg_try_advisory_xact_lock(hashtextextended('compact_point_events', 0)) then
+    return 0;
+  end if;
+
+  select coalesce(max(id), 0) into cutoff_id
+  from public.point_events
+  where created_at < now() - make_interval(secs => p_min_age_seconds);
+
+  with pending as (
+    select
+      e.guild_id,
+      e.user_id,
+      sum(e.delta)::integer as delta,
+      max(e.id) as last_id,
+      count(*)::integer as event_count
+    from public.point_events e
+    left join public.point_snapshots s
+      on s.guild_id = e.guild_id and s.user_id = e.user_id
+    where e.id <= cutoff_id and e.id > coalesce(s.last_event_id, 0)
+    group by e.guild_id, e.user_id
+  ),
+  folded_rows as (
+    insert into public.point_snapshots (guild_id, user_id, points, last_event_id, updated_at)
+    select guild_id, user_id, delta, last_id, now()
+    from pending
+    on conflict (guild_id, user_id) do update
+    set points = public.point_snapshots.points + excluded.points,
+        last_event_id = excluded.last_event_id,
+        updated_at = now()
+    returning 1
+  )
+  select coalesce(sum(event_count), 0) into folded from pending;
+
+  -- Every event at or below the cutoff is now covered by a snapshot's
+  -- last_event_id.
+  delete from public.point_events where id <= cutoff_id;
+
+  return folded;
+end;
+$$;
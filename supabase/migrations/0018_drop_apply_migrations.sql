@@ -0,0 +1,3 @@
+-- Migrations are no longer applied by the bot; remove the RPC that executed
+-- client-supplied SQL as its (security definer) owner.
+drop function if exists public.apply_migrations(jsonb);
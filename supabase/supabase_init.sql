@@ -1,121 +1,16 @@
-create table if not exists public.points (
-  guild_id bigint not null,
-  user_id bigint not null,
-  points integer not null default 0,
-  primary key (guild_id, user_id)
+-- Bootstrap for schema_version.
+-- Run this once in the Supabase SQL Editor. Files in supabase/migrations/ are
+-- applied out-of-band (supabase/apply_migrations.sh or the Supabase CLI) and
+-- recorded here; on startup the bot only reads max(version) and refuses to
+-- start when it does not match the newest local file.
+create table if not exists public.schema_version (
+  version integer primary key,
+  name text not null,
+  applied_at timestamptz not null default now()
 );
 
-create table if not exists public.point_remove_permissions (
-  guild_id bigint not null,
-  user_id bigint not null,
-  primary key (guild_id, user_id)
-);
-
-create table if not exists public.clan_register_settings (
-  guild_id bigint primary key,
-  channel_id bigint not null
-);
-
-create table if not exists public.role_buy_settings (
-  guild_id bigint not null,
-  role_id bigint not null,
-  price integer not null,
-  primary key (guild_id, role_id)
-);
-
-create or replace function public.ensure_points_schema()
-returns void
-language plpgsql
-as $$
-begin
-  create table if not exists public.points (
-    guild_id bigint not null,
-    user_id bigint not null,
-    points integer not null default 0,
-    primary key (guild_id, user_id)
-  );
-  create table if not exists public.point_remove_permissions (
-    guild_id bigint not null,
-    user_id bigint not null,
-    primary key (guild_id, user_id)
-  );
-  create table if not exists public.clan_register_settings (
-    guild_id bigint primary key,
-    channel_id bigint not null
-  );
-  create table if not exists public.role_buy_settings (
-    guild_id bigint not null,
-    role_id bigint not null,
-    price integer not null,
-    primary key (guild_id, role_id)
-  );
-end;
-$$;
-
-create or replace function public.add_points(
-  p_guild_id bigint,
-  p_user_id bigint,
-  p_delta integer
-)
-returns integer
-language plpgsql
-as $$
-declare
-  new_points integer;
-begin
-  insert into public.points (guild_id, user_id, points)
-  values (p_guild_id, p_user_id, 0)
-  on conflict (guild_id, user_id) do nothing;
-
-  update public.points
-  set points = points + p_delta
-  where guild_id = p_guild_id and user_id = p_user_id
-  returning points into new_points;
-
-  return new_points;
-end;
-$$;
-
-create or replace function public.transfer_points(
-  p_guild_id bigint,
-  p_sender_id bigint,
-  p_recipient_id bigint,
-  p_points integer
-)
-returns boolean
-language plpgsql
-as $$
-declare
-  sender_points integer;
-begin
-  if p_points <= 0 then
-    return false;
-  end if;
-
-  insert into public.points (guild_id, user_id, points)
-  values (p_guild_id, p_sender_id, 0), (p_guild_id, p_recipient_id, 0)
-  on conflict (guild_id, user_id) do nothing;
-
-  select points into sender_points
-  from public.points
-  where guild_id = p_guild_id and user_id = p_sender_id
-  for update;
-
-  if sender_points < p_points then
-    return false;
-  end if;
-
-  update public.points
-  set points = points - p_points
-  where guild_id = p_guild_id and user_id = p_sender_id;
-
-  update public.points
-  set points = points + p_points
-  where guild_id = p_guild_id and user_id = p_recipient_id;
-
-  return true;
-end;
-$$;
+-- Earlier bootstraps let service_role run arbitrary SQL through this RPC.
+drop function if exists public.apply_migrations(jsonb);
 
 -- Migration: guild-scoped points (one-time)
 -- 1) Add guild_id and update existing rows with the specified guild.